@@ -2,6 +2,7 @@ import logging
 from datetime import datetime, timedelta
 from config.database import get_db
 from fastapi import HTTPException, status
+from probe.probe_assertion import is_error_result
 import json
 
 # 로거 설정
@@ -146,6 +147,9 @@ async def get_dashboard_statistics():
         # 시스템별 결과 기록 및 최신 점검 일시 저장
         system_latest_datetime = {}
         
+        # 점검 방식(tcp/tls/head/headers/get)별 최신 메뉴 점검 결과 카운트 (방식이 기록되지 않은 이전 결과는 http)
+        probe_type_counts = {}
+        
         for system_id, inspection in latest_inspections.items():
             # 시스템의 최신 점검 일시 저장
             inspection_datetime = latest_dates[system_id]
@@ -160,11 +164,13 @@ async def get_dashboard_statistics():
             if 'inspection_results' in inspection:
                 # 각 메뉴(URL)별 결과 분석
                 for result in inspection['inspection_results']:
-                    status_code = result.get('status_code', 0)
-                    if status_code >= 200 and status_code < 400:
+                    tier_counts = probe_type_counts.setdefault(result.get('probe_type') or 'http', {"success": 0, "error": 0})
+                    if not is_error_result(result):
                         success_count += 1
+                        tier_counts["success"] += 1
                     else:
                         error_count += 1
+                        tier_counts["error"] += 1
                 
                 # 시스템 상태 업데이트 (메뉴별 정상/오류 카운트)
                 system_data[system_id]['latest_status'] = (error_count == 0)
@@ -186,6 +192,14 @@ async def get_dashboard_statistics():
             "latest_datetime": [system_data[system_id].get('latest_datetime', '') for system_id in system_data]
         }
         
+        # 점검 방식별 최신 통계 데이터 구성
+        probe_types = sorted(probe_type_counts)
+        probe_type_stats = {
+            "labels": probe_types,
+            "success_data": [probe_type_counts[probe_type]["success"] for probe_type in probe_types],
+            "error_data": [probe_type_counts[probe_type]["error"] for probe_type in probe_types]
+        }
+        
         # 오늘 날짜 계산 (로컬 시간 기준, 타임존 정보 없음)
         today_local = datetime.now()
         today_str = today_local.strftime('%Y-%m-%d')
@@ -283,8 +297,7 @@ async def get_dashboard_statistics():
                     # 오류가 있는지 확인
                     has_error = False
                     for result in system.get('inspection_results', []):
-                        status_code = result.get('status_code', 0)
-                        if status_code < 200 or status_code >= 400:
+                        if is_error_result(result):
                             has_error = True
                             break
                     
@@ -305,8 +318,7 @@ async def get_dashboard_statistics():
                 # 오류가 있는지 확인
                 has_error = False
                 for result in inspection_results:
-                    status_code = result.get('status_code', 0)
-                    if status_code < 200 or status_code >= 400:
+                    if is_error_result(result):
                         has_error = True
                         break
                 
@@ -445,8 +457,7 @@ async def get_dashboard_statistics():
                         # 오류가 있는지 확인
                         has_error = False
                         for result in system.get('inspection_results', []):
-                            status_code = result.get('status_code', 0)
-                            if status_code < 200 or status_code >= 400:
+                            if is_error_result(result):
                                 has_error = True
                                 break
                         
@@ -460,8 +471,7 @@ async def get_dashboard_statistics():
                     
                     has_error = False
                     for result in inspection_results:
-                        status_code = result.get('status_code', 0)
-                        if status_code < 200 or status_code >= 400:
+                        if is_error_result(result):
                             has_error = True
                             break
                     
@@ -490,6 +500,8 @@ async def get_dashboard_statistics():
             "month_inspection_count": month_count,
             # 시스템별 최신 통계 데이터 추가
             "system_stats": system_stats,
+            # 점검 방식별 최신 통계 데이터 추가 (모든 점검 방식의 결과는 system_stats 에도 함께 집계됨)
+            "probe_type_stats": probe_type_stats,
             # 이번 주 점검 통계 데이터 추가
             "weekly_inspection_stats": {
                 "labels": ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"],
@@ -1,11 +1,35 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+import re
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
+class MenuAssertion(BaseModel):
+    """메뉴 본문 검사 모델 (응답 본문을 스트리밍으로 받으며 검사, 2xx 응답에만 적용)"""
+    contains: Optional[str] = Field(None, min_length=1, description="본문에 포함되어야 하는 문자열")
+    regex: Optional[str] = Field(None, min_length=1, description="본문에서 찾아야 하는 정규식")
+    max_size: Optional[int] = Field(None, gt=0, description="본문 최대 크기(바이트)")
+    
+    @validator('regex')
+    def validate_regex(cls, v):
+        if v is not None:
+            try:
+                re.compile(v)
+            except re.error as e:
+                raise ValueError(f'올바른 정규식이 아닙니다: {e}')
+        return v
+    
+    class Config:
+        orm_mode = True
+        allow_population_by_field_name = True
+
 class Menu(BaseModel):
     """메뉴 정보 모델"""
     name: str = Field(..., description="메뉴명")
     path: str = Field(..., description="URL 경로")
+    check_interval_minutes: Optional[int] = Field(None, ge=1, description="메뉴 점검 주기(분, 없으면 시스템 점검 주기)")
+    probe_type: Optional[Literal["tcp", "tls", "head", "headers", "get"]] = Field(
+        None, description="점검 방식 (tcp: 포트 연결, tls: TLS 핸드셰이크, head/headers/get: HTTP 요청, 없으면 기본 점검 방식)")
+    assertion: Optional[MenuAssertion] = Field(None, description="본문 검사 (HTTP 점검 방식에서 GET 으로 본문을 받으며 검사)")
     
     class Config:
         orm_mode = True
@@ -17,6 +41,10 @@ class SystemBase(BaseModel):
     kor_name: str = Field(..., description="시스템 한글명")
     url: str = Field(..., description="시스템 URL(도메인)")
     menus: List[Menu] = Field(default=[], description="메뉴 목록")
+    rate_limit: Optional[float] = Field(None, gt=0, description="점검 시 초당 최대 요청 수 (없으면 기본값)")
+    max_concurrency: Optional[int] = Field(None, gt=0, description="점검 시 동시 요청 수 상한 (없으면 기본값)")
+    check_interval_minutes: Optional[int] = Field(None, ge=1, description="시스템 점검 주기(분, 없으면 기본값)")
+    http2: bool = Field(False, description="HTTPS 메뉴를 HTTP/2 로 점검 (지원하지 않으면 HTTP/1.1 로 점검)")
     
     class Config:
         orm_mode = True
@@ -37,6 +65,10 @@ class SystemUpdate(BaseModel):
     kor_name: Optional[str] = None
     url: Optional[str] = None
     menus: Optional[List[Menu]] = None
+    rate_limit: Optional[float] = Field(None, gt=0)
+    max_concurrency: Optional[int] = Field(None, gt=0)
+    check_interval_minutes: Optional[int] = Field(None, ge=1)
+    http2: Optional[bool] = None
     updated_at: datetime = Field(default_factory=datetime.now, description="수정일")
     updated_by: str = Field(..., description="수정자 ID")
     
@@ -60,10 +92,18 @@ class InspectionMenuResult(BaseModel):
     """메뉴별 점검 결과 모델"""
     menu_name: str = Field(..., description="메뉴명")
     path: str = Field(..., description="URL 경로")
-    status_code: int = Field(..., description="HTTP 상태 코드")
+    probe_type: Optional[str] = Field(None, description="점검 방식 (tcp, tls, head, headers, get)")
+    status_code: int = Field(..., description="HTTP 상태 코드 (tcp/tls 점검은 연결 성공 시 200)")
     status_text: str = Field(..., description="상태명(한글)")
-    response_time: float = Field(..., description="응답 시간(ms)")
+    response_time: float = Field(..., description="응답 시간(ms, DNS 조회 시간 제외)")
+    dns_time: Optional[float] = Field(None, description="DNS 조회 시간(ms)")
     headers: Dict[str, str] = Field(default={}, description="응답 헤더")
+    timings: Optional[Dict[str, float]] = Field(None, description="구간별 소요 시간(ms): dns, connect, send, ttfb, body")
+    error_type: Optional[str] = Field(None, description="실패 유형: connection, timeout, circuit_open, deadline_exceeded, assertion, error")
+    assertion: Optional[Dict[str, Any]] = Field(None, description="본문 검사 결과: passed, message, bytes_read")
+    fingerprint: Optional[str] = Field(None, description="본문 지문 (알고리즘:해시, 본문을 읽은 2xx 응답만)")
+    content_changed: Optional[bool] = Field(None, description="이전 점검과 본문 지문이 다른지 여부 (비교할 수 없으면 없음)")
+    attempts: Optional[int] = Field(None, description="점검 시도 횟수 (재시도, 헤지 요청 포함)")
     
     class Config:
         orm_mode = True
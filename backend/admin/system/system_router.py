@@ -15,9 +15,12 @@ from .system_model import SystemCreate, SystemResponse, SystemUpdate, SystemInsp
 from .system_service import (
     create_system, get_systems, get_system, update_system, delete_system, 
     inspect_system, get_system_inspections, perform_system_inspection, 
-    save_inspection_history, get_recent_inspections, get_system_detail
+    save_inspection_history, get_recent_inspections, get_system_detail, perform_systems_inspection
 )
 from history.history_service import get_system_statistics, get_latest_inspection_result
+from probe.probe_worker import run_probe_header
+from probe.probe_state import find_url_state
+from probe.probe_timeout import adaptive_timeout
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -28,6 +31,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 # 라우터 정의
 router = APIRouter(tags=["시스템"])
 
+# 헤더 프록시 API 기본 타임아웃 (초)
+PROXY_DEFAULT_TIMEOUT = 5
+
 # 시스템 페이지
 @router.get("/admin/system")
 async def admin_system(request: Request):
@@ -190,65 +196,28 @@ async def proxy_header(request: Request):
         
         logger.info(f"헤더 정보 요청: URL={url}")
         
-        # 타임아웃 설정으로 빠른 응답 보장
-        timeout = aiohttp.ClientTimeout(total=5)
-        start_time = time.time()
+        # 타임아웃 설정으로 빠른 응답 보장 (점검 이력이 있는 URL 은 응답 시간 추정값 기준)
+        timeout = adaptive_timeout(find_url_state(url), PROXY_DEFAULT_TIMEOUT)
+        
+        # 자동 점검과 같은 점검 워커에서 호스트별 요청 제한을 적용하여 HEAD 요청 (4xx, 5xx 응답이면 GET 요청)
+        result = await run_probe_header(url, timeout)
+        
+        if result["status_code"] == 408:
+            logger.warning(f"요청 타임아웃: {url}")
+        
+        response_data = {
+            "url": url,
+            "status_code": result["status_code"],
+            "headers": result["headers"],  # 헤더값은 자동 검사의 형식과 동일하게 문자열
+            "responseTime": result["response_time"],
+            "timings": result["timings"]
+        }
+        
+        if result["status_code"] == 0:
+            logger.error(f"헤더 정보 가져오기 실패: {url}, 오류: {result['status_text']}")
+            response_data["error"] = result["status_text"]
         
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            try:
-                # HEAD 요청으로 헤더 정보 얻기
-                async with session.head(url) as head_response:
-                    end_time = time.time()
-                    response_time = round((end_time - start_time) * 1000, 2)  # ms 단위로 변환
-                    
-                    # 응답 헤더 가져오기
-                    headers = dict(head_response.headers)
-                    # 헤더값을 문자열로 변환 (자동 검사의 형식과 동일하게)
-                    headers = {k: str(v) for k, v in headers.items()}
-                    
-                    # HEAD 요청이 성공하면 해당 결과 반환
-                    if head_response.status < 400:
-                        return {
-                            "url": url,
-                            "status_code": head_response.status,
-                            "headers": headers,
-                            "responseTime": response_time
-                        }
-                
-                # HEAD 요청이 실패하면(4xx, 5xx 응답) GET 요청 시도
-                start_time = time.time()
-                async with session.get(url, allow_redirects=True) as get_response:
-                    end_time = time.time()
-                    response_time = round((end_time - start_time) * 1000, 2)
-                    
-                    # 응답 헤더 가져오기
-                    headers = dict(get_response.headers)
-                    # 헤더값을 문자열로 변환 (자동 검사의 형식과 동일하게)
-                    headers = {k: str(v) for k, v in headers.items()}
-                    
-                    return {
-                        "url": url,
-                        "status_code": get_response.status,
-                        "headers": headers,
-                        "responseTime": response_time
-                    }
-            except asyncio.TimeoutError:
-                logger.warning(f"요청 타임아웃: {url}")
-                return {
-                    "url": url,
-                    "status_code": 408,
-                    "headers": {},
-                    "responseTime": 5000  # 5초 타임아웃
-                }
-            except Exception as e:
-                logger.error(f"헤더 정보 가져오기 실패: {url}, 오류: {str(e)}")
-                return {
-                    "url": url,
-                    "status_code": 0,
-                    "headers": {},
-                    "responseTime": 0,
-                    "error": str(e)
-                }
+        return response_data
     except Exception as e:
         logger.error(f"프록시 헤더 API 오류: {str(e)}")
         raise HTTPException(
@@ -281,29 +250,17 @@ async def inspect_all_systems_api(request: Request):
         # 점검 시간으로 문서 이름 생성 (YYYYMMDDHI24MISS 형식)
         document_id = datetime.now().strftime("%Y%m%d%H%M%S")
         
-        # 점검 결과를 저장할 배열
-        inspection_systems = []
-        inspection_responses = []
+        # 모든 시스템 동시 점검 (저장은 하지 않고 결과만 가져옴, 동시 점검 수는 점검 엔진이 조절)
+        inspection_systems = await perform_systems_inspection([system.id for system in systems], "자동", userid)
         
-        # 각 시스템 순차적으로 점검
-        for system in systems:
-            try:
-                # 개별 시스템 점검 수행 (저장은 하지 않고 결과만 가져옴)
-                inspection_data = await perform_system_inspection(system.id, "자동", userid)
-                
-                # 결과 배열에 추가
-                inspection_systems.append(inspection_data)
-                
-                # 응답용 객체 생성
-                for date_field in ['inspection_start', 'inspection_end']:
-                    if isinstance(inspection_data.get(date_field), str):
-                        inspection_data[date_field] = datetime.fromisoformat(inspection_data[date_field])
-                
-                inspection_responses.append(SystemInspectionResponse(**inspection_data))
-            except Exception as e:
-                logger.error(f"시스템 점검 중 오류 발생 (ID: {system.id}): {str(e)}")
-                # 오류가 발생해도 계속 진행
-                continue
+        # 응답용 객체 생성
+        inspection_responses = []
+        for inspection_data in inspection_systems:
+            for date_field in ['inspection_start', 'inspection_end']:
+                if isinstance(inspection_data.get(date_field), str):
+                    inspection_data[date_field] = datetime.fromisoformat(inspection_data[date_field])
+            
+            inspection_responses.append(SystemInspectionResponse(**inspection_data))
         
         # 모든 시스템 점검 결과를 하나의 문서로 저장
         if inspection_systems:
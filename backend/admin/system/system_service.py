@@ -3,12 +3,16 @@ from google.cloud.firestore import CollectionReference
 from .system_model import SystemCreate, SystemResponse, SystemUpdate, SystemInspectionCreate, SystemInspectionUpdate, SystemInspectionResponse, InspectionMenuResult
 from fastapi import HTTPException, status
 import logging
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-import aiohttp
 import asyncio
 import time
+from datetime import datetime
+from typing import List, Optional, Dict, Any
 from google.cloud import firestore
+from probe.probe_service import HTTP_STATUS_TEXT
+from probe.probe_worker import run_probe_system, run_probe_prepare
+from probe.probe_state import load_probe_state, save_probe_state, delete_probe_state, record_probe_results, menu_key
+from probe.probe_schedule import check_queue
+from probe.probe_assertion import is_error_result
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -19,27 +23,14 @@ COLLECTION = "systems"
 # 점검 이력 컬렉션 이름
 INSPECTION_COLLECTION = "inspection_history"
 
+# 전체 점검 마감 후 점검 결과 수신과 점검 상태 저장에 허용하는 시간 (초)
+SWEEP_DEADLINE_GRACE_SECONDS = 5
+
 def get_systems_collection() -> CollectionReference:
     """시스템 컬렉션 참조를 반환합니다."""
     db = get_db()
     return db.collection(COLLECTION)
 
-# HTTP 상태 코드에 대한 한글 설명
-HTTP_STATUS_TEXT = {
-    200: "정상",
-    201: "생성됨",
-    301: "영구 이동",
-    302: "임시 이동",
-    400: "잘못된 요청",
-    401: "인증 실패",
-    403: "접근 금지",
-    404: "찾을 수 없음",
-    500: "서버 내부 오류",
-    502: "게이트웨이 오류",
-    503: "서비스 사용 불가",
-    504: "게이트웨이 시간 초과"
-}
-
 # datetime 객체를 Firestore에 저장 가능한 형식으로 변환
 def _prepare_dict_for_firestore(data: dict) -> dict:
     result = {}
@@ -77,6 +68,9 @@ async def create_system(system_data: SystemCreate) -> SystemResponse:
         # 응답 데이터 구성
         response_data = {**system_dict, "id": new_system_ref.id}
         
+        # 점검 일정에 새 시스템 메뉴 추가
+        check_queue.upsert_system(response_data)
+        
         # ISO 문자열로 변환된 날짜를 다시 datetime 객체로 변환
         if isinstance(response_data.get('created_at'), str):
             response_data['created_at'] = datetime.fromisoformat(response_data['created_at'])
@@ -192,6 +186,9 @@ async def update_system(system_id: str, system_data: SystemUpdate) -> SystemResp
         updated_system = system_ref.get().to_dict()
         updated_system["id"] = system_id
         
+        # 변경된 메뉴/점검 주기를 점검 일정에 반영
+        check_queue.upsert_system(updated_system)
+        
         # ISO 문자열로 변환된 날짜를 다시 datetime 객체로 변환
         for date_field in ['created_at', 'updated_at']:
             if isinstance(updated_system.get(date_field), str):
@@ -231,6 +228,10 @@ async def delete_system(system_id: str) -> bool:
         # 시스템 삭제
         system_ref.delete()
         
+        # 시스템의 점검 상태와 점검 일정 제거
+        await delete_probe_state(system_id)
+        check_queue.remove_system(system_id)
+        
         return True
     except HTTPException:
         raise
@@ -241,8 +242,18 @@ async def delete_system(system_id: str) -> bool:
             detail=f"시스템 삭제 중 오류가 발생했습니다: {str(e)}"
         )
 
-async def perform_system_inspection(system_id: str, inspection_type: str, created_by: str, inspection_results=None) -> Dict[str, Any]:
-    """시스템 URL 연결 상태 점검 수행 함수 (저장하지 않고 결과만 반환)"""
+async def perform_system_inspection(system_id: str, inspection_type: str, created_by: str, inspection_results=None,
+                                    menu_keys: Optional[List[str]] = None,
+                                    deadline: Optional[float] = None, lane: str = "fast",
+                                    system_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    시스템 URL 연결 상태 점검 수행 함수 (저장하지 않고 결과만 반환)
+    
+    menu_keys 가 주어지면 해당 메뉴(점검 예정 시각이 된 메뉴)만 점검합니다.
+    system_data 가 주어지면 시스템 문서를 다시 읽지 않고 사용합니다. (전체 점검에서 미리 읽은 경우)
+    deadline(epoch 초)까지 끝나지 않은 메뉴는 점검을 취소하고 deadline_exceeded 로 기록합니다.
+    lane(fast / slow)에 따라 점검 엔진의 동시 점검 수 제한이 따로 적용됩니다.
+    """
     db = get_db()
     if db is None:
         logger.error("데이터베이스 연결 실패")
@@ -253,18 +264,22 @@ async def perform_system_inspection(system_id: str, inspection_type: str, create
     
     try:
         # 시스템 정보 조회
-        system_ref = db.collection(COLLECTION).document(system_id)
-        system_doc = system_ref.get()
-        
-        if not system_doc.exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"ID {system_id}인 시스템을 찾을 수 없습니다."
-            )
-        
-        system_data = system_doc.to_dict()
+        if system_data is None:
+            system_ref = db.collection(COLLECTION).document(system_id)
+            system_doc = system_ref.get()
+            
+            if not system_doc.exists:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"ID {system_id}인 시스템을 찾을 수 없습니다."
+                )
+            
+            system_data = system_doc.to_dict()
         system_url = system_data.get("url")
         system_menus = system_data.get("menus", [])
+        if menu_keys is not None:
+            system_menus = [menu for menu in system_menus if menu_key(menu.get("path", "")) in menu_keys]
+        system_name = system_data.get("eng_name") or system_id
         
         # 점검 시작 시간 기록
         inspection_start = datetime.now()
@@ -290,60 +305,21 @@ async def perform_system_inspection(system_id: str, inspection_type: str, create
             logger.info(f"수동 점검 결과 사용: {len(inspection_results)}개 메뉴")
             inspection_results_data = inspection_results
         else:
-            # 자동 점검: 각 메뉴별 URL 점검 수행
-            async with aiohttp.ClientSession() as session:
-                for menu in system_menus:
-                    menu_name = menu.get("name", "")
-                    menu_path = menu.get("path", "")
-                    full_url = f"{system_url}{menu_path}"
-                    
-                    try:
-                        start_time = time.time()
-                        async with session.get(full_url, timeout=10) as response:
-                            end_time = time.time()
-                            response_time = round((end_time - start_time) * 1000, 2)  # ms 단위로 변환
-                            
-                            # 응답 헤더 가져오기
-                            headers = dict(response.headers)
-                            # 헤더값을 문자열로 변환
-                            headers = {k: str(v) for k, v in headers.items()}
-                            
-                            # 상태 코드에 대한 한글 설명 추가
-                            status_code = response.status
-                            status_text = HTTP_STATUS_TEXT.get(status_code, f"알 수 없는 상태 ({status_code})")
-                            
-                            menu_result = {
-                                "menu_name": menu_name,
-                                "path": menu_path,
-                                "status_code": status_code,
-                                "status_text": status_text,
-                                "response_time": response_time,
-                                "headers": headers
-                            }
-                            
-                            inspection_results_data.append(menu_result)
-                    
-                    except asyncio.TimeoutError:
-                        menu_result = {
-                            "menu_name": menu_name,
-                            "path": menu_path,
-                            "status_code": 408,
-                            "status_text": "요청 시간 초과",
-                            "response_time": 10000,  # 10초 타임아웃
-                            "headers": {}
-                        }
-                        inspection_results_data.append(menu_result)
-                    
-                    except Exception as e:
-                        menu_result = {
-                            "menu_name": menu_name,
-                            "path": menu_path,
-                            "status_code": 0,
-                            "status_text": f"오류 발생: {str(e)}",
-                            "response_time": 0,
-                            "headers": {}
-                        }
-                        inspection_results_data.append(menu_result)
+            # 자동 점검: 이전 점검의 검증자(ETag/Last-Modified)와 응답 시간 추정값으로 메뉴별 URL 점검 수행
+            # (점검 워커 프로세스가 실행 중이면 워커에서 점검)
+            menu_states = await load_probe_state(system_id)
+            inspection_results_data = await run_probe_system(
+                system_name, system_url, system_menus, menu_states,
+                rate_limit=system_data.get("rate_limit"),
+                max_concurrency=system_data.get("max_concurrency"),
+                deadline=deadline,
+                lane=lane,
+                http2=system_data.get("http2", False)
+            )
+            
+            # 다음 점검에 사용할 검증자/응답 시간 추정값 갱신 및 저장
+            record_probe_results(system_id, inspection_results_data, system_url)
+            await save_probe_state(system_id)
         
         # 점검 종료 시간 기록
         inspection_end = datetime.now()
@@ -367,8 +343,76 @@ async def perform_system_inspection(system_id: str, inspection_type: str, create
             detail=f"시스템 점검 중 오류가 발생했습니다: {str(e)}"
         )
 
-async def save_inspection_history(inspection_systems: List[Dict[str, Any]], document_id: str = None) -> str:
-    """점검 이력을 저장하는 함수"""
+def _get_systems_data(system_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """시스템 문서들을 읽어 시스템 ID -> 문서 데이터로 반환합니다. (읽지 못한 시스템은 제외)"""
+    db = get_db()
+    if db is None:
+        return {}
+    systems_data = {}
+    for system_id in system_ids:
+        try:
+            system_doc = db.collection(COLLECTION).document(system_id).get()
+            if system_doc.exists:
+                systems_data[system_id] = system_doc.to_dict()
+        except Exception as e:
+            logger.warning(f"시스템 조회 실패 (ID: {system_id}): {str(e)}")
+    return systems_data
+
+async def perform_systems_inspection(system_ids: List[str], inspection_type: str, created_by: str,
+                                     menu_keys: Optional[Dict[str, List[str]]] = None,
+                                     deadline: Optional[float] = None, lane: str = "fast",
+                                     warm: bool = False) -> List[Dict[str, Any]]:
+    """
+    여러 시스템을 동시에 점검하여 시스템 순서대로 결과를 반환하는 함수 (전체 점검용, 저장하지 않음)
+
+    동시에 진행되는 메뉴 점검 수는 점검 엔진의 전체 동시 점검 수 제어(AIMD)와 호스트별 제한이 조절합니다.
+    menu_keys(시스템 ID -> 메뉴 키 목록)가 주어지면 시스템별로 해당 메뉴만 점검합니다.
+    deadline(epoch 초)이 주어지면 마감 시각까지 끝나지 않은 메뉴는 취소되어 deadline_exceeded 로 기록되고,
+    마감 후 SWEEP_DEADLINE_GRACE_SECONDS 안에 결과를 만들지 못한 시스템(상태 조회/저장 지연 등)은 결과에서 제외합니다.
+    점검에 실패한 시스템은 로그만 남기고 결과에서 제외합니다.
+
+    점검 전에 시스템 문서를 읽어 점검할 호스트를 한꺼번에 미리 DNS 조회합니다. (run_probe_prepare)
+    warm 이면 호스트마다 연결도 미리 열어 두어 첫 메뉴의 응답 시간에 TCP/TLS 연결 시간이 섞이지 않게 합니다.
+    """
+    systems_data = _get_systems_data(system_ids)
+    if systems_data:
+        summary = await run_probe_prepare([data.get("url", "") for data in systems_data.values()], warm,
+                                          [data.get("url", "") for data in systems_data.values() if data.get("http2")])
+        logger.info(f"점검 대상 호스트 DNS 사전 조회: {summary['resolved']}/{summary['hosts']}개 성공"
+                    + (f", 미리 연결 {summary['warmed']}개" if warm else ""))
+
+    async def inspect(system_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            inspection = perform_system_inspection(
+                system_id, inspection_type, created_by, None,
+                menu_keys=menu_keys.get(system_id) if menu_keys is not None else None,
+                deadline=deadline, lane=lane, system_data=systems_data.get(system_id)
+            )
+            if deadline is None:
+                inspection_data = await inspection
+            else:
+                inspection_data = await asyncio.wait_for(
+                    inspection, max(0.0, deadline - time.time()) + SWEEP_DEADLINE_GRACE_SECONDS
+                )
+            logger.info(f"시스템 '{inspection_data['system_kor_name']}' 점검 완료")
+            return inspection_data
+        except asyncio.TimeoutError:
+            logger.error(f"점검 마감 시각까지 시스템 점검 결과를 만들지 못했습니다 (ID: {system_id})")
+            return None
+        except Exception as e:
+            logger.error(f"시스템 점검 중 오류 발생 (ID: {system_id}): {str(e)}")
+            return None
+
+    results = await asyncio.gather(*(inspect(system_id) for system_id in system_ids))
+    return [inspection_data for inspection_data in results if inspection_data is not None]
+
+async def save_inspection_history(inspection_systems: List[Dict[str, Any]], document_id: str = None,
+                                  shard_id: str = None) -> str:
+    """
+    점검 이력을 저장하는 함수
+    
+    shard_id 가 주어지면 같은 문서 ID 로 저장한 다른 샤드(또는 점검 레인)의 결과와 합쳐 하나의 점검 이력으로 저장합니다.
+    """
     db = get_db()
     if db is None:
         logger.error("데이터베이스 연결 실패")
@@ -384,6 +428,15 @@ async def save_inspection_history(inspection_systems: List[Dict[str, Any]], docu
         
         inspections_ref = db.collection(INSPECTION_COLLECTION).document(document_id)
         
+        if shard_id:
+            # 샤드별 결과를 같은 문서의 inspection_systems 배열에 추가
+            inspections_ref.set({
+                "inspection_systems": firestore.ArrayUnion(inspection_systems),
+                "shards": firestore.ArrayUnion([shard_id]),
+                "created_at": datetime.now(),
+            }, merge=True)
+            return document_id
+        
         # 문서 생성
         inspections_ref.set({
             "inspection_systems": inspection_systems,
@@ -536,8 +589,7 @@ async def get_recent_inspections(limit: int = 5) -> List[Dict[str, Any]]:
                 for system in doc_data["inspection_systems"]:
                     system_normal = True
                     for menu_result in system.get("inspection_results", []):
-                        status_code = menu_result.get("status_code", 0)
-                        if status_code < 200 or status_code >= 400:
+                        if is_error_result(menu_result):
                             system_normal = False
                             break
                     
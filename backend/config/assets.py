@@ -0,0 +1,179 @@
+"""
+URL Check Web 정적 자원 빌드 모듈
+
+frontend/assets 의 파일을 내용 해시가 포함된 파일명으로 복사하고
+.gz / .br 압축본과 manifest.json 을 생성합니다.
+
+빌드 실행:
+    python backend/config/assets.py
+"""
+
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 .gz 압축본만 생성
+    brotli = None
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 기본 경로 설정
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.join(os.path.dirname(BASE_DIR), 'frontend')
+STATIC_DIR = os.path.join(FRONTEND_DIR, 'assets')
+
+# 빌드 결과물 디렉토리 (정적 파일 마운트 기준 상대 경로)
+DIST_PREFIX = "dist"
+DIST_DIR = os.path.join(STATIC_DIR, DIST_PREFIX)
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# 빌드 대상에서 제외할 디렉토리와 확장자
+EXCLUDED_DIRS = {DIST_PREFIX, "scss"}
+EXCLUDED_EXTENSIONS = {".map"}
+
+# 압축본을 생성할 확장자 (이미 압축된 이미지/woff 계열은 제외)
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".json", ".txt", ".ttf", ".eot", ".html"}
+
+# 압축 이득이 이 크기보다 작은 파일은 압축본을 만들지 않음
+MIN_COMPRESS_SIZE = 1024
+
+HASH_LENGTH = 10
+
+# CSS 내부의 url(...) 참조
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+_manifest: Optional[Dict[str, str]] = None
+
+
+def _hashed_name(rel_path: str, content: bytes) -> str:
+    """파일 내용 해시를 파일명에 삽입합니다. (css/app.css -> css/app.1a2b3c4d5e.css)"""
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _rewrite_css_urls(rel_path: str, content: bytes, manifest: Dict[str, str]) -> bytes:
+    """CSS 의 상대 경로 url() 참조를 해시 파일명으로 치환합니다."""
+    css_dir = os.path.dirname(rel_path)
+    text = content.decode("utf-8")
+
+    def replace(match):
+        quote, url = match.group(1), match.group(2)
+        if url.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        # 쿼리/프래그먼트(?#iefix 등)는 유지
+        split_at = min([i for i in (url.find("?"), url.find("#")) if i >= 0], default=len(url))
+        target, suffix = url[:split_at], url[split_at:]
+        target_rel = os.path.normpath(os.path.join(css_dir, target)).replace(os.sep, "/")
+        hashed = manifest.get(target_rel)
+        if not hashed:
+            return match.group(0)
+        new_url = os.path.relpath(hashed, css_dir or ".").replace(os.sep, "/")
+        return f"url({quote}{new_url}{suffix}{quote})"
+
+    return CSS_URL_PATTERN.sub(replace, text).encode("utf-8")
+
+
+def _write_compressed(path: str, content: bytes) -> None:
+    """압축 효과가 있는 경우 .gz / .br 압축본을 생성합니다."""
+    if os.path.splitext(path)[1] not in COMPRESSIBLE_EXTENSIONS or len(content) < MIN_COMPRESS_SIZE:
+        return
+
+    gz_content = gzip.compress(content, compresslevel=9, mtime=0)
+    if len(gz_content) < len(content):
+        with open(f"{path}.gz", "wb") as f:
+            f.write(gz_content)
+
+    if brotli is not None:
+        br_content = brotli.compress(content, quality=11)
+        if len(br_content) < len(content):
+            with open(f"{path}.br", "wb") as f:
+                f.write(br_content)
+
+
+def build_assets() -> Dict[str, str]:
+    """
+    정적 자원을 빌드하고 원본 경로 -> 해시 경로 매핑(manifest)을 반환합니다.
+
+    CSS 는 다른 자원을 참조하므로 나머지 파일을 먼저 처리한 뒤 url() 을 치환하여 해시합니다.
+    """
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR, exist_ok=True)
+
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(STATIC_DIR):
+        if dirpath == STATIC_DIR:
+            dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        for filename in filenames:
+            if os.path.splitext(filename)[1] in EXCLUDED_EXTENSIONS:
+                continue
+            full_path = os.path.join(dirpath, filename)
+            sources.append(os.path.relpath(full_path, STATIC_DIR).replace(os.sep, "/"))
+
+    # CSS 파일은 마지막에 처리
+    sources.sort(key=lambda rel: (rel.endswith(".css"), rel))
+
+    manifest: Dict[str, str] = {}
+    for rel_path in sources:
+        with open(os.path.join(STATIC_DIR, rel_path), "rb") as f:
+            content = f.read()
+
+        if rel_path.endswith(".css"):
+            content = _rewrite_css_urls(rel_path, content, manifest)
+
+        hashed_rel = _hashed_name(rel_path, content)
+        out_path = os.path.join(DIST_DIR, hashed_rel)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, "wb") as f:
+            f.write(content)
+        _write_compressed(out_path, content)
+
+        manifest[rel_path] = hashed_rel
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    logger.info(f"정적 자원 빌드 완료: {len(manifest)}개 파일 -> {DIST_DIR}")
+    return manifest
+
+
+def load_manifest() -> Dict[str, str]:
+    """빌드된 manifest 를 읽습니다. 빌드 결과가 없으면 빈 매핑을 반환합니다."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_PATH, encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            logger.info("정적 자원 manifest 가 없어 원본 경로로 자원을 제공합니다.")
+            _manifest = {}
+    return _manifest
+
+
+def asset_url(path: str) -> str:
+    """
+    템플릿에서 사용할 정적 자원 URL 을 반환합니다.
+
+    빌드된 해시 파일이 있으면 /assets/dist/... 경로를, 없으면 원본 /assets/... 경로를 반환합니다.
+    """
+    rel_path = path.lstrip("/")
+    if rel_path.startswith("assets/"):
+        rel_path = rel_path[len("assets/"):]
+    hashed = load_manifest().get(rel_path)
+    if hashed:
+        return f"/assets/{DIST_PREFIX}/{hashed}"
+    return f"/assets/{rel_path}"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_assets()
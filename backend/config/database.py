@@ -1,8 +1,14 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
+import time
 import logging
 
+from metrics.metrics_service import (
+    current_endpoint, firestore_call_seconds,
+    firestore_documents_read_total, firestore_documents_written_total
+)
+
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
@@ -33,8 +39,104 @@ except Exception as e:
     logger.error(f"Firestore 초기화 중 오류 발생: {e}")
     db = None
 
+# 참조를 반환하므로 결과도 계측 대상으로 감싸는 메서드
+_CHAIN_METHODS = {"collection", "document", "where", "order_by", "limit", "offset", "start_after", "select"}
+# 문서를 읽는 메서드
+_READ_METHODS = {"get", "stream", "get_all"}
+# 문서를 쓰는 메서드
+_WRITE_METHODS = {"set", "update", "delete", "add", "create"}
+
+
+class _InstrumentedRef:
+    """
+    Firestore 클라이언트/컬렉션/문서/쿼리 참조를 감싸 호출 지연 시간과 문서 읽기/쓰기 수를 기록하는 프록시
+
+    그 외 속성 접근은 원본 객체로 그대로 전달합니다.
+    트랜잭션/배치 등 원본 API 에 참조를 넘길 때는 unwrap() 으로 원본 참조를 꺼내 전달합니다.
+    """
+    __slots__ = ("_target",)
+
+    def __init__(self, target):
+        object.__setattr__(self, "_target", target)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in _CHAIN_METHODS:
+            return lambda *args, **kwargs: _InstrumentedRef(attr(*_unwrap_args(args), **_unwrap_kwargs(kwargs)))
+        if name in _READ_METHODS:
+            return self._wrap_read(name, attr)
+        if name in _WRITE_METHODS:
+            return self._wrap_write(name, attr)
+        return attr
+
+    def __eq__(self, other):
+        if isinstance(other, _InstrumentedRef):
+            other = other._target
+        return self._target == other
+
+    def __hash__(self):
+        return hash(self._target)
+
+    @staticmethod
+    def _wrap_read(name, method):
+        def wrapper(*args, **kwargs):
+            endpoint = current_endpoint()
+            start = time.perf_counter()
+            result = method(*_unwrap_args(args), **_unwrap_kwargs(kwargs))
+            if name in ("stream", "get_all"):
+                return _count_stream(result, endpoint, start, name)
+            firestore_call_seconds.observe(time.perf_counter() - start, endpoint, name)
+            # 문서 참조의 get() 은 스냅샷 하나, 쿼리의 get() 은 스냅샷 목록
+            count = len(result) if isinstance(result, list) else 1
+            firestore_documents_read_total.inc(endpoint, amount=count)
+            return result
+        return wrapper
+
+    @staticmethod
+    def _wrap_write(name, method):
+        def wrapper(*args, **kwargs):
+            endpoint = current_endpoint()
+            start = time.perf_counter()
+            result = method(*_unwrap_args(args), **_unwrap_kwargs(kwargs))
+            firestore_call_seconds.observe(time.perf_counter() - start, endpoint, name)
+            firestore_documents_written_total.inc(endpoint)
+            return result
+        return wrapper
+
+
+def unwrap(value):
+    """계측 프록시로 감싼 참조에서 원본 참조를 꺼냅니다. (트랜잭션/배치 등 원본 API 에 넘길 때 사용)"""
+    if isinstance(value, _InstrumentedRef):
+        return value._target
+    if isinstance(value, (list, tuple)):
+        return type(value)(unwrap(item) for item in value)
+    return value
+
+
+def _unwrap_args(args):
+    return tuple(unwrap(arg) for arg in args)
+
+
+def _unwrap_kwargs(kwargs):
+    return {key: unwrap(value) for key, value in kwargs.items()}
+
+
+def _count_stream(documents, endpoint: str, start: float, name: str = "stream"):
+    """stream()/get_all() 결과를 그대로 전달하면서 모두 소비되었을 때 지연 시간과 읽은 문서 수를 기록"""
+    count = 0
+    try:
+        for document in documents:
+            count += 1
+            yield document
+    finally:
+        firestore_call_seconds.observe(time.perf_counter() - start, endpoint, name)
+        firestore_documents_read_total.inc(endpoint, amount=count)
+
+
+_instrumented_db = _InstrumentedRef(db) if db is not None else None
+
 def get_db():
-    """Firestore 클라이언트를 반환하는 함수"""
+    """Firestore 클라이언트를 반환하는 함수 (호출 메트릭 계측 프록시)"""
     if db is None:
         logger.warning("Firestore 클라이언트를 사용할 수 없습니다. 인증 정보를 확인하세요.")
-    return db 
\ No newline at end of file
+    return _instrumented_db 
\ No newline at end of file
@@ -1,7 +1,14 @@
 import os
+import mimetypes
+import anyio
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+from config.assets import DIST_PREFIX, MANIFEST_PATH, asset_url
 
 # 기본 경로 설정
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -9,9 +16,95 @@ FRONTEND_DIR = os.path.join(os.path.dirname(BASE_DIR), 'frontend')
 TEMPLATES_DIR = os.path.join(FRONTEND_DIR, 'view')
 STATIC_DIR = os.path.join(FRONTEND_DIR, 'assets')
 
+# 해시 파일명은 내용이 바뀌면 이름도 바뀌므로 영구 캐시 허용
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 해시가 없는 원본 경로는 매번 ETag 로 재검증
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 선호 순서대로 나열한 사전 압축 인코딩
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# dist 아래에 있지만 해시 파일명이 아니어서 재검증이 필요한 파일
+MANIFEST_FILE = f"{DIST_PREFIX}/{os.path.basename(MANIFEST_PATH)}"
+
 # 템플릿 객체 생성
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
+templates.env.globals["asset_url"] = asset_url
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Accept-Encoding 헤더에서 허용하는 사전 압축 인코딩 집합을 반환합니다.
+
+    q=0 인 인코딩은 제외하며, "*" 는 따로 명시되지 않은 인코딩에 적용합니다. ("*;q=0" 이면 명시된 것만 허용)
+    """
+    qualities = {}
+    for token in accept_encoding.split(","):
+        encoding, *params = [part.strip() for part in token.split(";")]
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[encoding.lower()] = quality
+    wildcard = qualities.get("*", 0.0)
+    return {
+        encoding
+        for encoding, _ in PRECOMPRESSED_ENCODINGS
+        if qualities.get(encoding, wildcard) > 0
+    }
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """빌드 시 생성한 .br/.gz 압축본과 캐시 헤더를 함께 제공하는 정적 파일 앱"""
+
+    async def get_response(self, path: str, scope) -> FileResponse:
+        hashed = path.startswith(f"{DIST_PREFIX}/") and path != MANIFEST_FILE
+        response = None
+
+        if hashed and scope["method"] in ("GET", "HEAD"):
+            response = await self._precompressed_response(path, scope)
+
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if hashed:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers.setdefault("Vary", "Accept-Encoding")
+        else:
+            response.headers.setdefault("Cache-Control", REVALIDATE_CACHE_CONTROL)
+        return response
+
+    async def _precompressed_response(self, path: str, scope):
+        """클라이언트가 허용하는 압축본이 있으면 해당 파일로 응답합니다."""
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if not stat_result:
+                continue
+
+            media_type = mimetypes.guess_type(path)[0] or "text/plain"
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                method=scope["method"],
+                media_type=media_type,
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        return None
+
 
 # 정적 파일 마운트 함수
 def mount_static_files(app):
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR), name="assets")
\ No newline at end of file
+    app.mount("/assets", PrecompressedStaticFiles(directory=STATIC_DIR), name="assets")
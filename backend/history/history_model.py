@@ -5,8 +5,16 @@ from datetime import datetime
 class InspectionResult(BaseModel):
     """개별 메뉴(URL) 점검 결과"""
     url: str
+    probe_type: Optional[str] = None
     status_code: Optional[int] = None
     response_time: Optional[float] = None
+    dns_time: Optional[float] = None
+    timings: Optional[Dict[str, float]] = None
+    error_type: Optional[str] = None
+    attempts: Optional[int] = None
+    assertion: Optional[Dict[str, Any]] = None
+    fingerprint: Optional[str] = None
+    content_changed: Optional[bool] = None
     error_message: Optional[str] = None
     is_error: bool = False
     inspection_date: datetime = Field(default_factory=datetime.now)
@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import List, Optional, Dict
 from google.cloud.firestore import CollectionReference
 from config.database import get_db
+from probe.probe_assertion import is_error_result
 from .history_model import (
     InspectionHistory, 
     InspectionResult,
@@ -72,8 +73,7 @@ async def get_latest_inspection_result(system_id: str) -> Optional[LatestInspect
                     # 점검 결과에서 오류 여부 확인
                     has_error = False
                     for result in system_inspection.get("inspection_results", []):
-                        status_code = result.get("status_code", 0)
-                        if status_code < 200 or status_code >= 400:
+                        if is_error_result(result):
                             has_error = True
                             break
                     
@@ -115,8 +115,7 @@ async def get_system_statistics(system_id: str) -> SystemStatistics:
                     # 점검 결과에서 오류 여부 확인
                     has_error_in_results = False
                     for result in system_inspection.get("inspection_results", []):
-                        status_code = result.get("status_code", 0)
-                        if status_code < 200 or status_code >= 400:
+                        if is_error_result(result):
                             has_error_in_results = True
                             break
                     
@@ -217,15 +216,23 @@ async def get_system_inspection_history(system_id: str) -> List[InspectionHistor
                     
                     for result_data in system_inspection.get("inspection_results", []):
                         status_code = result_data.get("status_code", 0)
-                        is_error = status_code < 200 or status_code >= 400
+                        is_error = is_error_result(result_data)
                         
                         if is_error:
                             has_error = True
                         
                         result = InspectionResult(
                             url=result_data.get("path", ""),
+                            probe_type=result_data.get("probe_type"),
                             status_code=status_code,
                             response_time=result_data.get("response_time"),
+                            dns_time=result_data.get("dns_time"),
+                            timings=result_data.get("timings"),
+                            error_type=result_data.get("error_type"),
+                            attempts=result_data.get("attempts"),
+                            assertion=result_data.get("assertion"),
+                            fingerprint=result_data.get("fingerprint"),
+                            content_changed=result_data.get("content_changed"),
                             error_message=result_data.get("error_message"),
                             is_error=is_error,
                             inspection_date=inspection_date
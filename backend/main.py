@@ -27,6 +27,10 @@ app = FastAPI(
 # 정적 파일 마운트
 mount_static_files(app)
 
+# 요청 처리 시간 메트릭 미들웨어
+from metrics.metrics_router import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
 # CORS 미들웨어 설정 추가
 origins = [
     "http://localhost",         # 일반적인 로컬 개발 환경
@@ -76,10 +80,14 @@ app.include_router(history_router)
 from scheduler.api import router as scheduler_router
 app.include_router(scheduler_router)
 
+# 메트릭 라우터 등록
+from metrics.metrics_router import router as metrics_router
+app.include_router(metrics_router)
+
 # 애플리케이션 시작 이벤트 핸들러
 @app.on_event("startup")
 async def startup_event():
-    # 스케줄러 초기화
+    # 스케줄러 초기화 (리더로 선출된 워커만 점검 워커 프로세스를 시작)
     from scheduler.scheduler import initialize_scheduler
     scheduler = initialize_scheduler()
     if scheduler:
@@ -90,12 +98,18 @@ async def startup_event():
 # 애플리케이션 종료 이벤트 핸들러
 @app.on_event("shutdown")
 async def shutdown_event():
-    # 스케줄러 종료
-    from scheduler.scheduler import get_scheduler
-    scheduler = get_scheduler()
-    if scheduler and scheduler.running:
-        scheduler.shutdown()
-        logger.info("스케줄러가 종료되었습니다.")
+    # 스케줄러 종료 (리더였다면 임대를 반납하여 다른 워커가 바로 이어받게 함)
+    from scheduler.scheduler import shutdown_scheduler
+    shutdown_scheduler()
+    logger.info("스케줄러가 종료되었습니다.")
+
+    # 점검 워커 프로세스 종료 (진행 중인 점검은 마치고 종료)
+    from probe.probe_worker import stop_probe_worker
+    stop_probe_worker()
+
+    # API 프로세스에서 직접 점검할 때 사용한 공유 연결 풀 종료
+    from probe.probe_service import close_probe_connector
+    await close_probe_connector()
 
 if __name__ == "__main__":
     # 시작 시 데이터베이스 연결 확인
@@ -0,0 +1,5 @@
+# metrics 관련 모듈 초기화
+import logging
+
+logger = logging.getLogger(__name__)
+logger.info("metrics 패키지가 초기화되었습니다.")
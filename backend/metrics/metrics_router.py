@@ -0,0 +1,59 @@
+import time
+import logging
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .metrics_service import (
+    render_metrics, bind_request_scope, unbind_request_scope, route_label,
+    http_request_duration_seconds
+)
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 라우터 정의
+router = APIRouter(tags=["메트릭"])
+
+# Prometheus 텍스트 노출 형식
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+# 메트릭 조회 API
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Prometheus 형식의 메트릭을 반환합니다."""
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """
+    라우트별 HTTP 요청 처리 시간을 기록하는 ASGI 미들웨어
+
+    요청 scope 를 컨텍스트에 연결하여 요청 처리 중의 Firestore 호출도 라우트별로 집계되게 합니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        token = bind_request_scope(scope)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration_seconds.observe(
+                time.perf_counter() - start,
+                scope["method"], route_label(scope), status_holder["status"]
+            )
+            unbind_request_scope(token)
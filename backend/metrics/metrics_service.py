@@ -0,0 +1,311 @@
+"""
+URL Check Web 메트릭 모듈
+
+Prometheus 텍스트 형식으로 노출할 카운터/히스토그램/게이지를 제공합니다.
+
+모든 기록은 이벤트 루프 스레드에서 일어나므로 잠금 없이 dict 값만 갱신합니다.
+점검 핫패스에서는 라벨 튜플 조회와 정수 덧셈 외의 비용이 들지 않습니다.
+
+점검 워커 프로세스의 메트릭은 스냅샷(restore)으로 따로 보관하고 출력할 때 이 프로세스의 값과 합칩니다.
+(카운터/히스토그램은 합산, 게이지는 워커 값 우선)
+"""
+
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 기본 지연 시간 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 외부 URL 점검은 타임아웃까지 길어질 수 있으므로 범위를 넓게 잡음
+PROBE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0)
+# 점검 주기 단위 작업(전체 점검, 스케줄 지연)용 버킷
+SWEEP_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 900.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """메트릭 공통 부분 (이름, 설명, 라벨)"""
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, Any] = {}
+        # 다른 프로세스(점검 워커)에서 받은 값
+        self._remote: Dict[Tuple, Any] = {}
+
+    def _key(self, labels: Tuple) -> Tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 메트릭은 라벨 {self.labelnames} 가 필요합니다.")
+        return tuple(str(label) for label in labels)
+
+    def collect(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _merged(self) -> Dict[Tuple, Any]:
+        """이 프로세스의 값과 다른 프로세스에서 받은 값을 합친 값"""
+        if not self._remote:
+            return dict(self._values)
+        merged = dict(self._remote)
+        for key, value in list(self._values.items()):
+            merged[key] = self._combine(value, merged[key]) if key in merged else value
+        return merged
+
+    @staticmethod
+    def _combine(local, remote):
+        return local + remote
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """메트릭 종류별 샘플 줄 목록"""
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, *labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._merged().items()
+        ]
+
+
+class Gauge(_Metric):
+    """현재 값을 나타내는 게이지"""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+
+    def set(self, value: float, *labels) -> None:
+        self._values[self._key(labels)] = value
+
+    @staticmethod
+    def _combine(local, remote):
+        # 점검을 실행하는 워커의 현재 값을 우선
+        return remote
+
+    def get(self, *labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._merged().items()
+        ]
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램 (라벨별로 [버킷 카운트..., +Inf 카운트, 합계] 리스트 하나를 유지)"""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(set(buckets)))
+
+    def observe(self, value: float, *labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # 버킷 카운트 + (+Inf) + 합계
+            state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @staticmethod
+    def _combine(local, remote):
+        return [a + b for a, b in zip(local, remote)]
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, state in self._merged().items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """등록된 메트릭을 모아 Prometheus 텍스트 형식으로 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self, prefix: str) -> Dict[str, Dict]:
+        """이름이 prefix 로 시작하는 메트릭의 현재 값을 복사해 반환합니다. (다른 프로세스로 전달용)"""
+        return {
+            name: {key: list(value) if isinstance(value, list) else value
+                   for key, value in metric._values.items()}
+            for name, metric in self._metrics.items()
+            if name.startswith(prefix)
+        }
+
+    def restore(self, snapshot: Dict[str, Dict]) -> None:
+        """다른 프로세스의 snapshot 을 보관합니다. (이 프로세스의 값은 그대로 두고 출력할 때 합침)"""
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric._remote = values
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# 점검(probe) 메트릭
+probe_latency_seconds = registry.histogram(
+    "urlcheck_probe_latency_seconds", "메뉴 URL 점검 응답 시간", ("system", "menu"), PROBE_BUCKETS)
+probe_results_total = registry.counter(
+    "urlcheck_probe_results_total", "메뉴 URL 점검 결과 수 (상태 코드별)", ("system", "menu", "status_code"))
+probe_body_bytes_total = registry.counter(
+    "urlcheck_probe_body_bytes_total", "점검 중 수신한 응답 본문 바이트 수")
+probe_extra_attempts_total = registry.counter(
+    "urlcheck_probe_extra_attempts_total", "첫 요청 외에 추가로 보낸 점검 요청 수 (retry / hedge / head_fallback)", ("kind",))
+probe_concurrency_limit = registry.gauge(
+    "urlcheck_probe_concurrency_limit", "AIMD 로 조절되는 전체 동시 점검 수 상한 (레인별)", ("lane",))
+probe_in_flight = registry.gauge(
+    "urlcheck_probe_in_flight", "현재 진행 중인 점검 수 (레인별)", ("lane",))
+probe_circuit_rejections_total = registry.counter(
+    "urlcheck_probe_circuit_rejections_total", "회로 차단으로 요청 없이 실패 처리한 메뉴 수", ("host",))
+probe_dns_lookups_total = registry.counter(
+    "urlcheck_probe_dns_lookups_total", "점검 DNS 조회 수 (hit: 캐시 사용, miss: 새로 조회, error: 조회 실패)", ("result",))
+probe_prewarm_connections_total = registry.counter(
+    "urlcheck_probe_prewarm_connections_total", "전체 점검 전에 미리 연결한 수 (ok: 연결 유지, error: 연결 실패)", ("result",))
+probe_connections_opened_total = registry.counter(
+    "urlcheck_probe_connections_opened_total", "점검 중 새로 연 연결 수 (프로토콜별)", ("protocol",))
+probe_deduplicated_total = registry.counter(
+    "urlcheck_probe_deduplicated_total", "같은 URL 을 점검 중인 다른 시스템의 결과를 함께 사용한 메뉴 수")
+probe_deadline_exceeded_total = registry.counter(
+    "urlcheck_probe_deadline_exceeded_total", "전체 점검 마감 시각까지 끝나지 않아 취소한 메뉴 점검 수", ("system",))
+
+# 전체 점검(sweep) 메트릭
+sweep_duration_seconds = registry.histogram(
+    "urlcheck_sweep_duration_seconds", "전체 시스템 점검 소요 시간", (), SWEEP_BUCKETS)
+sweep_overruns_total = registry.counter(
+    "urlcheck_sweep_overruns_total", "점검 주기를 초과한 전체 점검 수")
+
+# Firestore 메트릭
+firestore_call_seconds = registry.histogram(
+    "urlcheck_firestore_call_seconds", "Firestore 호출 지연 시간", ("endpoint", "operation"))
+firestore_documents_read_total = registry.counter(
+    "urlcheck_firestore_documents_read_total", "Firestore 문서 읽기 수", ("endpoint",))
+firestore_documents_written_total = registry.counter(
+    "urlcheck_firestore_documents_written_total", "Firestore 문서 쓰기 수", ("endpoint",))
+
+# HTTP 요청 메트릭
+http_request_duration_seconds = registry.histogram(
+    "urlcheck_http_request_duration_seconds", "HTTP 요청 처리 시간", ("method", "route", "status_code"))
+
+# 스케줄러 메트릭
+scheduler_job_lag_seconds = registry.histogram(
+    "urlcheck_scheduler_job_lag_seconds", "스케줄러 작업의 예정 시각 대비 실행 지연", ("job",), DEFAULT_BUCKETS + SWEEP_BUCKETS)
+sweep_slow_lane_systems = registry.gauge(
+    "urlcheck_sweep_slow_lane_systems", "최근 응답 시간으로 느린 시스템(slow 레인)으로 분류된 시스템 수")
+scheduler_shard_nodes = registry.gauge(
+    "urlcheck_scheduler_shard_nodes", "점검 샤딩에 참여 중인 노드 수")
+
+
+# 현재 처리 중인 HTTP 요청 scope (Firestore 호출을 라우트별로 집계하기 위함)
+_request_scope: ContextVar[Optional[dict]] = ContextVar("metrics_request_scope", default=None)
+# HTTP 요청이 아닌 작업(스케줄러 등)의 이름
+_job_name: ContextVar[str] = ContextVar("metrics_job_name", default="background")
+
+
+def bind_request_scope(scope: dict):
+    """현재 컨텍스트를 HTTP 요청 scope 에 연결합니다. (ContextVar 토큰 반환)"""
+    return _request_scope.set(scope)
+
+
+def unbind_request_scope(token) -> None:
+    """bind_request_scope 로 연결한 요청 scope 를 해제합니다."""
+    _request_scope.reset(token)
+
+
+def bind_job(job_name: str):
+    """현재 컨텍스트를 백그라운드 작업 이름에 연결합니다. (ContextVar 토큰 반환)"""
+    return _job_name.set(job_name)
+
+
+def route_label(scope: dict) -> str:
+    """요청 scope 에서 라우트 템플릿 경로를 구합니다. (라우팅 이후에만 정확함)"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # 마운트된 앱(정적 파일 등)은 마운트 경로로 집계
+    return scope.get("root_path") or "unmatched"
+
+
+def current_endpoint() -> str:
+    """Firestore 호출을 집계할 엔드포인트 라벨을 반환합니다."""
+    scope = _request_scope.get()
+    if scope is not None:
+        return f"{scope.get('method', '')} {route_label(scope)}"
+    return _job_name.get()
+
+
+def render_metrics() -> str:
+    """모든 메트릭을 Prometheus 텍스트 형식으로 반환합니다."""
+    return registry.render()
@@ -0,0 +1,172 @@
+"""
+URL Check Web 본문 검사 모듈
+
+메뉴에 본문 검사(assertion)가 설정되어 있으면 응답 본문을 청크 단위로 받으면서 검사합니다.
+- contains: 본문에 포함되어야 하는 문자열 (UTF-8 바이트로 비교)
+- regex: 본문에서 찾아야 하는 정규식 (UTF-8 바이트로 비교)
+- max_size: 본문 최대 크기 (바이트, Content-Length 가 있으면 본문을 받기 전에 판정)
+
+본문 전체를 메모리에 올리지 않고 청크 사이에 걸친 문자열을 찾을 만큼의 앞 청크 끝부분만 유지합니다.
+정규식은 마지막 PROBE_ASSERTION_REGEX_WINDOW 바이트와 새 청크를 이어서 찾으므로 그보다 긴 일치는 찾지 못할 수 있습니다.
+결과가 정해지면 나머지 본문은 받지 않고 연결을 해제하며,
+PROBE_ASSERTION_MAX_BYTES 까지 읽어도 찾지 못하면 실패로 기록합니다.
+
+검사에 실패한 메뉴는 상태 코드는 그대로 두고 error_type 을 assertion 으로 기록합니다. (is_error_result 로 오류 판정)
+"""
+
+import os
+import re
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 본문 검사 시 읽을 최대 크기 (바이트, max_size 가 더 크면 max_size + 1 까지 읽음)
+PROBE_ASSERTION_MAX_BYTES = int(os.getenv("PROBE_ASSERTION_MAX_BYTES", str(1024 * 1024)))
+# 정규식 검사 시 앞 청크에서 유지할 크기 (바이트)
+PROBE_ASSERTION_REGEX_WINDOW = int(os.getenv("PROBE_ASSERTION_REGEX_WINDOW", "4096"))
+
+
+def is_error_result(result: Dict[str, Any]) -> bool:
+    """메뉴 점검 결과가 오류인지 확인합니다. (2xx/3xx 가 아니거나 본문 검사 실패)"""
+    status_code = result.get("status_code", 0)
+    return status_code < 200 or status_code >= 400 or result.get("error_type") == "assertion"
+
+
+class BodyAssertion:
+    """메뉴의 본문 검사 설정 (메뉴 점검마다 matcher 로 검사 상태를 새로 만듦)"""
+
+    def __init__(self, contains: Optional[str] = None, regex: Optional[str] = None,
+                 max_size: Optional[int] = None):
+        self.contains = contains.encode("utf-8") if contains else None
+        self.regex = regex or None
+        self.max_size = max_size or None
+        self.pattern = None
+        self.error: Optional[str] = None
+        if regex:
+            try:
+                self.pattern = re.compile(regex.encode("utf-8"))
+            except re.error as e:
+                self.error = f"잘못된 정규식: {str(e)}"
+
+    @classmethod
+    def from_menu(cls, menu: Dict[str, Any]) -> Optional["BodyAssertion"]:
+        """메뉴의 assertion 설정으로 본문 검사를 만듭니다. (설정이 없으면 None)"""
+        spec = menu.get("assertion") or {}
+        if not (spec.get("contains") or spec.get("regex") or spec.get("max_size")):
+            return None
+        return cls(spec.get("contains"), spec.get("regex"), spec.get("max_size"))
+
+    @property
+    def key(self) -> Tuple:
+        """같은 검사인지 비교하기 위한 키 (동시 점검 합치기에 사용)"""
+        return (self.contains, self.regex, self.max_size)
+
+    @property
+    def read_limit(self) -> int:
+        """검사를 위해 읽을 최대 본문 크기 (바이트)"""
+        if self.max_size is not None:
+            return max(PROBE_ASSERTION_MAX_BYTES, self.max_size + 1)
+        return PROBE_ASSERTION_MAX_BYTES
+
+    def matcher(self, content_length: Optional[int] = None) -> "BodyMatcher":
+        return BodyMatcher(self, content_length)
+
+
+class BodyMatcher:
+    """응답 하나의 본문 검사 상태 (청크를 받을 때마다 feed 호출)"""
+
+    def __init__(self, assertion: BodyAssertion, content_length: Optional[int] = None):
+        self.assertion = assertion
+        self.received = 0
+        self.passed: Optional[bool] = None
+        self.message: Optional[str] = None
+        self._found_contains = assertion.contains is None
+        self._found_pattern = assertion.pattern is None
+        # 청크 경계에 걸친 일치를 찾기 위해 유지하는 앞 청크 끝부분
+        self._contains_tail = b""
+        self._pattern_window = b""
+        # 본문 크기를 본문 끝까지 받지 않고 확인했는지 여부
+        self._size_checked = assertion.max_size is None
+
+        if assertion.error:
+            self.fail(assertion.error)
+        elif assertion.max_size is not None and content_length is not None:
+            if content_length > assertion.max_size:
+                self.fail(f"본문 크기 {content_length}바이트가 최대 {assertion.max_size}바이트를 초과")
+            else:
+                self._size_checked = True
+                self._decide()
+
+    @property
+    def decided(self) -> bool:
+        return self.passed is not None
+
+    def fail(self, message: str) -> None:
+        if not self.decided:
+            self.passed = False
+            self.message = message
+
+    def _decide(self) -> bool:
+        if not self.decided and self._found_contains and self._found_pattern and self._size_checked:
+            self.passed = True
+        return self.decided
+
+    def feed(self, chunk: bytes) -> bool:
+        """본문 청크 하나를 검사하고 결과가 정해졌는지 반환합니다."""
+        if self.decided:
+            return True
+        self.received += len(chunk)
+        max_size = self.assertion.max_size
+        if max_size is not None and self.received > max_size:
+            self.fail(f"본문 크기가 최대 {max_size}바이트를 초과")
+            return True
+
+        if not self._found_contains:
+            needle = self.assertion.contains
+            data = self._contains_tail + chunk
+            if needle in data:
+                self._found_contains = True
+                self._contains_tail = b""
+            else:
+                self._contains_tail = data[-(len(needle) - 1):] if len(needle) > 1 else b""
+
+        if not self._found_pattern:
+            data = self._pattern_window + chunk
+            if self.assertion.pattern.search(data):
+                self._found_pattern = True
+                self._pattern_window = b""
+            else:
+                self._pattern_window = data[-PROBE_ASSERTION_REGEX_WINDOW:]
+
+        return self._decide()
+
+    def finish(self, complete: bool) -> None:
+        """
+        본문 읽기를 마칩니다.
+
+        Args:
+            complete: 본문을 끝까지 받았는지 여부 (False 면 읽기 한도에 도달)
+        """
+        if complete:
+            self._size_checked = True
+        if self._decide():
+            return
+        missing = []
+        if not self._found_contains:
+            missing.append(f"문자열 '{self.assertion.contains.decode('utf-8', 'replace')}'")
+        if not self._found_pattern:
+            missing.append(f"정규식 '{self.assertion.regex}'")
+        scope = "본문" if complete else f"본문 앞 {self.received}바이트"
+        self.fail(f"{scope}에서 {', '.join(missing)} 을(를) 찾지 못함")
+
+    def apply(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """점검 결과에 본문 검사 결과를 기록합니다."""
+        if not self.decided:
+            self.fail("본문 검사를 마치지 못함")
+        result["assertion"] = {"passed": self.passed, "message": self.message, "bytes_read": self.received}
+        if not self.passed:
+            result["status_text"] = f"본문 검사 실패: {self.message}"
+            result["error_type"] = "assertion"
+        return result
@@ -0,0 +1,107 @@
+"""
+URL Check Web 호스트별 회로 차단기 모듈
+
+한 호스트에서 연결 실패/타임아웃이 PROBE_CIRCUIT_FAILURE_THRESHOLD 번 연속되면 회로를 열고(open),
+같은 호스트의 나머지 메뉴는 요청 없이 바로 실패로 기록합니다.
+PROBE_CIRCUIT_RESET_SECONDS 가 지나면 반개방(half-open) 상태로 한 번만 시험 요청을 보내고,
+시험 요청이 응답을 받으면 회로를 닫고 실패하면 다시 엽니다.
+
+상태 코드와 관계없이 응답을 받았다면 호스트에는 연결된 것이므로 4xx/5xx 는 실패로 세지 않습니다.
+"""
+
+import os
+import time
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+from metrics.metrics_service import probe_circuit_rejections_total
+
+# 회로를 여는 연속 실패 횟수
+PROBE_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("PROBE_CIRCUIT_FAILURE_THRESHOLD", "3"))
+# 회로를 연 뒤 시험 요청을 허용하기까지의 시간 (초)
+PROBE_CIRCUIT_RESET_SECONDS = float(os.getenv("PROBE_CIRCUIT_RESET_SECONDS", "60"))
+
+# 회로 상태
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 회로를 여는 실패 유형 (probe_url 결과의 error_type)
+BREAKER_ERROR_TYPES = ("connection", "timeout")
+
+
+class CircuitBreaker:
+    """호스트 하나의 회로 차단기"""
+
+    __slots__ = ("host", "state", "failures", "opened_at", "trial_in_flight")
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """요청을 보내도 되는지 반환합니다. 반개방 상태에서는 시험 요청 하나만 허용합니다."""
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < PROBE_CIRCUIT_RESET_SECONDS:
+                return False
+            self.state = HALF_OPEN
+            self.trial_in_flight = False
+
+        if self.trial_in_flight:
+            return False
+        self.trial_in_flight = True
+        return True
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """요청 결과를 반영하여 회로 상태를 갱신합니다."""
+        if result.get("error_type") in BREAKER_ERROR_TYPES:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= PROBE_CIRCUIT_FAILURE_THRESHOLD:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+        else:
+            self.state = CLOSED
+            self.failures = 0
+        self.trial_in_flight = False
+
+    def abandon(self) -> None:
+        """요청이 결과 없이 취소되었을 때 호출합니다. (반개방 상태의 시험 요청을 다음 점검에서 다시 보낼 수 있게 함)"""
+        self.trial_in_flight = False
+
+
+# 호스트 -> 회로 차단기
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def host_of(url: str) -> str:
+    """URL 의 호스트(포트 포함)를 반환합니다."""
+    return urlsplit(url).netloc.lower()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """URL 의 호스트에 해당하는 회로 차단기를 반환합니다."""
+    host = host_of(url)
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def circuit_open_result(breaker: CircuitBreaker) -> Dict[str, Any]:
+    """회로가 열려 요청을 보내지 않은 메뉴의 점검 결과"""
+    probe_circuit_rejections_total.inc(breaker.host)
+    return {
+        "status_code": 0,
+        "status_text": f"호스트 연결 불가 (연속 {breaker.failures}회 실패로 점검 생략)",
+        "response_time": 0,
+        "headers": {},
+        "timings": {},
+        "error_type": "circuit_open",
+        "attempts": 0
+    }
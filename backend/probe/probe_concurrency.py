@@ -0,0 +1,144 @@
+"""
+URL Check Web 전체 동시 점검 수 제어 모듈
+
+모든 호스트에 걸친 동시 점검(in-flight) 수를 AIMD(additive increase / multiplicative decrease) 방식으로 조절합니다.
+
+- 점검 결과를 PROBE_AIMD_WINDOW 개씩 모아 창(window) 단위로 판단
+- 창의 연결 오류/타임아웃 비율이 PROBE_AIMD_ERROR_RATE 를 넘거나,
+  응답 시간이 메뉴별 평소 응답 시간(srtt) 대비 PROBE_AIMD_LATENCY_RATIO 배를 넘으면 상한을 절반으로 줄임
+- 그렇지 않으면 상한을 1 늘림
+
+응답 시간은 메뉴별 srtt 로 나눈 비율로 비교하므로 창마다 점검한 호스트 구성이 달라도 판단이 흔들리지 않습니다.
+호스트별 제한(probe_limiter)은 그대로 적용되며, 이 모듈은 로컬 소켓/FD 고갈과 과도한 동시 요청으로
+응답 시간이 부풀려지는 것을 막는 역할을 합니다.
+
+느린 시스템(probe_lanes)은 별도의 제한(slow 레인)을 사용하여 일반 시스템의 동시 점검 자리를 차지하지 않습니다.
+"""
+
+import os
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from metrics.metrics_service import probe_concurrency_limit, probe_in_flight
+
+# 동시 점검 수 초기값/하한/상한
+PROBE_CONCURRENCY_INITIAL = int(os.getenv("PROBE_CONCURRENCY_INITIAL", "10"))
+PROBE_CONCURRENCY_MIN = int(os.getenv("PROBE_CONCURRENCY_MIN", "2"))
+PROBE_CONCURRENCY_MAX = int(os.getenv("PROBE_CONCURRENCY_MAX", "100"))
+# 판단 단위(점검 결과 수)
+PROBE_AIMD_WINDOW = int(os.getenv("PROBE_AIMD_WINDOW", "20"))
+# 상한을 줄이는 기준: 연결 오류/타임아웃 비율, srtt 대비 평균 응답 시간 비율
+PROBE_AIMD_ERROR_RATE = float(os.getenv("PROBE_AIMD_ERROR_RATE", "0.1"))
+PROBE_AIMD_LATENCY_RATIO = float(os.getenv("PROBE_AIMD_LATENCY_RATIO", "2"))
+# slow 레인 동시 점검 수 초기값/상한 (하한은 PROBE_CONCURRENCY_MIN 공통)
+PROBE_SLOW_LANE_CONCURRENCY_INITIAL = int(os.getenv("PROBE_SLOW_LANE_CONCURRENCY_INITIAL", "4"))
+PROBE_SLOW_LANE_CONCURRENCY_MAX = int(os.getenv("PROBE_SLOW_LANE_CONCURRENCY_MAX", "20"))
+# 상한을 줄일 때 곱하는 값
+AIMD_DECREASE_FACTOR = 0.5
+
+
+class AIMDController:
+    """AIMD 방식으로 상한을 조절하는 동시 점검 수 제한"""
+
+    def __init__(self, initial: int = PROBE_CONCURRENCY_INITIAL, minimum: int = PROBE_CONCURRENCY_MIN,
+                 maximum: int = PROBE_CONCURRENCY_MAX, lane: str = "fast"):
+        self.lane = lane
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(maximum, initial)))
+        self.active = 0
+        self._waiters = deque()
+        # 현재 창의 점검 결과 수, 오류 수, srtt 대비 응답 시간 비율 합계와 개수
+        self._count = 0
+        self._errors = 0
+        self._ratio_sum = 0.0
+        self._ratio_count = 0
+        probe_concurrency_limit.set(int(self.limit), self.lane)
+
+    @asynccontextmanager
+    async def slot(self):
+        """상한 안에서 점검 하나를 수행합니다."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        while self.active >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # 자리를 받은 뒤 취소되었으면(마감 시각 초과, 헤지 패자) 받은 자리를 다음 대기자에게 넘김
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.active += 1
+        probe_in_flight.set(self.active, self.lane)
+
+    def _release(self) -> None:
+        self.active -= 1
+        probe_in_flight.set(self.active, self.lane)
+        self._wake()
+
+    def _wake(self) -> None:
+        """비어 있는 자리만큼 대기 중인 점검을 깨웁니다."""
+        free = int(self.limit) - self.active
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def observe(self, result: Dict[str, Any], menu_state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        점검 결과 하나를 반영하고, 창이 차면 상한을 조절합니다.
+
+        Args:
+            result: probe_url 형식의 점검 결과
+            menu_state: 점검 전 메뉴 상태 (srtt 가 있으면 응답 시간 비율 계산에 사용)
+        """
+        error_type = result.get("error_type")
+        if error_type == "circuit_open":
+            return
+
+        self._count += 1
+        if error_type in ("connection", "timeout"):
+            self._errors += 1
+        elif menu_state and menu_state.get("srtt"):
+            self._ratio_sum += result.get("response_time", 0) / menu_state["srtt"]
+            self._ratio_count += 1
+
+        if self._count < PROBE_AIMD_WINDOW:
+            return
+
+        error_rate = self._errors / self._count
+        latency_ratio = self._ratio_sum / self._ratio_count if self._ratio_count else 1.0
+        if error_rate > PROBE_AIMD_ERROR_RATE or latency_ratio > PROBE_AIMD_LATENCY_RATIO:
+            self.limit = max(self.minimum, self.limit * AIMD_DECREASE_FACTOR)
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+            self._wake()
+        probe_concurrency_limit.set(int(self.limit), self.lane)
+
+        self._count = self._errors = self._ratio_count = 0
+        self._ratio_sum = 0.0
+
+
+# 전체 점검에 공유되는 동시 점검 수 제한
+probe_concurrency = AIMDController()
+# 느린 시스템 점검용 동시 점검 수 제한
+slow_lane_concurrency = AIMDController(PROBE_SLOW_LANE_CONCURRENCY_INITIAL, PROBE_CONCURRENCY_MIN,
+                                       PROBE_SLOW_LANE_CONCURRENCY_MAX, lane="slow")
+
+
+def lane_concurrency(lane: str) -> AIMDController:
+    """점검 레인(fast / slow)의 동시 점검 수 제한을 반환합니다."""
+    return slow_lane_concurrency if lane == "slow" else probe_concurrency
@@ -0,0 +1,155 @@
+"""
+URL Check Web 점검 DNS 조회 모듈
+
+aiohttp 기본 resolver 는 getaddrinfo 를 스레드 풀에서 실행하고, 조회 결과는 커넥터(세션)마다 따로 캐시하므로
+시스템마다 세션을 새로 만드는 점검에서는 점검할 때마다 모든 호스트를 다시 조회합니다.
+
+이 모듈의 resolver 는 모든 점검 세션이 공유하며,
+- aiodns(c-ares) 가 설치되어 있으면 이벤트 루프 안에서 비동기로 조회하고 응답의 TTL 만큼 결과를 캐시
+- aiodns 가 없거나 TTL 을 알 수 없으면(hosts 파일 등) PROBE_DNS_DEFAULT_TTL 만큼 캐시
+- 캐시 유지 시간은 PROBE_DNS_MIN_TTL ~ PROBE_DNS_MAX_TTL 로 제한
+- 같은 호스트를 동시에 조회하면 조회 하나로 합침
+
+전체 점검 전에 prefetch 로 점검할 호스트를 한꺼번에 조회해 두면 메뉴 점검에는 캐시된 주소가 사용됩니다.
+조회 실패는 캐시하지 않습니다.
+"""
+
+import os
+import time
+import socket
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from metrics.metrics_service import probe_dns_lookups_total
+
+try:
+    import aiodns
+except ImportError:  # aiodns 미설치 시 getaddrinfo 스레드 풀 사용
+    aiodns = None
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 캐시 유지 시간 (초)
+PROBE_DNS_DEFAULT_TTL = float(os.getenv("PROBE_DNS_DEFAULT_TTL", "300"))
+PROBE_DNS_MIN_TTL = float(os.getenv("PROBE_DNS_MIN_TTL", "30"))
+PROBE_DNS_MAX_TTL = float(os.getenv("PROBE_DNS_MAX_TTL", "3600"))
+# prefetch 조회 하나의 제한 시간 (초)
+PROBE_DNS_PREFETCH_TIMEOUT = float(os.getenv("PROBE_DNS_PREFETCH_TIMEOUT", "5"))
+
+# (주소 체계, 주소)
+_Address = Tuple[int, str]
+# 조회 결과는 숫자 주소이므로 연결 시 다시 조회하지 않게 함
+_NUMERIC_FLAGS = socket.AI_NUMERICHOST | socket.AI_NUMERICSERV
+
+
+class CachingResolver(AbstractResolver):
+    """TTL 만큼 조회 결과를 캐시하는 공유 resolver"""
+
+    def __init__(self):
+        # (호스트, 주소 체계) -> (만료 시각, 주소 목록)
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[_Address]]] = {}
+        self._in_flight: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._resolver = None
+        self._loop = None
+
+    def _get_resolver(self):
+        # aiodns resolver 는 이벤트 루프에 묶이므로 루프가 바뀌면 새로 생성
+        loop = asyncio.get_running_loop()
+        if self._resolver is None or self._loop is not loop:
+            self._resolver = aiodns.DNSResolver()
+            self._loop = loop
+        return self._resolver
+
+    async def resolve(self, host: str, port: int = 0,
+                      family: socket.AddressFamily = socket.AF_INET) -> List[ResolveResult]:
+        key = (host, int(family))
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            probe_dns_lookups_total.inc("hit")
+            addresses = cached[1]
+        else:
+            addresses = await self._lookup_once(key)
+        return [
+            ResolveResult(hostname=host, host=address, port=port, family=address_family,
+                          proto=0, flags=_NUMERIC_FLAGS)
+            for address_family, address in addresses
+        ]
+
+    async def _lookup_once(self, key: Tuple[str, int]) -> List[_Address]:
+        """
+        같은 호스트의 동시 조회를 하나로 합쳐 조회합니다.
+
+        조회는 별도 작업으로 실행하므로 기다리던 요청 하나가 취소되어도 다른 요청의 조회는 계속됩니다.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = self._in_flight[key] = loop.create_task(self._lookup_and_cache(key))
+            task.add_done_callback(lambda done, key=key: self._lookup_done(key, done))
+        else:
+            probe_dns_lookups_total.inc("hit")
+        return await asyncio.shield(task)
+
+    def _lookup_done(self, key: Tuple[str, int], task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # 기다리던 요청이 모두 취소된 경우에도 예외를 읽은 것으로 처리
+        if not task.cancelled():
+            task.exception()
+
+    async def _lookup_and_cache(self, key: Tuple[str, int]) -> List[_Address]:
+        try:
+            addresses, ttl = await self._lookup(*key)
+        except Exception:
+            probe_dns_lookups_total.inc("error")
+            raise
+        probe_dns_lookups_total.inc("miss")
+        ttl = PROBE_DNS_DEFAULT_TTL if ttl is None else ttl
+        self._cache[key] = (time.monotonic() + max(PROBE_DNS_MIN_TTL, min(PROBE_DNS_MAX_TTL, ttl)), addresses)
+        return addresses
+
+    async def _lookup(self, host: str, family: int) -> Tuple[List[_Address], Optional[float]]:
+        """호스트를 조회하여 주소 목록과 TTL(초, 알 수 없으면 None)을 반환합니다."""
+        if aiodns is None:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, 0, type=socket.SOCK_STREAM, family=family)
+            return [(info[0], info[4][0]) for info in infos], None
+
+        try:
+            response = await self._get_resolver().getaddrinfo(host, family=family, port=0, type=socket.SOCK_STREAM)
+        except aiodns.error.DNSError as e:
+            message = e.args[1] if len(e.args) > 1 else "DNS 조회 실패"
+            raise OSError(None, message) from e
+
+        addresses = [(node.family, node.addr[0].decode("ascii")) for node in response.nodes]
+        # TTL 이 0 인 항목(hosts 파일 등)은 TTL 을 알 수 없는 것으로 처리
+        ttls = [node.ttl for node in response.nodes if node.ttl]
+        return addresses, (min(ttls) if ttls else None)
+
+    async def prefetch(self, hosts: Iterable[str], family: socket.AddressFamily = socket.AF_UNSPEC) -> int:
+        """
+        호스트들을 병렬로 미리 조회하여 캐시하고, 조회에 성공한 호스트 수를 반환합니다.
+
+        조회 실패는 메뉴 점검 시 연결 오류로 기록되므로 여기서는 로그만 남깁니다.
+        """
+        async def fetch(host: str) -> bool:
+            try:
+                await asyncio.wait_for(self.resolve(host, 0, family), PROBE_DNS_PREFETCH_TIMEOUT)
+                return True
+            except Exception as e:
+                logger.warning(f"DNS 사전 조회 실패 ({host}): {str(e) or type(e).__name__}")
+                return False
+
+        results = await asyncio.gather(*(fetch(host) for host in set(hosts)))
+        return sum(results)
+
+    async def close(self) -> None:
+        # 모든 점검 세션이 공유하므로 세션을 닫을 때 resolver 는 닫지 않음
+        pass
+
+
+# 모든 점검 세션이 공유하는 resolver
+dns_resolver = CachingResolver()
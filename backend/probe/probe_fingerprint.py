@@ -0,0 +1,53 @@
+"""
+URL Check Web 본문 지문 모듈
+
+점검 중 읽는 응답 본문을 청크마다 해시하여 본문 지문(fingerprint)을 만듭니다.
+본문을 저장하지 않고 지문(수십 바이트)만 메뉴 점검 결과와 점검 상태에 남겨 이전 점검과 내용이 바뀌었는지 확인합니다.
+
+- xxhash 패키지가 설치되어 있으면 xxh3_64, 없으면 hashlib 의 blake2b(8바이트)를 사용
+- 지문 앞에 알고리즘 이름을 붙여 알고리즘이 다른 지문끼리는 비교하지 않음
+- 본문을 읽는 점검(get 방식, 본문 검사)에서만 만들며 추가 요청은 없음
+- get 방식은 본문 앞 PROBE_MAX_BODY_BYTES 까지의 지문이며, 본문 검사가 결과를 정한 뒤 읽기를 멈춘 경우처럼
+  읽은 범위가 매번 달라질 수 있으면 지문을 남기지 않음
+"""
+
+import hashlib
+from typing import Optional
+
+try:
+    import xxhash
+except ImportError:  # xxhash 미설치 시 blake2b 사용
+    xxhash = None
+
+# 지문 알고리즘 이름 (지문 접두어)
+FINGERPRINT_ALGORITHM = "xxh3" if xxhash is not None else "b2b"
+
+
+class BodyFingerprint:
+    """응답 본문 하나의 스트리밍 해시"""
+
+    __slots__ = ("_hasher",)
+
+    def __init__(self):
+        self._hasher = xxhash.xxh3_64() if xxhash is not None else hashlib.blake2b(digest_size=8)
+
+    def update(self, chunk: bytes) -> None:
+        if self._hasher is not None:
+            self._hasher.update(chunk)
+
+    def discard(self) -> None:
+        """읽은 범위가 일정하지 않아 비교할 수 없는 지문은 버림"""
+        self._hasher = None
+
+    def hexdigest(self) -> Optional[str]:
+        """'알고리즘:해시' 형식의 지문 (버린 경우 None)"""
+        if self._hasher is None:
+            return None
+        return f"{FINGERPRINT_ALGORITHM}:{self._hasher.hexdigest()}"
+
+
+def fingerprint_changed(previous: Optional[str], current: Optional[str]) -> Optional[bool]:
+    """이전 지문과 비교하여 내용 변경 여부를 반환합니다. (비교할 수 없으면 None)"""
+    if not previous or not current or previous.split(":", 1)[0] != current.split(":", 1)[0]:
+        return None
+    return previous != current
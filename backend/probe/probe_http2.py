@@ -0,0 +1,124 @@
+"""
+URL Check Web HTTP/2 점검 모듈
+
+시스템 설정(http2)이 켜진 시스템은 HTTPS 메뉴를 HTTP/2 클라이언트(httpx)로 점검합니다.
+같은 호스트의 메뉴 요청이 연결 하나에 다중화되므로 메뉴가 많은 시스템도 연결/TLS 핸드셰이크가 호스트당 한 번으로 줄어듭니다.
+
+다음 경우에는 기존 HTTP/1.1 점검(aiohttp)을 사용합니다.
+- httpx 또는 h2 패키지가 설치되지 않은 경우 (pip install "httpx[http2]")
+- http:// URL (평문 HTTP/2 는 사용하지 않음)
+- 서버가 ALPN 으로 HTTP/2 를 선택하지 않았거나 HTTP/2 프로토콜 오류가 난 호스트 (PROBE_HTTP2_FALLBACK_TTL 동안 HTTP/1.1 사용, 만료 후 HTTP/2 다시 시도)
+
+httpx 는 자체적으로 DNS 를 조회하므로 HTTP/2 점검의 DNS 조회 시간은 connect 구간에 포함됩니다.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+    import h2  # httpx 의 HTTP/2 지원에 필요
+except ImportError:  # 미설치 시 HTTP/1.1 점검 사용
+    httpx = None
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+# httpx 는 요청마다 INFO 로그를 남기므로 경고 이상만 기록
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+HTTP2_AVAILABLE = httpx is not None
+
+# 현재 점검 중인 시스템의 HTTP/2 사용 설정 (probe_system 이 설정, 메뉴 점검 작업에 전달됨)
+_http2_enabled: ContextVar[bool] = ContextVar("probe_http2_enabled", default=False)
+
+# HTTP/2 를 지원하지 않는 것으로 확인된 origin -> 만료 시각 (만료 전까지 HTTP/1.1 사용, 만료 후 HTTP/2 다시 시도)
+# 최대 PROBE_HTTP2_FALLBACK_MAX_ORIGINS 개까지 보관하고 넘치면 오래된 origin 부터 제거
+PROBE_HTTP2_FALLBACK_TTL = float(os.getenv("PROBE_HTTP2_FALLBACK_TTL", "3600"))
+PROBE_HTTP2_FALLBACK_MAX_ORIGINS = int(os.getenv("PROBE_HTTP2_FALLBACK_MAX_ORIGINS", "10000"))
+_http1_origins: Dict[str, float] = {}
+
+# 점검 세션이 공유하는 HTTP/2 클라이언트와 클라이언트를 만든 이벤트 루프
+_client = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_unavailable_logged = False
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def enable_http2(enabled: bool):
+    """현재 컨텍스트(시스템 점검)의 HTTP/2 사용 여부를 설정합니다. (ContextVar 토큰 반환)"""
+    global _unavailable_logged
+    if enabled and not HTTP2_AVAILABLE and not _unavailable_logged:
+        _unavailable_logged = True
+        logger.warning("httpx[http2] 가 설치되지 않아 HTTP/2 점검 대신 HTTP/1.1 로 점검합니다.")
+    return _http2_enabled.set(enabled and HTTP2_AVAILABLE)
+
+
+def reset_http2(token) -> None:
+    _http2_enabled.reset(token)
+
+
+def http2_candidate(url: str) -> bool:
+    """HTTP/2 를 사용하는 시스템이라면 URL 을 HTTP/2 클라이언트로 점검할 수 있는지 확인합니다."""
+    return HTTP2_AVAILABLE and url.startswith("https://") and not _http1_only(origin_of(url))
+
+
+def use_http2(url: str) -> bool:
+    """URL 을 HTTP/2 클라이언트로 점검할지 확인합니다."""
+    return _http2_enabled.get() and http2_candidate(url)
+
+
+def _http1_only(origin: str) -> bool:
+    """HTTP/1.1 로 점검할 origin 인지 확인합니다. (만료된 기록은 제거하여 HTTP/2 를 다시 시도)"""
+    expires_at = _http1_origins.get(origin)
+    if expires_at is None:
+        return False
+    if expires_at <= time.monotonic():
+        del _http1_origins[origin]
+        return False
+    return True
+
+
+def mark_http1(url: str, reason: str) -> None:
+    """origin 을 HTTP/2 미지원으로 기록하여 PROBE_HTTP2_FALLBACK_TTL 동안 HTTP/1.1 을 사용하게 합니다."""
+    origin = origin_of(url)
+    if not _http1_only(origin):
+        logger.info(f"HTTP/2 점검 불가로 HTTP/1.1 로 점검합니다 ({origin}): {reason}")
+    _http1_origins.pop(origin, None)
+    _http1_origins[origin] = time.monotonic() + PROBE_HTTP2_FALLBACK_TTL
+    while len(_http1_origins) > PROBE_HTTP2_FALLBACK_MAX_ORIGINS:
+        del _http1_origins[next(iter(_http1_origins))]
+
+
+def get_http2_client(keepalive_timeout: float):
+    """
+    점검 세션이 공유하는 HTTP/2 클라이언트를 반환합니다.
+
+    동시 요청 수는 점검 엔진의 동시 점검 수 제어와 호스트별 제한이 조절하므로 연결 수 상한을 두지 않습니다.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client_loop = loop
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None,
+                                keepalive_expiry=keepalive_timeout),
+        )
+    return _client
+
+
+async def close_http2_client() -> None:
+    """공유 HTTP/2 클라이언트를 닫습니다."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
@@ -0,0 +1,70 @@
+"""
+URL Check Web 점검 레인 분류 모듈
+
+응답이 계속 느린 소수의 시스템이 전체 점검의 완료 시각과 점검 이력 저장을 늦추지 않도록
+시스템을 최근 응답 시간으로 fast / slow 레인으로 나눕니다.
+
+- 시스템의 응답 시간: 메뉴별 응답 시간 추정값(srtt) 중 가장 큰 값 (타임아웃 backoff 중인 메뉴가 있으면 느린 시스템)
+- SLOW_LANE_LATENCY_MS 이상이면 slow 레인으로 옮기고,
+  SLOW_LANE_LATENCY_MS * SLOW_LANE_RECOVERY_RATIO 미만으로 내려오면 fast 레인으로 되돌림 (경계에서 레인이 계속 바뀌지 않게 함)
+- 점검 상태가 아직 없는 시스템은 fast 레인
+
+분류는 점검 결과로 갱신되는 점검 상태(probe_state)를 그대로 사용하므로 응답 시간이 바뀌면 다음 점검부터 자동으로 반영됩니다.
+slow 레인은 별도의 동시 점검 수 제한(probe_concurrency.slow_lane_concurrency)과 마감 시간으로 점검됩니다.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from metrics.metrics_service import sweep_slow_lane_systems
+from .probe_state import cached_probe_state
+
+# 레인 분리 사용 여부
+SLOW_LANE_ENABLED = os.getenv("SLOW_LANE_ENABLED", "true").lower() == "true"
+# slow 레인으로 옮기는 응답 시간 기준 (ms)
+SLOW_LANE_LATENCY_MS = float(os.getenv("SLOW_LANE_LATENCY_MS", "3000"))
+# fast 레인으로 되돌리는 기준 비율
+SLOW_LANE_RECOVERY_RATIO = float(os.getenv("SLOW_LANE_RECOVERY_RATIO", "0.7"))
+
+FAST_LANE = "fast"
+SLOW_LANE = "slow"
+
+# slow 레인으로 분류된 시스템 ID
+_slow_systems = set()
+
+
+def system_latency(system_id: str) -> Optional[float]:
+    """시스템의 최근 응답 시간(ms)을 반환합니다. (타임아웃 중인 메뉴가 있으면 inf, 점검 상태가 없으면 None)"""
+    latency = None
+    for menu_state in cached_probe_state(system_id).values():
+        if menu_state.get("backoff", 1) > 1:
+            return float("inf")
+        srtt = menu_state.get("srtt")
+        if srtt is not None and (latency is None or srtt > latency):
+            latency = srtt
+    return latency
+
+
+def classify_system(system_id: str) -> str:
+    """시스템의 점검 레인을 정합니다."""
+    if not SLOW_LANE_ENABLED:
+        return FAST_LANE
+
+    latency = system_latency(system_id)
+    if latency is None:
+        _slow_systems.discard(system_id)
+    elif latency >= SLOW_LANE_LATENCY_MS:
+        _slow_systems.add(system_id)
+    elif latency < SLOW_LANE_LATENCY_MS * SLOW_LANE_RECOVERY_RATIO:
+        _slow_systems.discard(system_id)
+    return SLOW_LANE if system_id in _slow_systems else FAST_LANE
+
+
+def split_lanes(due_checks: Dict[str, List[str]]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """점검할 메뉴(시스템 ID -> 메뉴 키 목록)를 fast / slow 레인으로 나눕니다."""
+    fast, slow = {}, {}
+    for system_id, keys in due_checks.items():
+        (slow if classify_system(system_id) == SLOW_LANE else fast)[system_id] = keys
+    sweep_slow_lane_systems.set(len(_slow_systems))
+    return fast, slow
+
@@ -0,0 +1,97 @@
+"""
+URL Check Web 호스트별 요청 제한 모듈
+
+점검 대상 호스트마다 토큰 버킷(초당 요청 수)과 동시 점검 수 상한을 두어
+메뉴를 병렬로 점검하더라도 한 시스템에 요청이 몰리지 않게 합니다.
+
+- 토큰 버킷: 실제 HTTP 요청(재시도, HEAD→GET 대체 포함)마다 토큰 1개 사용
+- 동시 점검 수: 메뉴 점검 하나(재시도 포함)마다 슬롯 1개 사용
+
+제한값은 시스템 문서(systems)의 rate_limit / max_concurrency 로 지정하며,
+지정하지 않으면 PROBE_HOST_RATE_LIMIT / PROBE_HOST_MAX_CONCURRENCY 를 사용합니다.
+같은 호스트를 쓰는 시스템이 여럿이면 마지막으로 점검한 시스템의 설정이 적용됩니다.
+"""
+
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from .probe_circuit import host_of
+
+# 호스트별 기본 초당 요청 수
+PROBE_HOST_RATE_LIMIT = float(os.getenv("PROBE_HOST_RATE_LIMIT", "5"))
+# 호스트별 기본 동시 점검 수
+PROBE_HOST_MAX_CONCURRENCY = int(os.getenv("PROBE_HOST_MAX_CONCURRENCY", "2"))
+
+
+class HostLimiter:
+    """호스트 하나의 토큰 버킷 + 동시 점검 수 제한"""
+
+    def __init__(self, host: str, rate: float = PROBE_HOST_RATE_LIMIT,
+                 max_concurrency: int = PROBE_HOST_MAX_CONCURRENCY):
+        self.host = host
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        # 버킷 크기는 1초 분량 (최소 1)
+        self.tokens = max(1.0, rate)
+        self.updated_at = time.monotonic()
+        self.active = 0
+        self._condition = asyncio.Condition()
+
+    def configure(self, rate: Optional[float] = None, max_concurrency: Optional[int] = None) -> None:
+        """제한값을 변경합니다. None 이면 기본값을 사용합니다."""
+        self.rate = rate if rate and rate > 0 else PROBE_HOST_RATE_LIMIT
+        self.max_concurrency = max_concurrency if max_concurrency and max_concurrency > 0 else PROBE_HOST_MAX_CONCURRENCY
+        self.tokens = min(self.tokens, max(1.0, self.rate))
+
+    async def acquire_token(self) -> None:
+        """요청 하나를 보낼 토큰을 얻을 때까지 대기합니다."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    @asynccontextmanager
+    async def slot(self):
+        """동시 점검 수 상한 안에서 메뉴 점검 하나를 수행합니다."""
+        async with self._condition:
+            try:
+                await self._condition.wait_for(lambda: self.active < self.max_concurrency)
+            except asyncio.CancelledError:
+                # 깨워진 뒤 취소되었으면(마감 시각 초과, 헤지 패자) 빈 자리를 다음 대기자에게 넘김
+                if self.active < self.max_concurrency:
+                    self._condition.notify()
+                raise
+            self.active += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.active -= 1
+                self._condition.notify()
+
+
+# 호스트 -> 요청 제한
+_limiters: Dict[str, HostLimiter] = {}
+
+
+def get_limiter(url: str) -> HostLimiter:
+    """URL 의 호스트에 해당하는 요청 제한을 반환합니다."""
+    host = host_of(url)
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = _limiters[host] = HostLimiter(host)
+    return limiter
+
+
+def configure_host(url: str, rate: Optional[float] = None, max_concurrency: Optional[int] = None) -> HostLimiter:
+    """시스템 설정의 제한값을 URL 호스트에 적용합니다."""
+    limiter = get_limiter(url)
+    limiter.configure(rate, max_concurrency)
+    return limiter
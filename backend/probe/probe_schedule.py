@@ -0,0 +1,272 @@
+"""
+URL Check Web 점검 일정 큐 모듈
+
+메뉴마다 점검 주기가 다를 수 있으므로 (시스템, 메뉴) 단위 점검 예정 시각을 힙(heap)에 보관하고
+예정 시각이 지난 메뉴만 꺼내 점검하게 합니다.
+
+- 점검 주기: 메뉴의 check_interval_minutes > 시스템의 check_interval_minutes > DEFAULT_CHECK_INTERVAL_MINUTES
+- 시스템 생성/수정/삭제 시 system_service 가 upsert_system / remove_system 으로 큐를 바로 갱신
+- 힙 항목은 지연 삭제 방식: 현재 예정 시각(_due)과 다른 항목은 꺼낼 때 버림
+
+모든 메뉴가 같은 순간에 점검되지 않도록 메뉴마다 (시스템 ID, 메뉴 키) 해시로 정한 고정 오프셋을 두고,
+점검 주기 안에서 CHECK_STAGGER_SLOT_SECONDS 단위 구간에 고르게 나눠 배치합니다.
+오프셋은 프로세스와 재시작에 관계없이 같으므로 메뉴별 점검 간격은 점검 주기 그대로 유지됩니다.
+
+점검 주기는 (시스템, 메뉴)별 최근 점검 결과에 따라 메뉴마다 따로 조절됩니다. (record_result)
+점검 작업 한 번은 시스템 메뉴 일부만 점검하므로 메뉴마다 자기 점검 결과로만 배수와 연속 정상 횟수를 셉니다.
+- 오류가 나면 CHECK_CADENCE_ERROR_FACTOR 배로 줄여 장애 확인과 복구 감지를 빠르게 함
+- 복구되면 설정된 주기로 되돌리고, CHECK_CADENCE_SUCCESS_STREAK 번 연속 정상이면
+  CHECK_CADENCE_MAX_FACTOR 배까지 두 배씩 늘림
+
+예정 시각은 벽시계 기준 epoch 초(time.time())입니다.
+"""
+
+import os
+import time
+import heapq
+import hashlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .probe_state import menu_key
+
+# 점검 주기 기본값 (분)
+DEFAULT_CHECK_INTERVAL_MINUTES = int(os.getenv("DEFAULT_CHECK_INTERVAL_MINUTES", "10"))
+# 점검 시각을 나누는 구간 크기 (초, 같은 구간의 메뉴는 한 번에 점검되어 점검 이력 문서 하나로 저장)
+CHECK_STAGGER_SLOT_SECONDS = int(os.getenv("CHECK_STAGGER_SLOT_SECONDS", "30"))
+
+# 적응형 점검 주기 설정
+CHECK_CADENCE_ENABLED = os.getenv("CHECK_CADENCE_ENABLED", "true").lower() == "true"
+CHECK_CADENCE_ERROR_FACTOR = float(os.getenv("CHECK_CADENCE_ERROR_FACTOR", "0.2"))
+CHECK_CADENCE_MAX_FACTOR = float(os.getenv("CHECK_CADENCE_MAX_FACTOR", "4"))
+CHECK_CADENCE_SUCCESS_STREAK = int(os.getenv("CHECK_CADENCE_SUCCESS_STREAK", "6"))
+# 줄어든 점검 주기의 하한 (초)
+CHECK_CADENCE_MIN_INTERVAL_SECONDS = float(os.getenv("CHECK_CADENCE_MIN_INTERVAL_SECONDS", "60"))
+
+# (시스템 ID, 메뉴 키)
+CheckKey = Tuple[str, str]
+
+
+def check_interval_seconds(system: Dict[str, Any], menu: Dict[str, Any]) -> float:
+    """메뉴의 점검 주기(초)를 반환합니다."""
+    minutes = menu.get("check_interval_minutes") or system.get("check_interval_minutes") or DEFAULT_CHECK_INTERVAL_MINUTES
+    return float(minutes) * 60
+
+
+def check_offset(key: CheckKey, interval: float) -> float:
+    """메뉴의 점검 주기 내 고정 오프셋(초)을 (시스템 ID, 메뉴 키) 해시로 계산합니다."""
+    slots = max(1, int(interval // CHECK_STAGGER_SLOT_SECONDS))
+    digest = hashlib.blake2b(f"{key[0]}:{key[1]}".encode(), digest_size=8).digest()
+    return (int.from_bytes(digest, "big") % slots) * CHECK_STAGGER_SLOT_SECONDS
+
+
+def next_check_time(key: CheckKey, interval: float, now: float) -> float:
+    """now 이후 메뉴의 오프셋에 맞는 가장 가까운 점검 시각을 반환합니다."""
+    due = now + (check_offset(key, interval) - now) % interval
+    return due if due > now else due + interval
+
+
+class CheckQueue:
+    """점검 예정 시각 기준 우선순위 큐"""
+
+    def __init__(self):
+        self.loaded = False
+        self._heap: List[Tuple[float, str, str]] = []
+        # 현재 유효한 예정 시각과 점검 주기 (설정된 주기, 적응형 배수를 적용한 주기)
+        self._due: Dict[CheckKey, float] = {}
+        self._base_intervals: Dict[CheckKey, float] = {}
+        self._intervals: Dict[CheckKey, float] = {}
+        # (시스템 ID, 메뉴 키) -> 점검 주기 배수, 연속 정상 횟수
+        self._factors: Dict[CheckKey, float] = {}
+        self._streaks: Dict[CheckKey, int] = {}
+        # 시스템 ID -> 메뉴 키 목록 (시스템 삭제/수정 시 사용)
+        self._system_menus: Dict[str, List[str]] = {}
+        # 가장 이른 예정 시각이 바뀌었을 때 호출 (스케줄러 깨우기)
+        self.on_change: Optional[Callable[[float], None]] = None
+
+    def _push(self, key: CheckKey, due: float) -> None:
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key[0], key[1]))
+
+    def _notify(self) -> None:
+        next_due = self.next_due()
+        if self.on_change and next_due is not None:
+            self.on_change(next_due)
+
+    def load(self, systems: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """
+        전체 시스템으로 큐를 새로 구성합니다. (서버 시작 시)
+
+        재시작할 때마다 모든 메뉴를 한꺼번에 점검하지 않도록 첫 점검은 메뉴별 오프셋 시각으로 잡습니다.
+        """
+        now = now if now is not None else time.time()
+        self._heap.clear()
+        self._due.clear()
+        self._base_intervals.clear()
+        self._intervals.clear()
+        self._system_menus.clear()
+        self._factors.clear()
+        self._streaks.clear()
+        for system in systems:
+            self._set_system(system, now, at_offset=True)
+        self.loaded = True
+        self._notify()
+
+    def upsert_system(self, system: Dict[str, Any], now: Optional[float] = None) -> None:
+        """
+        시스템 생성/수정 내용을 큐에 반영합니다.
+
+        새로 추가된 메뉴는 바로 점검하고, 주기가 바뀐 메뉴는 새 주기의 오프셋 시각으로 다시 예약합니다.
+        """
+        if not self.loaded:
+            return
+        self._set_system(system, now if now is not None else time.time(), at_offset=False)
+        self._notify()
+
+    def sync(self, systems: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """
+        전체 시스템 목록과 큐를 맞춥니다.
+
+        다른 워커가 처리한 시스템 생성/수정/삭제는 이 워커의 큐에 바로 반영되지 않으므로 주기적으로 호출합니다.
+        변경이 없는 메뉴의 예정 시각은 그대로 유지합니다.
+        """
+        if not self.loaded:
+            self.load(systems, now)
+            return
+        now = now if now is not None else time.time()
+        system_ids = set()
+        for system in systems:
+            self._set_system(system, now, at_offset=False)
+            system_ids.add(system["id"])
+        for system_id in set(self._system_menus) - system_ids:
+            self.remove_system(system_id)
+        self._notify()
+
+    def remove_system(self, system_id: str) -> None:
+        """삭제된 시스템의 점검 일정을 제거합니다."""
+        for key in self._system_menus.pop(system_id, []):
+            self._forget((system_id, key))
+
+    def _forget(self, key: CheckKey) -> None:
+        self._due.pop(key, None)
+        self._base_intervals.pop(key, None)
+        self._intervals.pop(key, None)
+        self._factors.pop(key, None)
+        self._streaks.pop(key, None)
+
+    def _effective_interval(self, key: CheckKey, base_interval: float) -> float:
+        factor = self._factors.get(key, 1.0)
+        if factor == 1.0:
+            return base_interval
+        return max(min(CHECK_CADENCE_MIN_INTERVAL_SECONDS, base_interval), base_interval * factor)
+
+    def _set_system(self, system: Dict[str, Any], now: float, at_offset: bool) -> None:
+        system_id = system["id"]
+        menus = system.get("menus") or []
+        keys = []
+        for menu in menus:
+            key = (system_id, menu_key(menu.get("path", "")))
+            base_interval = check_interval_seconds(system, menu)
+            keys.append(key[1])
+
+            if key in self._due and self._base_intervals.get(key) == base_interval:
+                continue
+            interval = self._effective_interval(key, base_interval)
+            if key in self._due or at_offset:
+                due = next_check_time(key, interval, now)
+            else:
+                due = now
+            self._base_intervals[key] = base_interval
+            self._intervals[key] = interval
+            self._push(key, due)
+
+        # 삭제된 메뉴 정리
+        for removed in set(self._system_menus.get(system_id, [])) - set(keys):
+            self._forget((system_id, removed))
+        self._system_menus[system_id] = keys
+
+    def record_result(self, system_id: str, path: str, has_error: bool, now: Optional[float] = None) -> None:
+        """
+        메뉴 점검 결과로 메뉴의 점검 주기 배수를 조절하고, 바뀌었으면 메뉴를 새 주기로 다시 예약합니다.
+
+        점검 작업 실행 시각은 점검 작업이 끝날 때 next_due 로 조정하므로 여기서는 알리지 않습니다.
+        """
+        check_key = (system_id, menu_key(path))
+        if not CHECK_CADENCE_ENABLED or check_key not in self._due:
+            return
+
+        factor = self._factors.get(check_key, 1.0)
+        streak = 0 if has_error else self._streaks.get(check_key, 0) + 1
+        if has_error:
+            new_factor = CHECK_CADENCE_ERROR_FACTOR
+        elif factor < 1.0:
+            # 복구 확인: 설정된 주기로 복귀
+            new_factor, streak = 1.0, 0
+        elif streak >= CHECK_CADENCE_SUCCESS_STREAK:
+            new_factor, streak = min(CHECK_CADENCE_MAX_FACTOR, factor * 2), 0
+        else:
+            new_factor = factor
+        self._streaks[check_key] = streak
+
+        if new_factor == factor:
+            return
+        self._factors[check_key] = new_factor
+
+        interval = self._effective_interval(check_key, self._base_intervals[check_key])
+        if interval != self._intervals[check_key]:
+            self._intervals[check_key] = interval
+            self._push(check_key, next_check_time(check_key, interval, now if now is not None else time.time()))
+
+    def shortest_interval(self, due_checks: Dict[str, List[str]]) -> Optional[float]:
+        """꺼낸 메뉴들에 현재 적용 중인 점검 주기 중 가장 짧은 값(초)을 반환합니다."""
+        intervals = [self._intervals[(system_id, key)]
+                     for system_id, keys in due_checks.items() for key in keys
+                     if (system_id, key) in self._intervals]
+        return min(intervals) if intervals else None
+
+    def next_due(self) -> Optional[float]:
+        """가장 이른 점검 예정 시각을 반환합니다. (없으면 None)"""
+        while self._heap:
+            due, system_id, key = self._heap[0]
+            if self._due.get((system_id, key)) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: Optional[float] = None, busy: Iterable[str] = ()) -> Dict[str, List[str]]:
+        """
+        예정 시각이 지난 메뉴를 꺼내 시스템별 메뉴 키 목록으로 반환하고 다음 점검을 예약합니다.
+
+        다음 예정 시각은 꺼낸 시각 이후 메뉴 오프셋에 맞는 시각이므로 점검이 밀려도 한꺼번에 몰리지 않습니다.
+        busy 의 시스템(이전 점검이 아직 진행 중)은 꺼내지 않고 다음 점검 구간(CHECK_STAGGER_SLOT_SECONDS 뒤)으로 미룹니다.
+        """
+        now = now if now is not None else time.time()
+        busy = set(busy)
+        due_checks: Dict[str, List[str]] = {}
+        rescheduled = []
+        deferred = []
+        while self._heap and self._heap[0][0] <= now:
+            due, system_id, key = heapq.heappop(self._heap)
+            if self._due.get((system_id, key)) != due:
+                continue
+            if system_id in busy:
+                deferred.append((system_id, key))
+                continue
+            due_checks.setdefault(system_id, []).append(key)
+            rescheduled.append((system_id, key))
+
+        for check_key in rescheduled:
+            self._push(check_key, next_check_time(check_key, self._intervals[check_key], now))
+        for check_key in deferred:
+            self._push(check_key, now + CHECK_STAGGER_SLOT_SECONDS)
+        return due_checks
+
+    def pop_all(self, now: Optional[float] = None) -> Dict[str, List[str]]:
+        """모든 메뉴를 바로 점검하도록 꺼내고 다음 점검을 예약합니다. (즉시 점검 API 용)"""
+        now = now if now is not None else time.time()
+        for check_key in list(self._due):
+            self._push(check_key, now)
+        return self.pop_due(now)
+
+
+# 스케줄러와 system_service 가 공유하는 점검 일정 큐
+check_queue = CheckQueue()
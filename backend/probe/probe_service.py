@@ -0,0 +1,907 @@
+"""
+URL Check Web 점검 엔진 모듈
+
+시스템 메뉴 URL 에 HTTP 요청을 보내고 상태 코드, 응답 시간, 헤더, 구간별 소요 시간을 수집합니다.
+시스템 점검(perform_system_inspection)과 헤더 프록시 API(/api/proxy-header)가 함께 사용합니다.
+"""
+
+import os
+import ssl
+import time
+import socket
+import random
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+import aiohttp
+
+from metrics.metrics_service import (
+    probe_latency_seconds, probe_results_total, probe_body_bytes_total, probe_extra_attempts_total,
+    probe_deadline_exceeded_total, probe_deduplicated_total, probe_prewarm_connections_total
+)
+from .probe_tracing import ProbeTimer, create_trace_config, create_httpx_trace
+from .probe_state import conditional_headers, menu_key
+from .probe_timeout import adaptive_timeout, latency_percentile
+from .probe_circuit import get_breaker, circuit_open_result
+from .probe_limiter import get_limiter, configure_host
+from .probe_concurrency import lane_concurrency
+from .probe_dns import dns_resolver
+from .probe_assertion import BodyAssertion, BodyMatcher
+from .probe_fingerprint import BodyFingerprint
+from .probe_http2 import (
+    httpx, enable_http2, reset_http2, use_http2, http2_candidate, mark_http1, get_http2_client, close_http2_client
+)
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 메뉴 점검 기본 타임아웃 (초, 응답 시간 추정값이 쌓이기 전까지 사용)
+DEFAULT_TIMEOUT = 10
+
+# 점검 방식 (메뉴의 probe_type 으로 메뉴마다 지정, 없으면 PROBE_MODE)
+# - tcp: 호스트 포트에 TCP 연결만 맺고 닫음 (HTTP 요청 없음)
+# - tls: TCP 연결 후 TLS 핸드셰이크(인증서 검증 포함)까지만 수행하고 닫음 (HTTP 요청 없음)
+# - head: HEAD 요청 (대상이 HEAD 를 지원하지 않으면 본문 없는 GET 으로 자동 대체, PROBE_MODE=head 또는 메뉴 설정으로 선택)
+# - headers: GET 요청 후 상태/헤더만 읽고 본문은 받지 않은 채 연결 해제
+# - get: GET 요청 후 본문을 최대 PROBE_MAX_BODY_BYTES 까지만 읽음 (기본값, 기존 GET 점검과 같은 상태 판정)
+# tcp/tls 점검은 연결에 성공하면 status_code 200 으로 기록하여 HTTP 점검과 같은 기준으로 집계됩니다.
+PROBE_MODES = ("tcp", "tls", "head", "headers", "get")
+SOCKET_PROBE_MODES = ("tcp", "tls")
+PROBE_MODE = os.getenv("PROBE_MODE", "get")
+
+# get 방식에서 읽을 본문 최대 크기 (바이트)
+PROBE_MAX_BODY_BYTES = int(os.getenv("PROBE_MAX_BODY_BYTES", str(64 * 1024)))
+
+# 본문을 읽을 때 한 번에 읽는 크기
+BODY_CHUNK_SIZE = 16 * 1024
+
+# 점검 세션이 공유하는 연결 풀의 유휴 연결 유지 시간 (초, 미리 연결한 연결이 점검 시작 전에 닫히지 않도록 여유 있게)
+PROBE_KEEPALIVE_TIMEOUT = float(os.getenv("PROBE_KEEPALIVE_TIMEOUT", "30"))
+# 전체 점검 전 미리 연결: 호스트마다 열어 둘 연결 수와 연결 하나의 제한 시간 (초)
+PROBE_PREWARM_CONNECTIONS = int(os.getenv("PROBE_PREWARM_CONNECTIONS", "1"))
+PROBE_PREWARM_TIMEOUT = float(os.getenv("PROBE_PREWARM_TIMEOUT", "3"))
+
+# tls 점검에 사용하는 SSL 컨텍스트 (처음 사용할 때 생성)
+_tls_context: Optional[ssl.SSLContext] = None
+
+# 점검 세션이 공유하는 연결 풀과 연결 풀을 만든 이벤트 루프
+_connector: Optional[aiohttp.TCPConnector] = None
+_connector_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# HEAD 요청이 실패했지만 GET 은 성공한 URL -> 만료 시각 (만료 전까지 바로 GET 사용, 만료 후 HEAD 다시 확인)
+# 최대 PROBE_HEAD_FALLBACK_MAX_URLS 개까지 보관하고 넘치면 오래된 URL 부터 제거
+PROBE_HEAD_FALLBACK_TTL = float(os.getenv("PROBE_HEAD_FALLBACK_TTL", "3600"))
+PROBE_HEAD_FALLBACK_MAX_URLS = int(os.getenv("PROBE_HEAD_FALLBACK_MAX_URLS", "10000"))
+_head_unsupported_urls: Dict[str, float] = {}
+
+# 진행 중인 점검 대상 ((점검 방식, URL, 조건부 요청 헤더, 본문 검사, HTTP/2 사용) -> 결과 Future)
+# 여러 시스템이 같은 URL 을 메뉴로 가지고 있으면 동시에 점검할 때 요청 하나로 합침
+_in_flight: Dict[Tuple[str, str, Tuple, Optional[Tuple], bool], asyncio.Future] = {}
+
+# 재시도 정책 (연결 오류와 5xx 응답만 재시도, 타임아웃은 재시도하지 않음)
+# - PROBE_RETRY_MAX_ATTEMPTS: 첫 요청을 포함한 최대 시도 횟수 (1 이면 재시도 안 함)
+# - PROBE_RETRY_BASE_DELAY / PROBE_RETRY_MAX_DELAY: 지수 backoff 기준/상한 (초, full jitter 적용)
+PROBE_RETRY_MAX_ATTEMPTS = int(os.getenv("PROBE_RETRY_MAX_ATTEMPTS", "3"))
+PROBE_RETRY_BASE_DELAY = float(os.getenv("PROBE_RETRY_BASE_DELAY", "0.2"))
+PROBE_RETRY_MAX_DELAY = float(os.getenv("PROBE_RETRY_MAX_DELAY", "2"))
+
+# 헤지 요청: 응답이 최근 p95(PROBE_HEDGE_PERCENTILE) 를 넘기면 같은 요청을 하나 더 보내 먼저 끝난 결과 사용
+PROBE_HEDGE_ENABLED = os.getenv("PROBE_HEDGE_ENABLED", "false").lower() == "true"
+PROBE_HEDGE_PERCENTILE = float(os.getenv("PROBE_HEDGE_PERCENTILE", "95"))
+
+# HTTP 상태 코드에 대한 한글 설명
+HTTP_STATUS_TEXT = {
+    200: "정상",
+    201: "생성됨",
+    301: "영구 이동",
+    302: "임시 이동",
+    304: "변경 없음",
+    400: "잘못된 요청",
+    401: "인증 실패",
+    403: "접근 금지",
+    404: "찾을 수 없음",
+    500: "서버 내부 오류",
+    502: "게이트웨이 오류",
+    503: "서비스 사용 불가",
+    504: "게이트웨이 시간 초과"
+}
+
+
+def get_probe_connector() -> aiohttp.TCPConnector:
+    """
+    점검 세션이 공유하는 연결 풀을 반환합니다.
+
+    시스템마다 세션을 새로 만들어도 같은 호스트의 연결을 이어서 사용하므로 미리 연결한 연결도 점검에 사용됩니다.
+    동시 연결 수는 점검 엔진의 동시 점검 수 제어(AIMD)와 호스트별 제한이 조절하므로 연결 풀에는 상한을 두지 않습니다.
+    """
+    global _connector, _connector_loop
+    loop = asyncio.get_running_loop()
+    if _connector is None or _connector.closed or _connector_loop is not loop:
+        _connector_loop = loop
+        _connector = aiohttp.TCPConnector(resolver=dns_resolver, use_dns_cache=False, limit=0,
+                                          keepalive_timeout=PROBE_KEEPALIVE_TIMEOUT)
+    return _connector
+
+
+async def close_probe_connector() -> None:
+    """공유 연결 풀과 HTTP/2 클라이언트를 닫습니다. (점검 워커/애플리케이션 종료 시)"""
+    global _connector
+    if _connector is not None and not _connector.closed:
+        await _connector.close()
+    _connector = None
+    await close_http2_client()
+
+
+def create_probe_session(**kwargs) -> aiohttp.ClientSession:
+    """
+    구간별 시간 측정용 TraceConfig 가 연결된 ClientSession 을 생성합니다.
+
+    connector 를 주지 않으면 점검 세션이 공유하는 연결 풀(get_probe_connector)을 사용하며, 세션을 닫아도 연결 풀은 유지됩니다.
+    DNS 조회는 모든 점검 세션이 공유하는 캐시 resolver(probe_dns)를 사용합니다.
+    """
+    if "connector" not in kwargs:
+        kwargs["connector"] = get_probe_connector()
+        kwargs["connector_owner"] = False
+    return aiohttp.ClientSession(trace_configs=[create_trace_config()], **kwargs)
+
+
+async def warm_connections(urls: List[str], connections: int = PROBE_PREWARM_CONNECTIONS,
+                           http2_urls: Sequence[str] = ()) -> int:
+    """
+    URL 의 호스트(origin)마다 연결을 미리 열어 두고, 연결에 성공한 수를 반환합니다.
+
+    origin 에 HEAD 요청을 보내 TCP/TLS 연결을 맺은 뒤 연결을 풀에 반환하므로,
+    점검의 첫 메뉴도 연결 수립 시간 없이 서버 응답 시간만 측정됩니다.
+    - HTTP/1.1: 공유 연결 풀에 호스트 동시 점검 수까지 connections 개의 연결을 동시에 열어 둠
+      (연결마다 요청 토큰은 얻지만 호스트 슬롯은 잡지 않음, 슬롯을 잡으면 요청이 차례로 실행되어 연결 하나만 재사용됨)
+    - HTTP/2(http2_urls 의 HTTPS origin): 요청이 연결 하나에 다중화되므로 공유 HTTP/2 클라이언트에 연결 하나만 열어 둠
+    연결 실패는 메뉴 점검에서 다시 확인되므로 여기서는 로그만 남깁니다.
+    """
+    def origins_of(targets: Sequence[str]) -> set:
+        origins = set()
+        for url in targets:
+            parts = urlsplit(url) if url else None
+            if parts and parts.scheme in ("http", "https") and parts.netloc:
+                origins.add(f"{parts.scheme}://{parts.netloc}/")
+        return origins
+
+    http2_origins = {origin for origin in origins_of(http2_urls) if http2_candidate(origin)}
+    origins = origins_of(urls) - http2_origins
+
+    async def warm(session: aiohttp.ClientSession, origin: str) -> bool:
+        try:
+            await get_limiter(origin).acquire_token()
+            async with session.head(origin, allow_redirects=False,
+                                    timeout=aiohttp.ClientTimeout(total=PROBE_PREWARM_TIMEOUT)):
+                pass
+            probe_prewarm_connections_total.inc("ok")
+            return True
+        except Exception as e:
+            probe_prewarm_connections_total.inc("error")
+            logger.warning(f"미리 연결 실패 ({origin}): {str(e) or type(e).__name__}")
+            return False
+
+    async def warm_http2(origin: str) -> bool:
+        try:
+            await get_limiter(origin).acquire_token()
+            response = await asyncio.wait_for(get_http2_client(PROBE_KEEPALIVE_TIMEOUT).head(origin),
+                                              PROBE_PREWARM_TIMEOUT)
+            if response.http_version != "HTTP/2":
+                mark_http1(origin, f"{response.http_version} 응답")
+            probe_prewarm_connections_total.inc("ok")
+            return True
+        except Exception as e:
+            if isinstance(e, (httpx.RemoteProtocolError, httpx.LocalProtocolError)):
+                mark_http1(origin, str(e) or type(e).__name__)
+            probe_prewarm_connections_total.inc("error")
+            logger.warning(f"HTTP/2 미리 연결 실패 ({origin}): {str(e) or type(e).__name__}")
+            return False
+
+    if not origins and not http2_origins:
+        return 0
+    # 시간 측정이 필요 없으므로 TraceConfig 없이 공유 연결 풀만 사용
+    async with aiohttp.ClientSession(connector=get_probe_connector(), connector_owner=False) as session:
+        results = await asyncio.gather(
+            *(warm(session, origin) for origin in origins
+              for _ in range(max(1, min(connections, get_limiter(origin).max_concurrency)))),
+            *(warm_http2(origin) for origin in http2_origins)
+        )
+    return sum(results)
+
+
+async def prepare_probe_targets(urls: List[str], warm: bool = False,
+                                http2_urls: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    전체 점검 전에 점검할 URL 의 호스트를 병렬로 미리 DNS 조회하고, warm 이면 연결도 미리 열어 둡니다.
+
+    Args:
+        http2_urls: HTTP/2 를 사용하는 시스템의 URL (HTTP/2 클라이언트에 연결을 미리 열어 둠)
+
+    Returns:
+        dict: hosts(호스트 수), resolved(조회 성공 호스트 수), warmed(미리 연결한 수)
+    """
+    hosts = {urlsplit(url).hostname for url in urls if url}
+    hosts.discard(None)
+    resolved = await dns_resolver.prefetch(hosts)
+    warmed = await warm_connections(urls, http2_urls=http2_urls) if warm else 0
+    return {"hosts": len(hosts), "resolved": resolved, "warmed": warmed}
+
+
+def _declared_length(headers) -> Optional[int]:
+    """압축되지 않은 응답의 Content-Length (압축된 응답은 풀린 본문 크기를 알 수 없으므로 None)"""
+    if headers.get("Content-Encoding"):
+        return None
+    try:
+        return int(headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _body_matcher(assertion: Optional[BodyAssertion], method: str, status_code: int,
+                  headers) -> Optional[BodyMatcher]:
+    """본문 검사 상태를 만듭니다. (본문 검사는 본문이 있는 정상 응답(2xx)에만 적용)"""
+    if assertion is None or method == "HEAD" or not 200 <= status_code < 300:
+        return None
+    return assertion.matcher(_declared_length(headers))
+
+
+async def _read_body(response: aiohttp.ClientResponse, max_bytes: int,
+                     matcher: Optional[BodyMatcher] = None,
+                     fingerprint: Optional[BodyFingerprint] = None) -> int:
+    """
+    본문을 최대 max_bytes 까지만 읽고 읽은 바이트 수를 반환합니다.
+
+    matcher 가 주어지면 청크마다 본문 검사를 하고 결과가 정해지면 읽기를 멈춥니다.
+    fingerprint 가 주어지면 읽은 청크로 본문 지문을 만듭니다.
+    한도에 도달하거나 읽기를 멈추면 나머지 본문을 받지 않도록 연결을 닫습니다.
+    """
+    received = 0
+    while received < max_bytes:
+        chunk = await response.content.read(min(BODY_CHUNK_SIZE, max_bytes - received))
+        if not chunk:
+            if matcher is not None:
+                matcher.finish(complete=True)
+            return received
+        received += len(chunk)
+        if fingerprint is not None:
+            fingerprint.update(chunk)
+        if matcher is not None and matcher.feed(chunk):
+            # 검사 결과로 읽기를 멈추면 읽은 범위가 매번 달라질 수 있으므로 지문은 버림
+            if fingerprint is not None and received < max_bytes and not response.content.at_eof():
+                fingerprint.discard()
+            break
+    if matcher is not None:
+        matcher.finish(complete=response.content.at_eof())
+    if not response.content.at_eof():
+        response.close()
+    return received
+
+
+async def probe_url(session: aiohttp.ClientSession, url: str, method: str = "GET",
+                    timeout: float = DEFAULT_TIMEOUT, max_body_bytes: int = 0,
+                    assertion: Optional[BodyAssertion] = None,
+                    **request_kwargs) -> Dict[str, Any]:
+    """
+    URL 하나를 점검합니다.
+
+    HTTP/2 를 사용하는 시스템의 HTTPS URL 은 HTTP/2 클라이언트로 점검하며(probe_http2), 결과 형식은 같습니다.
+
+    Args:
+        max_body_bytes: 읽을 본문 최대 크기. 0 이면 상태/헤더만 읽고 본문은 받지 않고 연결을 해제
+        assertion: 본문 검사 (2xx 응답의 본문을 결과가 정해질 때까지 스트리밍으로 읽으며 검사, probe_assertion)
+
+    Returns:
+        dict: status_code, status_text, response_time(ms, 응답 헤더 수신까지, DNS 조회 제외), dns_time(ms),
+              headers, timings(구간별 ms), assertion(본문 검사 시), fingerprint(2xx 본문을 읽은 경우 본문 지문)
+              연결 오류 시 status_code 0, 타임아웃 시 408 이며 error_type(connection / timeout / error) 포함
+              본문 검사 실패 시 상태 코드는 유지하고 error_type 은 assertion
+    """
+    # 호스트별 초당 요청 수 제한 (대기 시간은 응답 시간에 포함하지 않음)
+    await get_limiter(url).acquire_token()
+
+    if use_http2(url):
+        result = await _probe_url_http2(url, method, timeout, max_body_bytes, assertion, **request_kwargs)
+        # HTTP/2 프로토콜 오류면 HTTP/1.1 로 다시 점검
+        if result is not None:
+            return result
+
+    timer = ProbeTimer()
+    timer.mark_start()
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    try:
+        async with session.request(method, url, timeout=client_timeout,
+                                   trace_request_ctx=timer, **request_kwargs) as response:
+            timer.mark_response_start()
+            response_time = timer.response_time_ms()
+
+            # 응답 헤더 가져오기 (헤더값을 문자열로 변환)
+            headers = {k: str(v) for k, v in response.headers.items()}
+
+            # 상태 코드에 대한 한글 설명 추가
+            status_code = response.status
+            status_text = HTTP_STATUS_TEXT.get(status_code, f"알 수 없는 상태 ({status_code})")
+
+            # 본문 검사 (Content-Length 만으로 결과가 정해지면 본문은 받지 않음)
+            matcher = _body_matcher(assertion, method, status_code, response.headers)
+            if matcher is not None:
+                max_body_bytes = 0 if matcher.decided else assertion.read_limit
+
+            fingerprint = None
+            if max_body_bytes > 0 and method != "HEAD":
+                # 정상 응답(2xx)의 본문은 읽으면서 지문 생성 (이전 점검과 내용 비교용)
+                fingerprint = BodyFingerprint() if 200 <= status_code < 300 else None
+                try:
+                    probe_body_bytes_total.inc(amount=await _read_body(response, max_body_bytes, matcher, fingerprint))
+                except asyncio.TimeoutError:
+                    # 헤더까지 받았으면 상태 판정은 유지하고 본문 구간만 타임아웃 시점까지 기록
+                    if matcher is not None:
+                        matcher.fail("본문 수신 시간 초과")
+                    if fingerprint is not None:
+                        fingerprint.discard()
+                timer.mark_body_end()
+            elif method == "HEAD" or response.content.at_eof():
+                # 받을 본문이 없으면 연결을 풀로 반환
+                response.release()
+            else:
+                # 본문을 받지 않고 연결을 바로 닫음
+                response.close()
+
+            result = {
+                "status_code": status_code,
+                "status_text": status_text,
+                "response_time": response_time,
+                "dns_time": timer.dns_ms(),
+                "headers": headers,
+                "timings": timer.timings()
+            }
+            if fingerprint is not None and fingerprint.hexdigest():
+                result["fingerprint"] = fingerprint.hexdigest()
+            return matcher.apply(result) if matcher is not None else result
+
+    except asyncio.TimeoutError:
+        return {
+            "status_code": 408,
+            "status_text": "요청 시간 초과",
+            "response_time": round(timeout * 1000, 2),
+            "dns_time": timer.dns_ms(),
+            "headers": {},
+            "timings": timer.timings(),
+            "error_type": "timeout"
+        }
+
+    except Exception as e:
+        return {
+            "status_code": 0,
+            "status_text": f"오류 발생: {str(e)}",
+            "response_time": 0,
+            "dns_time": timer.dns_ms(),
+            "headers": {},
+            "timings": timer.timings(),
+            "error_type": "connection" if isinstance(e, (aiohttp.ClientConnectionError, OSError)) else "error"
+        }
+
+
+async def _open_socket(host: str, port: int, tls: bool, timer: ProbeTimer) -> None:
+    """호스트에 TCP 연결(tls 이면 TLS 핸드셰이크까지)을 맺은 뒤 바로 닫고, 단계별 시각을 timer 에 기록합니다."""
+    global _tls_context
+    if tls and _tls_context is None:
+        _tls_context = ssl.create_default_context()
+
+    dns_start = time.perf_counter()
+    addresses = await dns_resolver.resolve(host, port, socket.AF_UNSPEC)
+    timer.dns = time.perf_counter() - dns_start
+
+    # 조회된 주소를 차례로 시도 (aiohttp 와 같이 첫 연결 성공 주소 사용)
+    loop = asyncio.get_running_loop()
+    last_error: Optional[OSError] = None
+    for address in addresses:
+        try:
+            transport, _ = await loop.create_connection(
+                asyncio.Protocol, address["host"], port, family=address["family"],
+                ssl=_tls_context if tls else None, server_hostname=host if tls else None
+            )
+            break
+        except OSError as e:
+            last_error = e
+    else:
+        raise last_error or OSError(None, f"{host} 의 주소를 찾을 수 없습니다.")
+
+    now = time.perf_counter()
+    # connect 구간은 aiohttp 와 같이 DNS 조회를 포함한 시각으로 기록 (timings 에서 DNS 시간을 뺌)
+    timer.connect = now - timer.start
+    timer.connection_ready = now
+    transport.close()
+
+
+async def probe_socket(url: str, tls: bool = False, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    URL 의 호스트/포트에 TCP 연결(tls 이면 TLS 핸드셰이크까지)만 맺어 점검합니다. (probe_url 과 같은 결과 형식)
+
+    연결에 성공하면 status_code 200, response_time 은 연결(+TLS) 완료까지의 시간(ms, DNS 조회 제외)입니다.
+    TLS 인증서 검증 실패는 연결 오류로 기록됩니다.
+    """
+    # 호스트별 초당 요청 수 제한 (대기 시간은 응답 시간에 포함하지 않음)
+    await get_limiter(url).acquire_token()
+
+    parts = urlsplit(url)
+    port = parts.port or (443 if tls or parts.scheme == "https" else 80)
+    timer = ProbeTimer()
+    timer.mark_start()
+
+    try:
+        await asyncio.wait_for(_open_socket(parts.hostname or "", port, tls, timer), timeout)
+        return {
+            "status_code": 200,
+            "status_text": "TLS 연결 성공" if tls else "TCP 연결 성공",
+            "response_time": round((timer.connect - timer.dns) * 1000, 2),
+            "dns_time": timer.dns_ms(),
+            "headers": {},
+            "timings": timer.timings()
+        }
+
+    except asyncio.TimeoutError:
+        return {
+            "status_code": 408,
+            "status_text": "요청 시간 초과",
+            "response_time": round(timeout * 1000, 2),
+            "dns_time": timer.dns_ms(),
+            "headers": {},
+            "timings": timer.timings(),
+            "error_type": "timeout"
+        }
+
+    except Exception as e:
+        return {
+            "status_code": 0,
+            "status_text": f"오류 발생: {str(e)}",
+            "response_time": 0,
+            "dns_time": timer.dns_ms(),
+            "headers": {},
+            "timings": timer.timings(),
+            "error_type": "connection" if isinstance(e, OSError) else "error"
+        }
+
+
+async def _read_body_http2(response, max_bytes: int, matcher: Optional[BodyMatcher] = None,
+                           fingerprint: Optional[BodyFingerprint] = None) -> int:
+    """
+    HTTP/2 응답 본문을 최대 max_bytes 까지만 읽고 읽은 바이트 수를 반환합니다. (나머지는 스트림을 닫아 받지 않음)
+
+    matcher 가 주어지면 청크마다 본문 검사를 하고 결과가 정해지면 읽기를 멈춥니다.
+    fingerprint 가 주어지면 읽은 청크로 본문 지문을 만듭니다.
+    """
+    received = 0
+    async for chunk in response.aiter_bytes(BODY_CHUNK_SIZE):
+        chunk = chunk[:max_bytes - received]
+        received += len(chunk)
+        if fingerprint is not None:
+            fingerprint.update(chunk)
+        if matcher is not None and matcher.feed(chunk):
+            # 검사 결과로 읽기를 멈추면 읽은 범위가 매번 달라질 수 있으므로 지문은 버림 (본문 끝까지 읽은 경우 제외)
+            if fingerprint is not None and received < max_bytes and received != _declared_length(response.headers):
+                fingerprint.discard()
+            return received
+        if received >= max_bytes:
+            if matcher is not None:
+                matcher.finish(complete=False)
+            return received
+    if matcher is not None:
+        matcher.finish(complete=True)
+    return received
+
+
+async def _probe_url_http2(url: str, method: str, timeout: float, max_body_bytes: int,
+                           assertion: Optional[BodyAssertion] = None,
+                           headers: Optional[Dict[str, str]] = None,
+                           allow_redirects: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    공유 HTTP/2 클라이언트로 URL 하나를 점검합니다. (probe_url 과 같은 결과 형식)
+
+    서버가 HTTP/2 를 선택하지 않으면 결과는 그대로 사용하고 이후 점검부터 HTTP/1.1 을 사용하며,
+    HTTP/2 프로토콜 오류가 나면 None 을 반환하여 호출 측이 바로 HTTP/1.1 로 다시 점검하게 합니다.
+    리다이렉트는 aiohttp 의 session.request 와 같이 기본으로 따라가므로 HTTP/1.1 점검과 같은 최종 상태를 기록합니다.
+    """
+    client = get_http2_client(PROBE_KEEPALIVE_TIMEOUT)
+    timer = ProbeTimer()
+    timer.mark_start()
+
+    try:
+        request = client.build_request(method, url, headers=headers, timeout=timeout,
+                                       extensions={"trace": create_httpx_trace(timer)})
+        # httpx 의 timeout 은 단계별 제한이므로 전체 제한 시간은 wait_for 로 적용
+        response = await asyncio.wait_for(client.send(request, stream=True, follow_redirects=allow_redirects),
+                                          timeout)
+        try:
+            timer.mark_response_start()
+            response_time = timer.response_time_ms()
+            if response.http_version != "HTTP/2":
+                mark_http1(url, f"{response.http_version} 응답")
+
+            status_code = response.status_code
+            matcher = _body_matcher(assertion, method, status_code, response.headers)
+            if matcher is not None:
+                max_body_bytes = 0 if matcher.decided else assertion.read_limit
+
+            fingerprint = None
+            if max_body_bytes > 0 and method != "HEAD":
+                fingerprint = BodyFingerprint() if 200 <= status_code < 300 else None
+                try:
+                    remaining = max(0.0, timeout - timer.elapsed_ms() / 1000)
+                    probe_body_bytes_total.inc(amount=await asyncio.wait_for(
+                        _read_body_http2(response, max_body_bytes, matcher, fingerprint), remaining))
+                except (asyncio.TimeoutError, httpx.TimeoutException):
+                    # 헤더까지 받았으면 상태 판정은 유지하고 본문 구간만 타임아웃 시점까지 기록
+                    if matcher is not None:
+                        matcher.fail("본문 수신 시간 초과")
+                    if fingerprint is not None:
+                        fingerprint.discard()
+                timer.mark_body_end()
+        finally:
+            # 본문을 다 받지 않았으면 스트림만 닫음 (연결은 다른 메뉴 요청이 계속 사용)
+            await response.aclose()
+
+        result = {
+            "status_code": status_code,
+            "status_text": HTTP_STATUS_TEXT.get(status_code, f"알 수 없는 상태 ({status_code})"),
+            "response_time": response_time,
+            "dns_time": timer.dns_ms(),
+            "headers": {k: str(v) for k, v in response.headers.items()},
+            "timings": timer.timings()
+        }
+        if fingerprint is not None and fingerprint.hexdigest():
+            result["fingerprint"] = fingerprint.hexdigest()
+        return matcher.apply(result) if matcher is not None else result
+
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        return {
+            "status_code": 408,
+            "status_text": "요청 시간 초과",
+            "response_time": round(timeout * 1000, 2),
+            "dns_time": timer.dns_ms(),
+            "headers": {},
+            "timings": timer.timings(),
+            "error_type": "timeout"
+        }
+
+    except (httpx.RemoteProtocolError, httpx.LocalProtocolError) as e:
+        mark_http1(url, str(e) or type(e).__name__)
+        return None
+
+    except Exception as e:
+        return {
+            "status_code": 0,
+            "status_text": f"오류 발생: {str(e)}",
+            "response_time": 0,
+            "dns_time": timer.dns_ms(),
+            "headers": {},
+            "timings": timer.timings(),
+            "error_type": "connection" if isinstance(e, (httpx.TransportError, OSError)) else "error"
+        }
+
+
+async def probe_menu_url(session: aiohttp.ClientSession, url: str, mode: str = PROBE_MODE,
+                         timeout: float = DEFAULT_TIMEOUT,
+                         request_headers: Optional[Dict[str, str]] = None,
+                         assertion: Optional[BodyAssertion] = None) -> Dict[str, Any]:
+    """
+    점검 방식(mode)에 따라 메뉴 URL 하나를 점검합니다.
+
+    head 방식에서 HEAD 가 4xx/5xx 를 반환하면 본문 없는 GET 으로 다시 확인하고 (결과의 attempts 2),
+    GET 이 성공한 URL 은 PROBE_HEAD_FALLBACK_TTL 동안 이후 점검에서 바로 GET 을 사용합니다.
+    본문 검사(assertion)가 있으면 HTTP 점검 방식과 관계없이 GET 으로 본문을 받으며 검사합니다. (tcp/tls 는 검사 안 함)
+
+    Args:
+        request_headers: 추가 요청 헤더 (If-None-Match / If-Modified-Since 등 조건부 요청 헤더)
+        assertion: 본문 검사 (BodyAssertion.from_menu 결과)
+    """
+    if mode not in PROBE_MODES:
+        logger.warning(f"알 수 없는 점검 방식 '{mode}', headers 방식으로 점검합니다.")
+        mode = "headers"
+
+    if mode in SOCKET_PROBE_MODES:
+        return await probe_socket(url, tls=mode == "tls", timeout=timeout)
+
+    headers = request_headers or None
+
+    if assertion is not None:
+        return await probe_url(session, url, timeout=timeout, assertion=assertion, headers=headers)
+
+    if mode == "get":
+        return await probe_url(session, url, timeout=timeout, max_body_bytes=PROBE_MAX_BODY_BYTES,
+                               headers=headers)
+
+    if mode == "head" and not _head_unsupported(url):
+        result = await probe_url(session, url, method="HEAD", timeout=timeout,
+                                 allow_redirects=True, headers=headers)
+        # 연결 오류/타임아웃은 GET 으로 다시 시도해도 결과가 같으므로 그대로 반환
+        if result["status_code"] < 400 or result["status_code"] in (0, 408):
+            return result
+
+        probe_extra_attempts_total.inc("head_fallback")
+        get_result = await probe_url(session, url, timeout=timeout, headers=headers)
+        if get_result["status_code"] < 400:
+            _mark_head_unsupported(url)
+        return {**get_result, "attempts": 2}
+
+    return await probe_url(session, url, timeout=timeout, headers=headers)
+
+
+async def probe_header_url(url: str, timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    헤더 프록시 API 용으로 URL 하나의 헤더를 가져옵니다.
+
+    자동 점검과 같은 호스트별 요청 제한을 적용하며, HEAD 가 4xx/5xx 를 반환하면 GET 으로 다시 요청합니다.
+    """
+    async with get_limiter(url).slot(), create_probe_session() as session:
+        result = await probe_url(session, url, method="HEAD", timeout=timeout, allow_redirects=False)
+        if result["status_code"] >= 400:
+            result = await probe_url(session, url, method="GET", timeout=timeout, allow_redirects=True)
+    return result
+
+
+def _head_unsupported(url: str) -> bool:
+    """HEAD 대신 GET 으로 점검할 URL 인지 확인합니다. (만료된 기록은 제거하여 HEAD 를 다시 확인)"""
+    expires_at = _head_unsupported_urls.get(url)
+    if expires_at is None:
+        return False
+    if expires_at <= time.monotonic():
+        del _head_unsupported_urls[url]
+        return False
+    return True
+
+
+def _mark_head_unsupported(url: str) -> None:
+    """HEAD 를 지원하지 않는 URL 로 기록합니다. (PROBE_HEAD_FALLBACK_TTL 동안 GET 사용)"""
+    _head_unsupported_urls.pop(url, None)
+    _head_unsupported_urls[url] = time.monotonic() + PROBE_HEAD_FALLBACK_TTL
+    while len(_head_unsupported_urls) > PROBE_HEAD_FALLBACK_MAX_URLS:
+        del _head_unsupported_urls[next(iter(_head_unsupported_urls))]
+
+
+def _is_retryable(result: Dict[str, Any]) -> bool:
+    """재시도 대상(연결 오류, 5xx 응답)인지 확인"""
+    return result.get("error_type") == "connection" or 500 <= result["status_code"] < 600
+
+
+def _retry_delay(attempt: int) -> float:
+    """attempt 번째 재시도 전 대기 시간 (full jitter 지수 backoff)"""
+    return random.uniform(0, min(PROBE_RETRY_MAX_DELAY, PROBE_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
+async def _hedged_probe(session: aiohttp.ClientSession, url: str, hedge_after: Optional[float],
+                        **probe_kwargs) -> Dict[str, Any]:
+    """
+    메뉴 URL 을 점검하고, hedge_after 초 안에 끝나지 않으면 같은 요청을 하나 더 보내
+    먼저 끝난 결과를 사용합니다. 나머지 요청은 취소합니다.
+
+    결과의 attempts 에 점검 시도 횟수(HEAD 대체 GET, 헤지 요청 포함)를 기록합니다.
+    """
+    if hedge_after is None:
+        result = await probe_menu_url(session, url, **probe_kwargs)
+        return {**result, "attempts": result.get("attempts", 1)}
+
+    primary = asyncio.create_task(probe_menu_url(session, url, **probe_kwargs))
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            result = primary.result()
+            return {**result, "attempts": result.get("attempts", 1)}
+
+        probe_extra_attempts_total.inc("hedge")
+        hedge = asyncio.create_task(probe_menu_url(session, url, **probe_kwargs))
+        pending.add(hedge)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                # 실패한 쪽이 먼저 끝났으면 다른 요청의 결과를 기다림
+                if result["status_code"] not in (0, 408) or not pending:
+                    return {**result, "attempts": result.get("attempts", 1) + 1, "hedged": task is hedge}
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def probe_menu_with_policy(session: aiohttp.ClientSession, url: str,
+                                 menu_state: Optional[Dict[str, Any]] = None,
+                                 timeout: float = DEFAULT_TIMEOUT,
+                                 request_headers: Optional[Dict[str, str]] = None,
+                                 mode: str = PROBE_MODE,
+                                 assertion: Optional[BodyAssertion] = None) -> Dict[str, Any]:
+    """
+    재시도/헤지 정책을 적용하여 메뉴 URL 하나를 점검합니다.
+
+    - 연결 오류, 5xx 응답은 최대 PROBE_RETRY_MAX_ATTEMPTS 번까지 jitter 를 적용한 지수 backoff 후 재시도
+    - PROBE_HEDGE_ENABLED 이면 최근 응답 시간의 p95 를 넘긴 요청에 헤지 요청 추가
+
+    결과의 attempts 에 점검 시도 횟수(재시도, 헤지 포함)를 기록합니다.
+    """
+    hedge_after = latency_percentile(menu_state, PROBE_HEDGE_PERCENTILE) if PROBE_HEDGE_ENABLED else None
+    attempts = 0
+    attempt = 0
+    while True:
+        attempt += 1
+        result = await _hedged_probe(session, url, hedge_after, mode=mode, timeout=timeout,
+                                     request_headers=request_headers, assertion=assertion)
+        attempts += result["attempts"]
+        if attempt >= PROBE_RETRY_MAX_ATTEMPTS or not _is_retryable(result):
+            result["attempts"] = attempts
+            return result
+        probe_extra_attempts_total.inc("retry")
+        await asyncio.sleep(_retry_delay(attempt))
+
+
+def deadline_exceeded_result() -> Dict[str, Any]:
+    """전체 점검 마감 시각까지 끝나지 않아 취소한 메뉴의 점검 결과"""
+    return {
+        "status_code": 0,
+        "status_text": "점검 마감 시각 초과 (점검 취소)",
+        "response_time": 0,
+        "headers": {},
+        "timings": {},
+        "error_type": "deadline_exceeded"
+    }
+
+
+def menu_probe_type(menu: Dict[str, Any]) -> str:
+    """메뉴의 점검 방식 (메뉴에 지정되지 않았으면 기본 점검 방식)"""
+    return menu.get("probe_type") or PROBE_MODE
+
+
+def result_probe_type(mode: str, assertion: Optional[BodyAssertion]) -> str:
+    """결과에 기록할 점검 방식 (본문 검사가 있으면 head/headers 방식이어도 GET 으로 점검하므로 get)"""
+    return "get" if assertion is not None and mode not in SOCKET_PROBE_MODES else mode
+
+
+def _record_probe_metrics(system_name: str, menu_result: Dict[str, Any]) -> None:
+    """메뉴 점검 결과를 메트릭에 기록"""
+    menu_path = menu_result["path"]
+    probe_latency_seconds.observe(menu_result["response_time"] / 1000, system_name, menu_path)
+    probe_results_total.inc(system_name, menu_path, menu_result["status_code"])
+
+
+async def probe_system(system_name: str, system_url: str, menus: List[Dict[str, Any]],
+                       menu_states: Optional[Dict[str, Dict[str, Any]]] = None,
+                       timeout: float = DEFAULT_TIMEOUT, rate_limit: Optional[float] = None,
+                       max_concurrency: Optional[int] = None,
+                       on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+                       deadline: Optional[float] = None, lane: str = "fast",
+                       http2: bool = False) -> List[Dict[str, Any]]:
+    """
+    시스템의 메뉴 URL 들을 호스트별 요청 제한과 전체 동시 점검 수(AIMD) 안에서 병렬로 점검하여
+    메뉴 순서대로 결과 목록을 반환합니다.
+
+    메뉴마다 재시도/헤지 정책(probe_menu_with_policy)을 적용하며,
+    호스트 회로 차단기가 열려 있으면 나머지 메뉴는 요청 없이 바로 실패(error_type: circuit_open)로 기록합니다.
+    다른 시스템 점검에서 같은 URL 을 점검 중이면 새로 요청하지 않고 그 결과를 함께 사용합니다.
+    deadline 까지 끝나지 않은 메뉴 점검은 취소하고 실패(error_type: deadline_exceeded)로 기록합니다.
+
+    Args:
+        system_name: 메트릭 라벨로 사용할 시스템 이름
+        system_url: 시스템 URL(도메인)
+        menus: {"name", "path", "probe_type", "assertion"} 메뉴 목록
+               (probe_type 이 없으면 PROBE_MODE 방식으로 점검, assertion 이 있으면 본문 검사)
+        menu_states: 메뉴 키별 점검 상태 (probe_state.load_probe_state 결과, 조건부 요청과 적응형 타임아웃에 사용)
+        timeout: 응답 시간 추정값이 없는 메뉴에 적용할 기본 타임아웃(초)
+        rate_limit: 호스트 초당 최대 요청 수 (시스템 설정, None 이면 기본값)
+        max_concurrency: 호스트 동시 점검 수 상한 (시스템 설정, None 이면 기본값)
+        on_result: 메뉴 점검이 끝날 때마다 (메뉴 순번, 결과) 로 호출 (점검 워커가 결과를 바로 전달할 때 사용)
+        deadline: 전체 점검 마감 시각 (epoch 초, time.time() 기준, None 이면 제한 없음)
+        lane: 점검 레인 (fast / slow, 레인마다 전체 동시 점검 수 제한이 따로 적용됨)
+        http2: HTTPS 메뉴를 HTTP/2 로 점검 (시스템 설정, 지원하지 않으면 HTTP/1.1 로 자동 대체)
+    """
+    menu_states = menu_states or {}
+    limiter = configure_host(system_url, rate_limit, max_concurrency)
+    concurrency = lane_concurrency(lane)
+
+    async def probe_target(session: aiohttp.ClientSession, url: str, menu_state: Optional[Dict[str, Any]],
+                           request_headers: Dict[str, str], mode: str,
+                           assertion: Optional[BodyAssertion]) -> Dict[str, Any]:
+        # 호스트 슬롯을 먼저 얻어 전체 슬롯이 다른 호스트 대기에 묶이지 않게 함
+        async with limiter.slot(), concurrency.slot():
+            # 슬롯을 기다리는 동안 회로가 열렸을 수 있으므로 슬롯을 얻은 뒤 확인
+            breaker = get_breaker(url)
+            if breaker.allow_request():
+                try:
+                    probe_result = await probe_menu_with_policy(session, url, menu_state,
+                                                                timeout=adaptive_timeout(menu_state, timeout),
+                                                                request_headers=request_headers, mode=mode,
+                                                                assertion=assertion)
+                except asyncio.CancelledError:
+                    breaker.abandon()
+                    raise
+                breaker.record(probe_result)
+            else:
+                probe_result = circuit_open_result(breaker)
+        concurrency.observe(probe_result, menu_state)
+        return probe_result
+
+    async def probe_menu(session: aiohttp.ClientSession, index: int, menu: Dict[str, Any]) -> Dict[str, Any]:
+        menu_path = menu.get("path", "")
+        url = f"{system_url}{menu_path}"
+        mode = menu_probe_type(menu)
+        assertion = None if mode in SOCKET_PROBE_MODES else BodyAssertion.from_menu(menu)
+        menu_state = menu_states.get(menu_key(menu_path, result_probe_type(mode, assertion)))
+        # tcp/tls 점검은 HTTP 요청이 없고, 본문 검사는 본문이 필요하므로 조건부 요청 헤더를 쓰지 않음
+        use_conditional = mode not in SOCKET_PROBE_MODES and assertion is None
+        request_headers = conditional_headers(menu_state) if use_conditional else {}
+
+        # 다른 시스템이 같은 대상을 같은 방식/검사로 점검 중이면 그 결과를 함께 사용 (요청/슬롯 사용 없음)
+        # HTTP/2 사용 여부가 다른 시스템끼리는 프로토콜별 응답 시간/결과가 섞이지 않도록 합치지 않음
+        flight_key = (mode, url, tuple(sorted(request_headers.items())), assertion.key if assertion else None,
+                      http2)
+        in_flight = _in_flight.get(flight_key)
+        if in_flight is not None:
+            # 이 메뉴의 점검이 취소되어도 먼저 시작한 점검은 계속되도록 shield 사용
+            try:
+                probe_result = dict(await asyncio.shield(in_flight))
+                probe_deduplicated_total.inc()
+            except asyncio.CancelledError:
+                # 먼저 시작한 점검만 취소되었고(마감 시각이 다른 레인 등) 이 점검은 마감 전이면 직접 점검
+                if not in_flight.cancelled() or (deadline is not None and time.time() >= deadline):
+                    raise
+                probe_result = await probe_target(session, url, menu_state, request_headers, mode, assertion)
+        else:
+            in_flight = _in_flight[flight_key] = asyncio.get_running_loop().create_future()
+            try:
+                probe_result = await probe_target(session, url, menu_state, request_headers, mode, assertion)
+                in_flight.set_result(probe_result)
+            except BaseException:
+                # 함께 기다리던 메뉴도 취소 (마감 시각 초과로 기록됨)
+                in_flight.cancel()
+                raise
+            finally:
+                del _in_flight[flight_key]
+
+        menu_result = {"menu_name": menu.get("name", ""), "path": menu_path,
+                       "probe_type": result_probe_type(mode, assertion), **probe_result}
+        _record_probe_metrics(system_name, menu_result)
+        if on_result:
+            on_result(index, menu_result)
+        return menu_result
+
+    # 메뉴 점검 작업이 HTTP/2 사용 설정을 물려받도록 작업 생성 전에 설정
+    http2_token = enable_http2(http2)
+    try:
+        return await _probe_menus(system_name, menus, probe_menu, on_result, deadline)
+    finally:
+        reset_http2(http2_token)
+
+
+async def _probe_menus(system_name: str, menus: List[Dict[str, Any]], probe_menu,
+                       on_result: Optional[Callable[[int, Dict[str, Any]], None]],
+                       deadline: Optional[float]) -> List[Dict[str, Any]]:
+    """메뉴 점검 작업을 만들어 마감 시각까지 기다리고 메뉴 순서대로 결과를 모읍니다."""
+    async with create_probe_session() as session:
+        tasks = [asyncio.create_task(probe_menu(session, index, menu)) for index, menu in enumerate(menus)]
+        if not tasks:
+            return []
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=None if deadline is None else max(0.0, deadline - time.time()))
+        finally:
+            # 마감 시각을 넘긴 점검(또는 호출 측이 취소된 경우 전체)을 취소하고 슬롯 반납을 기다림
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+        results = []
+        for index, (menu, task) in enumerate(zip(menus, tasks)):
+            if task.cancelled():
+                mode = menu_probe_type(menu)
+                assertion = None if mode in SOCKET_PROBE_MODES else BodyAssertion.from_menu(menu)
+                menu_result = {"menu_name": menu.get("name", ""), "path": menu.get("path", ""),
+                               "probe_type": result_probe_type(mode, assertion), **deadline_exceeded_result()}
+                probe_deadline_exceeded_total.inc(system_name)
+                if on_result:
+                    on_result(index, menu_result)
+            else:
+                menu_result = task.result()
+            results.append(menu_result)
+        if pending:
+            logger.warning(f"점검 마감 시각 초과로 '{system_name}' 메뉴 {len(pending)}개 점검을 취소했습니다.")
+        return results
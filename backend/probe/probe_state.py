@@ -0,0 +1,202 @@
+"""
+URL Check Web 점검 상태 저장 모듈
+
+시스템/메뉴별로 다음 점검에 필요한 상태(ETag / Last-Modified 검증자, 응답 시간 추정값, 본문 지문 등)를 보관합니다.
+상태는 메모리에 캐시하고 변경된 경우에만 Firestore 의 probe_state 컬렉션(시스템당 문서 1개)에 저장합니다.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config.database import get_db
+from .probe_timeout import update_latency
+from .probe_fingerprint import fingerprint_changed
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 점검 상태 컬렉션 이름
+PROBE_STATE_COLLECTION = "probe_state"
+
+# 시스템 ID -> {메뉴 키 -> 메뉴 상태}
+_state_cache: Dict[str, Dict[str, Dict[str, Any]]] = {}
+# 저장이 필요한 시스템 ID
+_dirty_systems = set()
+# 전체 URL -> 메뉴 상태 (헤더 프록시 API 처럼 URL 만 아는 경우 조회용)
+_url_states: Dict[str, Dict[str, Any]] = {}
+
+
+def menu_key(path: str, probe_type: Optional[str] = None) -> str:
+    """
+    메뉴 경로를 상태 맵의 키로 변환합니다. (빈 경로는 Firestore 맵 키로 쓸 수 없으므로 '/' 사용)
+
+    probe_type 이 주어지면 같은 경로라도 점검 방식별로 상태를 따로 둡니다. (tcp 연결 시간이 GET 타임아웃에 섞이지 않도록)
+    get 은 기존에 저장된 상태를 그대로 쓰도록 경로만 키로 사용합니다.
+    """
+    key = path or "/"
+    return key if probe_type in (None, "get") else f"{probe_type}:{key}"
+
+
+async def load_probe_state(system_id: str) -> Dict[str, Dict[str, Any]]:
+    """시스템의 메뉴별 점검 상태를 반환합니다. (최초 1회만 Firestore 에서 읽음)"""
+    state = _state_cache.get(system_id)
+    if state is not None:
+        return state
+
+    state = {}
+    db = get_db()
+    if db is not None:
+        try:
+            state_doc = db.collection(PROBE_STATE_COLLECTION).document(system_id).get()
+            if state_doc.exists:
+                state = state_doc.to_dict().get("menus", {}) or {}
+        except Exception as e:
+            logger.warning(f"점검 상태 조회 실패 (system_id: {system_id}): {str(e)}")
+
+    _state_cache[system_id] = state
+    return state
+
+
+async def save_probe_state(system_id: str) -> None:
+    """변경된 점검 상태를 Firestore 에 저장합니다."""
+    if system_id not in _dirty_systems:
+        return
+
+    db = get_db()
+    if db is None:
+        return
+
+    try:
+        db.collection(PROBE_STATE_COLLECTION).document(system_id).set({
+            "menus": _state_cache.get(system_id, {}),
+            "updated_at": datetime.now(),
+        })
+        _dirty_systems.discard(system_id)
+    except Exception as e:
+        logger.warning(f"점검 상태 저장 실패 (system_id: {system_id}): {str(e)}")
+
+
+async def delete_probe_state(system_id: str) -> None:
+    """삭제된 시스템의 점검 상태를 제거합니다."""
+    for menu_state in (_state_cache.pop(system_id, None) or {}).values():
+        for url in [url for url, state in _url_states.items() if state is menu_state]:
+            del _url_states[url]
+    _dirty_systems.discard(system_id)
+
+    db = get_db()
+    if db is None:
+        return
+
+    try:
+        db.collection(PROBE_STATE_COLLECTION).document(system_id).delete()
+    except Exception as e:
+        logger.warning(f"점검 상태 삭제 실패 (system_id: {system_id}): {str(e)}")
+
+
+def conditional_headers(menu_state: Dict[str, Any]) -> Dict[str, str]:
+    """이전 점검에서 받은 검증자로 조건부 요청 헤더를 만듭니다."""
+    headers = {}
+    if not menu_state:
+        return headers
+    if menu_state.get("etag"):
+        headers["If-None-Match"] = menu_state["etag"]
+    if menu_state.get("last_modified"):
+        headers["If-Modified-Since"] = menu_state["last_modified"]
+    return headers
+
+
+def _update_validators(menu_state: Dict[str, Any], result: Dict[str, Any]) -> bool:
+    """
+    점검 결과로 메뉴의 검증자를 갱신하고 변경 여부를 반환합니다.
+
+    - 2xx: 응답의 ETag / Last-Modified 저장
+    - 304: 응답에 새 검증자가 있을 때만 갱신 (없으면 기존 값 유지)
+    - 그 외(오류, 연결 실패): 오류 페이지 검증자로 재검증하지 않도록 제거
+    """
+    status_code = result.get("status_code", 0)
+    headers = {k.lower(): v for k, v in (result.get("headers") or {}).items()}
+    etag = headers.get("etag")
+    last_modified = headers.get("last-modified")
+
+    if 200 <= status_code < 300:
+        new_values = {"etag": etag, "last_modified": last_modified}
+    elif status_code == 304:
+        new_values = {
+            "etag": etag or menu_state.get("etag"),
+            "last_modified": last_modified or menu_state.get("last_modified"),
+        }
+    else:
+        new_values = {"etag": None, "last_modified": None}
+
+    changed = False
+    for field, value in new_values.items():
+        if menu_state.get(field) != value:
+            if value is None:
+                menu_state.pop(field, None)
+            else:
+                menu_state[field] = value
+            changed = True
+    return changed
+
+
+def _update_fingerprint(menu_state: Dict[str, Any], result: Dict[str, Any]) -> bool:
+    """
+    본문 지문을 이전 점검의 지문과 비교하여 결과에 content_changed 를 기록하고, 저장된 지문의 변경 여부를 반환합니다.
+
+    - 304: 본문이 바뀌지 않았으므로 content_changed False (저장된 지문 유지)
+    - 지문이 없는 결과(본문을 읽지 않는 점검 방식, 오류 응답 등): 기록하지 않고 저장된 지문 유지
+    - 비교할 이전 지문이 없으면 content_changed 를 기록하지 않음 (첫 점검)
+    """
+    if result.get("status_code") == 304:
+        if menu_state.get("fingerprint"):
+            result["content_changed"] = False
+        return False
+
+    fingerprint = result.get("fingerprint")
+    if not fingerprint:
+        return False
+
+    changed = fingerprint_changed(menu_state.get("fingerprint"), fingerprint)
+    if changed is not None:
+        result["content_changed"] = changed
+    if changed:
+        logger.info(f"메뉴 본문 변경 감지: {result.get('path', '')} ({menu_state.get('fingerprint')} -> {fingerprint})")
+    if menu_state.get("fingerprint") == fingerprint:
+        return False
+    menu_state["fingerprint"] = fingerprint
+    return True
+
+
+def record_probe_results(system_id: str, results: List[Dict[str, Any]], system_url: str = "") -> None:
+    """
+    메뉴별 점검 결과를 점검 상태에 반영합니다. (저장은 save_probe_state 에서 수행)
+
+    본문 지문이 이전 점검과 다르면 결과에 content_changed 를 기록합니다.
+    """
+    state = _state_cache.setdefault(system_id, {})
+    for result in results:
+        # 회로 차단으로 요청하지 않았거나 마감 시각 초과로 취소한 메뉴는 이전 상태 유지
+        if result.get("error_type") in ("circuit_open", "deadline_exceeded"):
+            continue
+        menu_path = result.get("path", "")
+        probe_type = result.get("probe_type")
+        menu_state = state.setdefault(menu_key(menu_path, probe_type), {})
+        validators_changed = _update_validators(menu_state, result)
+        latency_changed = update_latency(menu_state, result)
+        fingerprint_updated = _update_fingerprint(menu_state, result)
+        if validators_changed or latency_changed or fingerprint_updated:
+            _dirty_systems.add(system_id)
+        # URL 조회는 HTTP 요청용이므로 tcp/tls 점검 상태는 등록하지 않음
+        if system_url and probe_type not in ("tcp", "tls"):
+            _url_states[f"{system_url}{menu_path}"] = menu_state
+
+
+def cached_probe_state(system_id: str) -> Dict[str, Dict[str, Any]]:
+    """이미 읽어 둔 시스템의 메뉴별 점검 상태를 반환합니다. (Firestore 를 읽지 않으며, 없으면 빈 dict)"""
+    return _state_cache.get(system_id) or {}
+
+
+def find_url_state(url: str) -> Optional[Dict[str, Any]]:
+    """점검한 적이 있는 메뉴 URL 의 상태를 반환합니다."""
+    return _url_states.get(url)
@@ -0,0 +1,105 @@
+"""
+URL Check Web 적응형 타임아웃 모듈
+
+메뉴별 응답 시간의 지수 가중 이동 평균(srtt)과 편차(rttvar)를 추적하여
+TCP 재전송 타임아웃 계산과 같은 방식으로 메뉴별 타임아웃을 정합니다.
+
+    timeout = clamp(PROBE_TIMEOUT_FACTOR * (srtt + 4 * rttvar) * backoff, MIN, MAX)
+
+타임아웃이 나면 backoff 를 두 배로 늘려 실제로 느려진 페이지가 계속 타임아웃되지 않게 하고,
+정상 응답을 받으면 다시 1 로 되돌립니다. 추정값은 점검 상태(probe_state)에 함께 저장됩니다.
+점검마다 상태를 저장하지 않도록 srtt 는 마지막으로 저장을 요청한 값(saved_srtt)보다
+PROBE_STATE_SRTT_TOLERANCE 비율 이상 달라졌을 때만 저장이 필요한 변경으로 봅니다.
+
+헤지 요청(hedged request) 기준이 되는 p95 를 계산하기 위해 최근 응답 시간 LATENCY_WINDOW 개도 보관합니다.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+# 타임아웃 하한/상한 (초)
+PROBE_TIMEOUT_MIN = float(os.getenv("PROBE_TIMEOUT_MIN", "2"))
+PROBE_TIMEOUT_MAX = float(os.getenv("PROBE_TIMEOUT_MAX", "30"))
+# 추정 응답 시간 대비 여유 배수
+PROBE_TIMEOUT_FACTOR = float(os.getenv("PROBE_TIMEOUT_FACTOR", "2"))
+# 추정값을 신뢰하기 위한 최소 표본 수 (그 전에는 기본 타임아웃 사용)
+PROBE_TIMEOUT_MIN_SAMPLES = int(os.getenv("PROBE_TIMEOUT_MIN_SAMPLES", "3"))
+# 점검 상태 저장이 필요한 srtt 변화 비율
+PROBE_STATE_SRTT_TOLERANCE = float(os.getenv("PROBE_STATE_SRTT_TOLERANCE", "0.2"))
+
+# EWMA 가중치 (RFC 6298 권장값)
+SRTT_ALPHA = 0.125
+RTTVAR_BETA = 0.25
+# 타임아웃 시 backoff 상한
+MAX_BACKOFF = 8
+# 백분위 계산용으로 보관하는 최근 응답 시간 개수
+LATENCY_WINDOW = 20
+
+
+def _clamp(value: float) -> float:
+    return max(PROBE_TIMEOUT_MIN, min(PROBE_TIMEOUT_MAX, value))
+
+
+def adaptive_timeout(menu_state: Optional[Dict[str, Any]], default: float) -> float:
+    """메뉴 상태의 응답 시간 추정값으로 타임아웃(초)을 계산합니다. 표본이 부족하면 default 를 사용합니다."""
+    if not menu_state or menu_state.get("samples", 0) < PROBE_TIMEOUT_MIN_SAMPLES:
+        backoff = (menu_state or {}).get("backoff", 1)
+        return _clamp(default * backoff) if backoff > 1 else default
+
+    estimate_ms = menu_state["srtt"] + 4 * menu_state["rttvar"]
+    return round(_clamp(PROBE_TIMEOUT_FACTOR * estimate_ms / 1000 * menu_state.get("backoff", 1)), 3)
+
+
+def latency_percentile(menu_state: Optional[Dict[str, Any]], percentile: float) -> Optional[float]:
+    """최근 응답 시간의 백분위 값(초)을 반환합니다. 표본이 부족하면 None"""
+    recent = (menu_state or {}).get("recent") or []
+    if len(recent) < PROBE_TIMEOUT_MIN_SAMPLES:
+        return None
+    ordered = sorted(recent)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index] / 1000
+
+
+def update_latency(menu_state: Dict[str, Any], result: Dict[str, Any]) -> bool:
+    """
+    점검 결과로 응답 시간 추정값을 갱신하고 저장이 필요한 변경인지 반환합니다.
+
+    - 응답을 받은 경우: srtt/rttvar 갱신, backoff 초기화
+    - 타임아웃(408, 헤더 없음): backoff 두 배
+    - 연결 오류: 응답 시간 정보가 없으므로 변경하지 않음
+
+    저장이 필요한 변경: backoff 변경, 표본이 PROBE_TIMEOUT_MIN_SAMPLES 개가 될 때까지의 갱신,
+    srtt 가 saved_srtt 대비 PROBE_STATE_SRTT_TOLERANCE 이상 변한 경우
+    """
+    status_code = result.get("status_code", 0)
+
+    if status_code == 0:
+        return False
+
+    if status_code == 408 and not result.get("headers"):
+        backoff = menu_state.get("backoff", 1)
+        if backoff >= MAX_BACKOFF:
+            return False
+        menu_state["backoff"] = backoff * 2
+        return True
+
+    sample = float(result.get("response_time", 0))
+    if menu_state.get("samples", 0) == 0:
+        srtt, rttvar = sample, sample / 2
+    else:
+        srtt, rttvar = menu_state["srtt"], menu_state["rttvar"]
+        rttvar = (1 - RTTVAR_BETA) * rttvar + RTTVAR_BETA * abs(srtt - sample)
+        srtt = (1 - SRTT_ALPHA) * srtt + SRTT_ALPHA * sample
+
+    menu_state["srtt"] = round(srtt, 2)
+    menu_state["rttvar"] = round(rttvar, 2)
+    menu_state["samples"] = menu_state.get("samples", 0) + 1
+    menu_state["recent"] = (menu_state.get("recent") or [])[-(LATENCY_WINDOW - 1):] + [round(sample, 2)]
+    backoff_reset = menu_state.pop("backoff", None) is not None
+
+    saved_srtt = menu_state.get("saved_srtt")
+    drifted = saved_srtt is None or abs(srtt - saved_srtt) > PROBE_STATE_SRTT_TOLERANCE * max(saved_srtt, 1.0)
+    if drifted or backoff_reset or menu_state["samples"] <= PROBE_TIMEOUT_MIN_SAMPLES:
+        menu_state["saved_srtt"] = menu_state["srtt"]
+        return True
+    return False
@@ -0,0 +1,184 @@
+"""
+URL Check Web 점검 구간 측정 모듈
+
+aiohttp TraceConfig 로 요청 단계별 시각을 단조 시계(time.perf_counter)로 기록하여
+DNS / 연결 / 요청 전송 / 첫 바이트(TTFB) / 본문 수신 구간 시간을 계산합니다.
+
+aiohttp 는 TLS 핸드셰이크 전용 트레이스 신호가 없으므로 HTTPS 의 TLS 시간은 connect 구간에 포함됩니다.
+HTTP/2 점검(httpx)은 httpx 의 trace 확장으로 같은 구간을 기록합니다.
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional
+import aiohttp
+
+from metrics.metrics_service import probe_connections_opened_total
+
+
+class ProbeTimer:
+    """요청 하나의 단계별 시각을 기록하는 객체 (trace_request_ctx 로 전달)"""
+
+    __slots__ = ("start", "dns", "connect", "connection_ready", "headers_sent",
+                 "response_start", "body_end", "_dns_start", "_connect_start")
+
+    def __init__(self):
+        self.start: Optional[float] = None
+        self.dns = 0.0
+        self.connect = 0.0
+        self.connection_ready: Optional[float] = None
+        self.headers_sent: Optional[float] = None
+        self.response_start: Optional[float] = None
+        self.body_end: Optional[float] = None
+        self._dns_start: Optional[float] = None
+        self._connect_start: Optional[float] = None
+
+    def mark_start(self) -> None:
+        """요청 시작 시각 기록 (트레이스 신호보다 먼저 호출하여 전체 응답 시간 기준점으로 사용)"""
+        self.start = time.perf_counter()
+
+    def mark_response_start(self) -> None:
+        if self.response_start is None:
+            self.response_start = time.perf_counter()
+
+    def mark_body_end(self) -> None:
+        self.body_end = time.perf_counter()
+
+    def response_time_ms(self) -> float:
+        """요청 시작부터 응답 헤더 수신까지의 시간(ms, DNS 조회 시간 제외)"""
+        end = self.response_start or time.perf_counter()
+        return round((end - self.start - self.dns) * 1000, 2)
+
+    def dns_ms(self) -> float:
+        """DNS 조회 시간(ms)"""
+        return round(self.dns * 1000, 2)
+
+    def elapsed_ms(self) -> float:
+        """요청 시작부터 현재까지의 시간(ms)"""
+        return round((time.perf_counter() - self.start) * 1000, 2)
+
+    def timings(self) -> Dict[str, float]:
+        """
+        단계별 소요 시간(ms)을 반환합니다. 측정되지 않은 단계는 생략합니다.
+
+        - dns: 호스트 이름 해석
+        - connect: TCP 연결 (+ HTTPS 인 경우 TLS 핸드셰이크)
+        - send: 연결 확보 후 요청 헤더 전송 완료까지
+        - ttfb: 요청 전송 완료 후 응답 헤더 수신까지
+        - body: 응답 헤더 수신 후 본문 수신 완료까지
+        """
+        phases = {}
+        if self.dns:
+            phases["dns"] = self.dns
+        if self.connect:
+            phases["connect"] = max(self.connect - self.dns, 0.0)
+
+        ready = self.connection_ready or self.start
+        if self.headers_sent is not None and ready is not None:
+            phases["send"] = self.headers_sent - ready
+        if self.response_start is not None:
+            phases["ttfb"] = self.response_start - (self.headers_sent or ready)
+        if self.body_end is not None and self.response_start is not None:
+            phases["body"] = self.body_end - self.response_start
+
+        return {name: round(seconds * 1000, 2) for name, seconds in phases.items()}
+
+
+def _timer(trace_config_ctx) -> Optional[ProbeTimer]:
+    timer = trace_config_ctx.trace_request_ctx
+    return timer if isinstance(timer, ProbeTimer) else None
+
+
+async def _on_request_start(session, trace_config_ctx, params):
+    timer = _timer(trace_config_ctx)
+    if timer and timer.start is None:
+        timer.mark_start()
+
+
+async def _on_dns_resolvehost_start(session, trace_config_ctx, params):
+    timer = _timer(trace_config_ctx)
+    if timer:
+        timer._dns_start = time.perf_counter()
+
+
+async def _on_dns_resolvehost_end(session, trace_config_ctx, params):
+    timer = _timer(trace_config_ctx)
+    if timer and timer._dns_start is not None:
+        timer.dns += time.perf_counter() - timer._dns_start
+        timer._dns_start = None
+
+
+async def _on_connection_create_start(session, trace_config_ctx, params):
+    timer = _timer(trace_config_ctx)
+    if timer:
+        timer._connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(session, trace_config_ctx, params):
+    timer = _timer(trace_config_ctx)
+    if timer and timer._connect_start is not None:
+        now = time.perf_counter()
+        timer.connect += now - timer._connect_start
+        timer._connect_start = None
+        timer.connection_ready = now
+    probe_connections_opened_total.inc("http1")
+
+
+async def _on_connection_reuseconn(session, trace_config_ctx, params):
+    timer = _timer(trace_config_ctx)
+    if timer:
+        timer.connection_ready = time.perf_counter()
+
+
+async def _on_request_headers_sent(session, trace_config_ctx, params):
+    timer = _timer(trace_config_ctx)
+    if timer:
+        timer.headers_sent = time.perf_counter()
+
+
+async def _on_request_end(session, trace_config_ctx, params):
+    # 응답 헤더를 받은 시점에 호출됨 (본문 수신 전)
+    timer = _timer(trace_config_ctx)
+    if timer:
+        timer.mark_response_start()
+
+
+def create_httpx_trace(timer: ProbeTimer) -> Callable[[str, Dict[str, Any]], Any]:
+    """
+    httpx 요청의 trace 확장(extensions={"trace": ...})으로 ProbeTimer 에 단계별 시각을 기록하는 함수를 생성합니다.
+
+    DNS 조회는 TCP 연결 안에서 수행되므로 connect 구간에 포함됩니다.
+    """
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        if event_name == "connection.connect_tcp.started":
+            timer._connect_start = now
+        elif event_name == "connection.start_tls.complete" and timer._connect_start is not None:
+            timer.connect += now - timer._connect_start
+            timer._connect_start = None
+            timer.connection_ready = now
+            # ALPN 협상 결과로 프로토콜 구분 (HTTP/2 를 지원하지 않는 서버는 HTTP/1.1 로 연결됨)
+            stream = info.get("return_value")
+            ssl_object = stream.get_extra_info("ssl_object") if stream is not None else None
+            alpn = ssl_object.selected_alpn_protocol() if ssl_object is not None else None
+            probe_connections_opened_total.inc("http2" if alpn == "h2" else "http1")
+        elif event_name.endswith(".send_request_headers.started") and timer.connection_ready is None:
+            # 이미 열린 연결을 사용하는 경우
+            timer.connection_ready = now
+        elif event_name.endswith(".send_request_headers.complete"):
+            timer.headers_sent = now
+
+    return trace
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """ProbeTimer 에 단계별 시각을 기록하는 TraceConfig 를 생성합니다."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_request_headers_sent.append(_on_request_headers_sent)
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
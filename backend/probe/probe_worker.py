@@ -0,0 +1,345 @@
+"""
+URL Check Web 점검 워커 프로세스 모듈
+
+점검 엔진(probe_system)을 API 서버와 별도의 프로세스에서 실행합니다.
+API 요청 처리와 Firestore 저장이 같은 이벤트 루프를 쓰지 않으므로 API 부하가 점검 응답 시간 측정에 섞이지 않습니다.
+
+- 점검 작업: API 프로세스가 작업 큐(multiprocessing.Queue)에 시스템 단위 작업을 넣음
+- 점검 준비 작업: 전체 점검 전에 점검할 호스트를 미리 DNS 조회하고 필요하면 연결도 미리 열어 둠
+  (prepare_probe_targets, DNS 캐시와 연결 풀은 워커 프로세스에 유지)
+- 헤더 작업: 헤더 프록시 API(/api/proxy-header)의 URL 헤더 조회 (자동 점검과 같은 호스트별 요청 제한 적용)
+- 점검 결과: 워커가 메뉴 점검이 끝날 때마다 결과 큐로 바로 보내고, 시스템 점검이 끝나면 완료를 보냄
+- 작업 취소: API 프로세스에서 결과를 기다리던 작업이 취소되면(마감 시각 초과 등) 취소 메시지를 보내 워커의 작업도 취소
+- 점검 상태: 조건부 요청/응답 시간 추정값(probe_state)은 API 프로세스가 관리하여 작업에 담아 보냄
+- 회로 차단기, 호스트별 요청 제한, AIMD 동시 점검 수는 워커 프로세스 안에서 유지
+- 메트릭: 워커의 점검 메트릭(urlcheck_probe_*)을 완료 메시지에 담아 API 프로세스의 /metrics 에 합산
+
+워커는 자동 점검을 실행하는 리더 워커(scheduler.leader)에서만 실행됩니다. (리더가 되면 시작, 물러나면 종료)
+PROBE_WORKER_ENABLED 가 false 이거나 워커가 없는 경우에는 API 프로세스에서 직접 점검합니다.
+"""
+
+import os
+import queue
+import asyncio
+import logging
+import threading
+import multiprocessing
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics.metrics_service import registry
+from .probe_service import (
+    probe_system, prepare_probe_targets, probe_header_url, close_probe_connector, DEFAULT_TIMEOUT
+)
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 점검 워커 프로세스 사용 여부
+PROBE_WORKER_ENABLED = os.getenv("PROBE_WORKER_ENABLED", "true").lower() == "true"
+# 워커 종료 대기 시간 (초)
+PROBE_WORKER_STOP_TIMEOUT = float(os.getenv("PROBE_WORKER_STOP_TIMEOUT", "10"))
+
+# 워커에서 API 프로세스로 넘기는 메트릭 이름 접두어
+PROBE_METRIC_PREFIX = "urlcheck_probe_"
+# 결과 큐를 읽는 스레드가 워커 생존 여부를 확인하는 간격 (초)
+RESULT_POLL_SECONDS = 1.0
+
+
+class ProbeWorkerError(RuntimeError):
+    """점검 워커가 작업을 처리하지 못함"""
+
+
+def _worker_main(jobs, results) -> None:
+    """워커 프로세스 진입점"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - probe-worker - %(levelname)s - %(message)s",
+    )
+    try:
+        asyncio.run(_serve(jobs, results))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve(jobs, results) -> None:
+    """작업 큐에서 시스템 점검 작업을 받아 동시에 실행합니다. (None 을 받으면 진행 중인 작업을 마치고 종료)"""
+    loop = asyncio.get_running_loop()
+    # 작업 ID -> 실행 중인 작업
+    tasks: Dict[int, asyncio.Task] = {}
+    while True:
+        job = await loop.run_in_executor(None, jobs.get)
+        if job is None:
+            break
+        if job["kind"] == "cancel":
+            task = tasks.get(job["target"])
+            if task is not None:
+                task.cancel()
+            continue
+        job_id = job["job_id"]
+        task = tasks[job_id] = asyncio.create_task(_run_job(job, results))
+        task.add_done_callback(lambda _, job_id=job_id: tasks.pop(job_id, None))
+    if tasks:
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    await close_probe_connector()
+
+
+async def _run_job(job: Dict[str, Any], results) -> None:
+    job_id = job["job_id"]
+
+    def on_result(index: int, menu_result: Dict[str, Any]) -> None:
+        results.put(("result", job_id, index, menu_result))
+
+    try:
+        if job["kind"] == "prepare":
+            summary = await prepare_probe_targets(job["urls"], warm=job["warm"], http2_urls=job["http2_urls"])
+            results.put(("result", job_id, 0, summary))
+            results.put(("done", job_id, None, registry.snapshot(PROBE_METRIC_PREFIX)))
+            return
+
+        if job["kind"] == "header":
+            results.put(("result", job_id, 0, await probe_header_url(job["url"], job["timeout"])))
+            results.put(("done", job_id, None, registry.snapshot(PROBE_METRIC_PREFIX)))
+            return
+
+        await probe_system(
+            job["system_name"], job["system_url"], job["menus"], job["menu_states"],
+            timeout=job["timeout"], rate_limit=job["rate_limit"],
+            max_concurrency=job["max_concurrency"], on_result=on_result, deadline=job["deadline"],
+            lane=job["lane"], http2=job["http2"]
+        )
+        results.put(("done", job_id, None, registry.snapshot(PROBE_METRIC_PREFIX)))
+    except Exception as e:
+        logger.error(f"점검 워커 작업 실패 ({job.get('system_name', job['kind'])}): {str(e)}")
+        results.put(("error", job_id, None, str(e)))
+
+
+class _PendingJob:
+    """API 프로세스에서 결과를 기다리는 작업"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, menu_count: int):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.results: List[Optional[Dict[str, Any]]] = [None] * menu_count
+
+
+class ProbeWorker:
+    """점검 워커 프로세스와 작업/결과 큐를 관리 (API 프로세스 쪽)"""
+
+    def __init__(self):
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._jobs = None
+        self._results = None
+        self._reader = None
+        self._pending: Dict[int, _PendingJob] = {}
+        self._lock = threading.Lock()
+        self._job_ids = count(1)
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> bool:
+        """워커 프로세스를 시작합니다."""
+        if self.running:
+            return True
+        try:
+            self._jobs = self._context.Queue()
+            self._results = self._context.Queue()
+            self._process = self._context.Process(
+                target=_worker_main, args=(self._jobs, self._results),
+                name="probe-worker", daemon=True
+            )
+            self._process.start()
+        except Exception as e:
+            logger.error(f"점검 워커 시작 실패: {str(e)}")
+            self._process = None
+            return False
+
+        self._reader = threading.Thread(target=self._read_results, args=(self._process, self._results),
+                                        name="probe-worker-results", daemon=True)
+        self._reader.start()
+        logger.info(f"점검 워커 프로세스 시작 (pid={self._process.pid})")
+        return True
+
+    def stop(self) -> None:
+        """진행 중인 작업을 마칠 때까지 기다린 뒤 워커 프로세스를 종료합니다."""
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        try:
+            self._jobs.put(None)
+            process.join(PROBE_WORKER_STOP_TIMEOUT)
+        finally:
+            if process.is_alive():
+                logger.warning("점검 워커가 제시간에 종료되지 않아 강제 종료합니다.")
+                process.terminate()
+                process.join()
+        if self._reader is not None:
+            self._reader.join(RESULT_POLL_SECONDS * 2)
+        self._fail_pending("점검 워커가 종료되었습니다.")
+        logger.info("점검 워커 프로세스 종료")
+
+    def _read_results(self, process, results) -> None:
+        """결과 큐를 읽어 결과를 기다리는 이벤트 루프로 넘깁니다. (별도 스레드)"""
+        while True:
+            try:
+                message = results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                break
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                pending = self._pending.get(message[1])
+            if pending is not None:
+                pending.loop.call_soon_threadsafe(self._handle_message, message)
+
+        if process.exitcode not in (None, 0):
+            logger.error(f"점검 워커 프로세스가 비정상 종료되었습니다. (exitcode={process.exitcode})")
+        self._fail_pending("점검 워커가 종료되었습니다.")
+
+    def _handle_message(self, message: Tuple) -> None:
+        """결과 메시지 하나를 처리합니다. (작업을 넣은 이벤트 루프에서 실행)"""
+        kind, job_id, index, payload = message
+        with self._lock:
+            pending = self._pending.get(job_id)
+            if pending is None:
+                return
+            if kind != "result":
+                self._pending.pop(job_id, None)
+
+        if kind == "result":
+            pending.results[index] = payload
+        elif kind == "done":
+            registry.restore(payload)
+            if not pending.future.done():
+                pending.future.set_result(pending.results)
+        elif not pending.future.done():
+            pending.future.set_exception(ProbeWorkerError(payload))
+
+    def _fail_pending(self, reason: str) -> None:
+        with self._lock:
+            pending_jobs = list(self._pending.items())
+            self._pending.clear()
+        for job_id, pending in pending_jobs:
+            pending.loop.call_soon_threadsafe(self._set_failed, pending, reason)
+
+    @staticmethod
+    def _set_failed(pending: _PendingJob, reason: str) -> None:
+        if not pending.future.done():
+            pending.future.set_exception(ProbeWorkerError(reason))
+
+    async def probe_system(self, system_name: str, system_url: str, menus: List[Dict[str, Any]],
+                           menu_states: Optional[Dict[str, Dict[str, Any]]] = None,
+                           timeout: float = DEFAULT_TIMEOUT, rate_limit: Optional[float] = None,
+                           max_concurrency: Optional[int] = None,
+                           deadline: Optional[float] = None, lane: str = "fast",
+                           http2: bool = False) -> List[Dict[str, Any]]:
+        """워커 프로세스에서 시스템을 점검하고 메뉴 순서대로 결과 목록을 반환합니다. (마감 시각은 워커가 적용)"""
+        if not self.running:
+            raise ProbeWorkerError("점검 워커가 실행 중이 아닙니다.")
+
+        return await self._submit({
+            "kind": "probe",
+            "system_name": system_name,
+            "system_url": system_url,
+            "menus": menus,
+            "menu_states": menu_states or {},
+            "timeout": timeout,
+            "rate_limit": rate_limit,
+            "max_concurrency": max_concurrency,
+            "deadline": deadline,
+            "lane": lane,
+            "http2": http2,
+        }, len(menus))
+
+    async def prepare(self, urls: List[str], warm: bool = False, http2_urls: List[str] = ()) -> Dict[str, Any]:
+        """워커 프로세스에서 전체 점검 전 준비 작업(DNS 사전 조회, 미리 연결)을 수행합니다."""
+        if not self.running:
+            raise ProbeWorkerError("점검 워커가 실행 중이 아닙니다.")
+        job = {"kind": "prepare", "urls": urls, "warm": warm, "http2_urls": list(http2_urls)}
+        return (await self._submit(job, 1))[0]
+
+    async def probe_header(self, url: str, timeout: float) -> Dict[str, Any]:
+        """워커 프로세스에서 헤더 프록시 API 의 URL 헤더를 가져옵니다."""
+        if not self.running:
+            raise ProbeWorkerError("점검 워커가 실행 중이 아닙니다.")
+        return (await self._submit({"kind": "header", "url": url, "timeout": timeout}, 1))[0]
+
+    async def _submit(self, job: Dict[str, Any], result_count: int) -> List[Optional[Dict[str, Any]]]:
+        """작업을 작업 큐에 넣고 완료될 때까지 기다려 결과 목록을 반환합니다."""
+        job_id = job["job_id"] = next(self._job_ids)
+        pending = _PendingJob(asyncio.get_running_loop(), result_count)
+        with self._lock:
+            self._pending[job_id] = pending
+        try:
+            self._jobs.put(job)
+            return await pending.future
+        except asyncio.CancelledError:
+            # 결과를 기다리지 않으므로 워커의 작업도 취소하여 점검 슬롯을 바로 반납하게 함
+            if self.running:
+                self._jobs.put({"kind": "cancel", "target": job_id})
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(job_id, None)
+
+
+# API 프로세스의 점검 워커
+probe_worker = ProbeWorker()
+
+
+def start_probe_worker() -> bool:
+    """설정에 따라 점검 워커 프로세스를 시작합니다. (스케줄러 리더가 되었을 때)"""
+    if not PROBE_WORKER_ENABLED:
+        return False
+    return probe_worker.start()
+
+
+def stop_probe_worker() -> None:
+    """점검 워커 프로세스를 종료합니다. (스케줄러 리더에서 물러날 때, main.py 종료 이벤트)"""
+    probe_worker.stop()
+
+
+async def run_probe_system(system_name: str, system_url: str, menus: List[Dict[str, Any]],
+                           menu_states: Optional[Dict[str, Dict[str, Any]]] = None,
+                           **kwargs) -> List[Dict[str, Any]]:
+    """
+    점검 워커가 실행 중이면 워커에서, 아니면 현재 프로세스에서 시스템을 점검합니다.
+
+    워커가 작업 도중 종료되면 같은 시스템을 현재 프로세스에서 다시 점검합니다.
+    """
+    if probe_worker.running:
+        try:
+            return await probe_worker.probe_system(system_name, system_url, menus, menu_states, **kwargs)
+        except ProbeWorkerError as e:
+            logger.warning(f"점검 워커를 사용할 수 없어 직접 점검합니다: {str(e)}")
+    return await probe_system(system_name, system_url, menus, menu_states, **kwargs)
+
+
+async def run_probe_prepare(urls: List[str], warm: bool = False, http2_urls: List[str] = ()) -> Dict[str, Any]:
+    """
+    점검 워커가 실행 중이면 워커에서, 아니면 현재 프로세스에서 전체 점검 준비 작업을 수행합니다.
+
+    미리 연결한 연결은 점검을 실행하는 프로세스의 연결 풀에 남아야 하므로 점검과 같은 곳에서 준비합니다.
+    """
+    if probe_worker.running:
+        try:
+            return await probe_worker.prepare(urls, warm, http2_urls)
+        except ProbeWorkerError as e:
+            logger.warning(f"점검 워커를 사용할 수 없어 직접 준비합니다: {str(e)}")
+    return await prepare_probe_targets(urls, warm, http2_urls)
+
+
+async def run_probe_header(url: str, timeout: float) -> Dict[str, Any]:
+    """점검 워커가 실행 중이면 워커에서, 아니면 현재 프로세스에서 헤더 프록시 API 의 URL 헤더를 가져옵니다."""
+    if probe_worker.running:
+        try:
+            return await probe_worker.probe_header(url, timeout)
+        except ProbeWorkerError as e:
+            logger.warning(f"점검 워커를 사용할 수 없어 직접 헤더를 가져옵니다: {str(e)}")
+    return await probe_header_url(url, timeout)
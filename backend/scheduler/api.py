@@ -15,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 # 스케줄러 및 이메일 서비스 임포트
 from .scheduler import get_scheduler, run_system_inspection
+from .leader import leader
 from .email_service import send_inspection_email
 from admin.system.system_service import get_systems, perform_system_inspection
 
@@ -38,13 +39,15 @@ class SchedulerStatus(BaseModel):
     running: bool = Field(..., description="스케줄러 실행 상태")
     next_run_time: Optional[str] = Field(None, description="다음 실행 시간")
     jobs_count: int = Field(..., description="등록된 작업 수")
+    is_leader: bool = Field(False, description="이 워커가 자동 점검을 실행하는 리더인지 여부")
     
     class Config:
         schema_extra = {
             "example": {
                 "running": True,
                 "next_run_time": "2023-05-01T12:00:00",
-                "jobs_count": 1
+                "jobs_count": 2,
+                "is_leader": True
             }
         }
 
@@ -71,7 +74,8 @@ async def get_scheduler_status():
         return SchedulerStatus(
             running=scheduler_instance.running,
             next_run_time=next_run,
-            jobs_count=len(scheduler_instance.get_jobs())
+            jobs_count=len(scheduler_instance.get_jobs()),
+            is_leader=leader.is_leader
         )
     except Exception as e:
         logger.error(f"스케줄러 상태 조회 중 오류 발생: {str(e)}")
@@ -83,10 +87,10 @@ async def get_scheduler_status():
 @router.post("/api/scheduler/run-inspection")
 async def trigger_inspection():
     """
-    시스템 점검 작업을 즉시 실행합니다.
+    모든 시스템의 모든 메뉴를 점검 예정 시각과 관계없이 즉시 점검합니다.
     """
     try:
-        await run_system_inspection()
+        await run_system_inspection(run_all=True)
         return {"message": "시스템 점검 작업이 실행되었습니다."}
     except Exception as e:
         logger.error(f"시스템 점검 작업 실행 중 오류 발생: {str(e)}")
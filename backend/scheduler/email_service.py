@@ -139,8 +139,10 @@ def generate_email_html(inspection_systems: List[Dict[str, Any]]) -> str:
             status_text = result.get("status_text", "")
             response_time = result.get("response_time", 0)
             
-            # 상태 코드에 따른 스타일 결정
-            status_class = "success" if 200 <= status_code < 300 else "error" if status_code >= 400 else "warning"
+            # 상태 코드에 따른 스타일 결정 (304 는 조건부 점검에서 변경 없음을 뜻하므로 정상, 본문 검사 실패는 오류)
+            status_class = "success" if 200 <= status_code < 300 or status_code == 304 else "error" if status_code >= 400 else "warning"
+            if result.get("error_type") == "assertion":
+                status_class = "error"
             
             html += f"""
                 <tr>
@@ -0,0 +1,160 @@
+"""
+URL Check Web 스케줄러 리더 선출 모듈
+
+uvicorn 워커가 여러 개여도 자동 점검은 한 워커에서만 실행되도록 갱신형 임대(lease)로 리더를 정합니다.
+
+- sqlite: 같은 서버의 워커끼리 scheduler/jobs/leader.sqlite 파일로 임대를 공유 (기본값)
+- firestore: 여러 서버에 걸친 워커끼리 Firestore 의 scheduler_lease 문서로 임대를 공유
+
+리더는 SCHEDULER_LEASE_RENEW_SECONDS 마다 임대를 갱신하고, 리더 프로세스가 죽어
+SCHEDULER_LEASE_TTL_SECONDS 동안 갱신하지 못하면 다른 워커가 임대를 가져가 리더가 됩니다.
+"""
+
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+from datetime import datetime
+
+from config.database import db as firestore_db
+from .shard import SCHEDULER_SHARDING
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 임대 저장소 (sqlite / firestore)
+SCHEDULER_LEASE_BACKEND = os.getenv("SCHEDULER_LEASE_BACKEND", "sqlite")
+# 임대 유효 시간과 갱신 간격 (초)
+SCHEDULER_LEASE_TTL_SECONDS = float(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "30"))
+SCHEDULER_LEASE_RENEW_SECONDS = float(os.getenv("SCHEDULER_LEASE_RENEW_SECONDS", "10"))
+
+# sqlite 임대 파일 경로
+LEASE_DB_PATH = os.path.join(os.path.dirname(__file__), "jobs", "leader.sqlite")
+# Firestore 임대 문서 위치
+LEASE_COLLECTION = "scheduler_lease"
+LEASE_DOCUMENT = "system_inspection"
+
+
+class SQLiteLease:
+    """sqlite 파일의 행 하나로 관리하는 임대 (같은 서버의 워커 간)"""
+
+    def __init__(self, path: str = LEASE_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, holder TEXT, expires_at REAL)")
+        return conn
+
+    def try_acquire(self, holder: str, ttl: float) -> bool:
+        conn = self._connect()
+        try:
+            # 쓰기 잠금을 먼저 잡아 조회와 갱신 사이에 다른 워커가 끼어들지 못하게 함
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT holder, expires_at FROM lease WHERE name = ?", (LEASE_DOCUMENT,)).fetchone()
+            if row and row[0] != holder and row[1] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO lease (name, holder, expires_at) VALUES (?, ?, ?)",
+                (LEASE_DOCUMENT, holder, now + ttl)
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def release(self, holder: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM lease WHERE name = ? AND holder = ?", (LEASE_DOCUMENT, holder))
+        finally:
+            conn.close()
+
+
+class FirestoreLease:
+    """Firestore 문서 하나로 관리하는 임대 (여러 서버의 워커 간, 트랜잭션으로 원자적으로 갱신)"""
+
+    def __init__(self):
+        if firestore_db is None:
+            raise RuntimeError("Firestore 임대를 사용하려면 Firestore 연결이 필요합니다.")
+        self.ref = firestore_db.collection(LEASE_COLLECTION).document(LEASE_DOCUMENT)
+
+    def try_acquire(self, holder: str, ttl: float) -> bool:
+        from google.cloud import firestore
+
+        @firestore.transactional
+        def acquire(transaction) -> bool:
+            snapshot = self.ref.get(transaction=transaction)
+            lease = snapshot.to_dict() if snapshot.exists else None
+            now = time.time()
+            if lease and lease.get("holder") != holder and lease.get("expires_at", 0) > now:
+                return False
+            transaction.set(self.ref, {
+                "holder": holder,
+                "expires_at": now + ttl,
+                "renewed_at": datetime.now(),
+            })
+            return True
+
+        return acquire(firestore_db.transaction())
+
+    def release(self, holder: str) -> None:
+        snapshot = self.ref.get()
+        if snapshot.exists and snapshot.to_dict().get("holder") == holder:
+            self.ref.delete()
+
+
+class SchedulerLeader:
+    """이 워커의 리더 여부를 관리"""
+
+    def __init__(self, backend: str = SCHEDULER_LEASE_BACKEND):
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        if SCHEDULER_SHARDING and backend == "firestore":
+            # 샤딩 시에는 노드마다 리더가 있어야 하므로 노드 내부 임대만 사용
+            logger.warning("점검 샤딩 사용 중에는 sqlite 임대를 사용합니다.")
+            backend = "sqlite"
+        self.backend = backend
+        self.is_leader = False
+        self._lease = None
+        self._renewed_at = 0.0
+
+    def _get_lease(self):
+        if self._lease is None:
+            self._lease = FirestoreLease() if self.backend == "firestore" else SQLiteLease()
+        return self._lease
+
+    def renew(self) -> bool:
+        """
+        임대를 얻거나 갱신하고 현재 리더 여부를 반환합니다.
+
+        임대 저장소 오류로 TTL 동안 갱신하지 못하면 다른 워커가 리더가 되었을 수 있으므로 리더에서 물러납니다.
+        """
+        try:
+            acquired = self._get_lease().try_acquire(self.holder, SCHEDULER_LEASE_TTL_SECONDS)
+            if acquired:
+                self._renewed_at = time.monotonic()
+            self.is_leader = acquired
+        except Exception as e:
+            logger.warning(f"스케줄러 임대 갱신 실패: {str(e)}")
+            if self.is_leader and time.monotonic() - self._renewed_at >= SCHEDULER_LEASE_TTL_SECONDS:
+                self.is_leader = False
+        return self.is_leader
+
+    def release(self) -> None:
+        """리더였다면 임대를 반납하여 다른 워커가 바로 이어받게 합니다."""
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        try:
+            self._get_lease().release(self.holder)
+        except Exception as e:
+            logger.warning(f"스케줄러 임대 반납 실패: {str(e)}")
+
+
+# 이 워커의 리더 상태
+leader = SchedulerLeader()
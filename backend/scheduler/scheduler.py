@@ -2,70 +2,298 @@
 URL Check Web 스케줄러 모듈
 
 APScheduler를 사용하여 시스템 자동 점검을 정기적으로 수행합니다.
+
+메뉴별 점검 예정 시각은 점검 일정 큐(probe.probe_schedule)가 관리하며,
+점검 작업은 가장 이른 예정 시각에 맞춰 실행되어 예정 시각이 된 메뉴만 점검합니다.
+
+uvicorn 워커가 여러 개이면 임대(scheduler.leader)를 가진 리더 워커만 점검 작업을 실행하며,
+점검 워커 프로세스(probe.probe_worker)도 리더 워커에서만 실행하여 호스트별 요청 제한을 한 곳에서 적용합니다.
+모든 워커가 임대 갱신 작업을 돌리므로 리더가 죽으면 다른 워커가 임대를 이어받아 점검을 계속합니다.
+
+샤딩(scheduler.shard)을 켜면 노드마다 리더 워커가 일관 해시로 나눈 자기 몫의 시스템만 점검하고,
+같은 시각 구간의 샤드 결과를 하나의 점검 이력 문서로 합쳐 저장합니다.
+
+점검 작업마다 마감 시각을 두어, 마감까지 끝나지 않은 메뉴 점검은 취소하고
+deadline_exceeded 로 기록한 뒤 나머지 결과를 제때 저장합니다.
+마감 시간은 SWEEP_DEADLINE_SECONDS 와 꺼낸 메뉴의 가장 짧은 점검 주기의 SWEEP_DEADLINE_RATIO 배 중 작은 값이며,
+점검 작업은 최대 SWEEP_MAX_CONCURRENT_DISPATCHES 개까지 겹쳐 실행되므로 느린 점검 작업이 다음 구간의 점검을 막지 않습니다.
+(메뉴의 다음 점검 시각은 점검 주기 뒤이므로 같은 메뉴를 겹쳐 점검하지 않음)
+
+최근 응답 시간이 느린 시스템(probe.probe_lanes)은 slow 레인으로 분리하여 별도 작업으로 점검합니다.
+slow 레인은 자체 동시 점검 수 제한과 마감 시간(SLOW_LANE_DEADLINE_SECONDS, 시스템의 현재 점검 주기 이내)을 사용하며,
+결과는 같은 점검 이력 문서에 합쳐 저장되므로 나머지 시스템의 점검과 이력 저장을 늦추지 않습니다.
+slow 레인 점검이 진행 중인 시스템의 메뉴는 점검이 끝날 때까지 다음 점검 구간으로 미뤄 같은 시스템을 겹쳐 점검하지 않으며,
+리더에서 물러나면 진행 중인 slow 레인 점검을 취소합니다.
 """
 
+import os
+import math
+import asyncio
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from typing import List, Dict, Any
+from apscheduler.events import EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.triggers.interval import IntervalTrigger
-import os
 
 # 스케줄러 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # 시스템 점검 서비스 임포트
-from admin.system.system_service import get_systems, perform_system_inspection, save_inspection_history
+from admin.system.system_service import get_systems, perform_systems_inspection, save_inspection_history
+from probe.probe_schedule import check_queue, DEFAULT_CHECK_INTERVAL_MINUTES, CHECK_STAGGER_SLOT_SECONDS
+from probe.probe_lanes import split_lanes, FAST_LANE, SLOW_LANE
+from probe.probe_assertion import is_error_result
+from probe.probe_worker import start_probe_worker, stop_probe_worker
+from .leader import leader, SCHEDULER_LEASE_RENEW_SECONDS
+from .shard import membership
+from metrics.metrics_service import (
+    bind_job, sweep_duration_seconds, sweep_overruns_total, scheduler_job_lag_seconds
+)
+
+# 자동 점검 기본 주기 (분, 시스템/메뉴에 점검 주기가 없을 때 사용)
+INSPECTION_INTERVAL_MINUTES = DEFAULT_CHECK_INTERVAL_MINUTES
+
+# 점검 예정 시각이 없을 때 점검 작업을 다시 확인하는 최대 간격 (초)
+DISPATCH_MAX_SLEEP_SECONDS = 60
+
+# 점검 작업 한 번의 마감 시간 상한 (초, 기본값: 기본 점검 주기의 90%)
+# 마감 시각까지 끝나지 않은 메뉴 점검은 취소되어 deadline_exceeded 로 기록되고, 나머지 결과는 제때 저장됨
+SWEEP_DEADLINE_SECONDS = float(os.getenv("SWEEP_DEADLINE_SECONDS", str(INSPECTION_INTERVAL_MINUTES * 60 * 0.9)))
+# 점검 작업 마감 시간의 점검 주기 대비 비율 (꺼낸 메뉴의 가장 짧은 점검 주기 기준)
+SWEEP_DEADLINE_RATIO = float(os.getenv("SWEEP_DEADLINE_RATIO", "0.9"))
+# 동시에 실행할 수 있는 점검 작업 수 (점검 구간마다 실행되는 작업이 앞 작업을 기다리지 않도록)
+SWEEP_MAX_CONCURRENT_DISPATCHES = int(os.getenv("SWEEP_MAX_CONCURRENT_DISPATCHES", "3"))
+
+# slow 레인 점검의 마감 시간 (초)
+SLOW_LANE_DEADLINE_SECONDS = float(os.getenv("SLOW_LANE_DEADLINE_SECONDS", str(SWEEP_DEADLINE_SECONDS)))
+
+# 점검 직전에 점검할 호스트마다 연결을 미리 열어 둘지 여부 (첫 메뉴 응답 시간에서 연결 수립 시간 제외)
+SWEEP_PREWARM_ENABLED = os.getenv("SWEEP_PREWARM_ENABLED", "false").lower() == "true"
+
+# 진행 중인 slow 레인 점검 작업 (완료 전까지 참조 유지)과 점검 중인 시스템 ID
+_slow_lane_tasks = set()
+_slow_lane_systems = set()
+
+# 다른 워커에서 변경된 시스템을 점검 일정 큐에 반영하는 간격 (초)
+QUEUE_RESYNC_SECONDS = 300
+_last_queue_sync = 0.0
 
 # 전역 스케줄러 객체
 scheduler = None
 
-async def run_system_inspection():
+def _record_job_lag(event):
+    """작업이 예정 시각보다 얼마나 늦게 제출되었는지 기록"""
+    now = datetime.now().astimezone()
+    for scheduled_run_time in event.scheduled_run_times:
+        lag = (now - scheduled_run_time).total_seconds()
+        scheduler_job_lag_seconds.observe(max(lag, 0.0), event.job_id)
+
+def _wake_dispatcher(next_due: float):
+    """점검 일정 큐의 가장 이른 예정 시각에 맞춰 점검 작업 실행 시각을 조정"""
+    # 리더가 아니어서 점검 작업이 없으면 조정하지 않음
+    if not scheduler or not scheduler.running or not scheduler.get_job('system_inspection'):
+        return
+    now = time.time()
+    wake_at = min(max(next_due, now), now + DISPATCH_MAX_SLEEP_SECONDS)
+    try:
+        scheduler.modify_job('system_inspection', next_run_time=datetime.fromtimestamp(wake_at).astimezone())
+    except Exception as e:
+        logger.warning(f"점검 작업 실행 시각 조정 실패: {str(e)}")
+
+def _dispatch_deadline(due_checks: Dict[str, List[str]], now: float, limit: float) -> float:
+    """점검 작업의 마감 시각 (꺼낸 메뉴가 다음 점검 시각이 되기 전에 끝나도록 가장 짧은 점검 주기로 제한)"""
+    seconds = limit
+    interval = check_queue.shortest_interval(due_checks)
+    if interval is not None:
+        seconds = min(seconds, interval * SWEEP_DEADLINE_RATIO)
+    return now + seconds
+
+def _record_cadence(inspection_data: Dict[str, Any]) -> None:
+    """메뉴별 점검 결과로 메뉴의 점검 주기 조절 (마감 시각 초과로 취소한 메뉴는 제외)"""
+    for result in inspection_data.get("inspection_results", []):
+        if result.get("error_type") == "deadline_exceeded":
+            continue
+        check_queue.record_result(inspection_data["system_id"], result.get("path", ""), is_error_result(result))
+
+async def _sync_check_queue():
+    """등록된 시스템으로 점검 일정 큐 구성 (리더가 된 직후 구성, 이후 QUEUE_RESYNC_SECONDS 마다 동기화)"""
+    global _last_queue_sync
+    loaded = check_queue.loaded
+    systems = await get_systems()
+    check_queue.sync([system.dict() for system in systems])
+    _last_queue_sync = time.monotonic()
+    if not loaded:
+        logger.info(f"점검 일정 구성 완료: {len(systems)}개 시스템")
+
+def _start_dispatch():
+    """리더가 되면 점검 작업 등록 (등록 직후 1회 실행하여 점검 일정 큐를 구성)"""
+    check_queue.loaded = False
+    # 실행 시각은 점검 일정 큐의 가장 이른 예정 시각에 맞춰 조정되며, 최대 DISPATCH_MAX_SLEEP_SECONDS 마다 확인
+    scheduler.add_job(
+        run_system_inspection,
+        trigger=IntervalTrigger(seconds=DISPATCH_MAX_SLEEP_SECONDS),
+        id='system_inspection',
+        name='시스템 자동 점검',
+        next_run_time=datetime.now().astimezone(),
+        coalesce=True,
+        max_instances=SWEEP_MAX_CONCURRENT_DISPATCHES,
+        misfire_grace_time=None,
+        replace_existing=True
+    )
+
+def _stop_dispatch():
+    """리더에서 물러나면 점검 작업 제거 및 진행 중인 slow 레인 점검 취소"""
+    if scheduler.get_job('system_inspection'):
+        scheduler.remove_job('system_inspection')
+    for task in list(_slow_lane_tasks):
+        task.cancel()
+
+async def renew_leader_lease():
+    """
+    스케줄러 임대를 얻거나 갱신하고, 리더 여부가 바뀌면 점검 작업을 등록/제거하는 작업
+
+    임대 저장소(sqlite / Firestore)와 하트비트 호출은 블로킹이므로 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+    """
+    was_leader = leader.is_leader
+    is_leader = await asyncio.to_thread(leader.renew)
+    if is_leader:
+        # 샤딩 사용 시 노드 하트비트 갱신 및 해시 링 재구성
+        await asyncio.to_thread(membership.heartbeat)
+    if is_leader and not was_leader:
+        logger.info(f"스케줄러 리더로 선출되었습니다: {leader.holder}")
+        # 점검 워커 프로세스 시작 (API 부하와 점검 응답 시간 측정을 분리)
+        if start_probe_worker():
+            logger.info("점검 워커 프로세스가 시작되었습니다.")
+        _start_dispatch()
+    elif was_leader and not is_leader:
+        logger.warning(f"스케줄러 리더 임대를 잃었습니다: {leader.holder}")
+        _stop_dispatch()
+        # 진행 중인 작업을 마칠 때까지 기다리므로 스레드에서 종료
+        await asyncio.to_thread(stop_probe_worker)
+
+async def _inspect_lane(due_checks: Dict[str, List[str]], lane: str, deadline: float,
+                        document_id: str, part_id: str = None):
+    """레인 하나의 메뉴를 점검하고, 점검 주기 조절과 점검 이력 저장까지 수행"""
+    # 예정 시각이 된 메뉴만 시스템별로 동시 점검 (저장은 하지 않고 결과만 가져옴, 동시 점검 수는 점검 엔진이 조절)
+    # 마감 시각까지 끝나지 않은 메뉴는 취소하고 나머지 결과만으로 저장
+    inspection_systems = await perform_systems_inspection(list(due_checks), "자동", "scheduler", due_checks,
+                                                          deadline=deadline, lane=lane, warm=SWEEP_PREWARM_ENABLED)
+    
+    # 점검 결과에 따라 메뉴별 점검 주기 조절 (오류 시 단축, 지속 정상 시 연장)
+    for inspection_data in inspection_systems:
+        _record_cadence(inspection_data)
+    
+    # 레인의 시스템 점검 결과를 하나의 문서로 저장 (part_id 가 있으면 다른 샤드/레인의 결과와 합쳐 저장)
+    if inspection_systems:
+        await save_inspection_history(inspection_systems, document_id, shard_id=part_id)
+        logger.info(f"자동 점검 결과 저장 완료 ({lane} 레인): {len(inspection_systems)}개 시스템, 문서 ID: {document_id}")
+    else:
+        logger.warning(f"저장할 점검 결과가 없습니다. ({lane} 레인)")
+
+def _start_slow_lane(due_checks: Dict[str, List[str]], document_id: str, part_id: str) -> None:
+    """slow 레인 점검 작업을 시작하고, 끝날 때까지 시스템을 점검 중으로 표시"""
+    system_ids = set(due_checks)
+    _slow_lane_systems.update(system_ids)
+    task = asyncio.create_task(_run_slow_lane(due_checks, document_id, part_id))
+    _slow_lane_tasks.add(task)
+
+    def done(task):
+        _slow_lane_tasks.discard(task)
+        _slow_lane_systems.difference_update(system_ids)
+    task.add_done_callback(done)
+
+async def _run_slow_lane(due_checks: Dict[str, List[str]], document_id: str, part_id: str):
+    """느린 시스템을 점검 작업과 별도로 점검하는 작업"""
+    bind_job("scheduler:slow_lane")
+    lane_start = time.perf_counter()
+    try:
+        deadline = _dispatch_deadline(due_checks, time.time(), SLOW_LANE_DEADLINE_SECONDS)
+        await _inspect_lane(due_checks, SLOW_LANE, deadline, document_id, part_id)
+        logger.info(f"slow 레인 점검 완료: {len(due_checks)}개 시스템, {time.perf_counter() - lane_start:.1f}초")
+    except asyncio.CancelledError:
+        logger.warning(f"slow 레인 점검을 취소했습니다: {len(due_checks)}개 시스템")
+        raise
+    except Exception as e:
+        logger.error(f"slow 레인 점검 중 오류 발생: {str(e)}")
+    finally:
+        # 점검 주기 조절로 바뀐 예정 시각에 맞춰 작업 실행 시각 조정
+        next_due = check_queue.next_due()
+        if next_due is not None:
+            _wake_dispatcher(next_due)
+
+async def run_system_inspection(run_all: bool = False):
     """
-    모든 시스템에 대한 자동 점검을 수행하고 결과를 저장하는 작업
+    점검 예정 시각이 된 메뉴를 점검하고 결과를 저장하는 작업
+
+    Args:
+        run_all: True 이면 예정 시각과 관계없이 모든 시스템의 모든 메뉴 점검 (즉시 점검 API 용, 리더가 아니어도 실행, 레인 분리 없음)
     """
+    # 예약 점검은 리더 워커만 실행
+    if not run_all and not leader.is_leader:
+        return
+    
+    bind_job("scheduler:system_inspection")
+    sweep_start = time.perf_counter()
+    fast_checks = {}
     try:
-        logger.info("자동 시스템 점검 작업 시작")
+        if not check_queue.loaded or time.monotonic() - _last_queue_sync >= QUEUE_RESYNC_SECONDS:
+            await _sync_check_queue()
+        
+        # 점검 시각 구간 시작 시각 (샤드들이 같은 구간의 결과를 같은 문서에 저장하도록 문서 ID 로 사용)
+        slot_start = math.floor(time.time() / CHECK_STAGGER_SLOT_SECONDS) * CHECK_STAGGER_SLOT_SECONDS
+        
+        # 예정 시각이 된 메뉴 (시스템 ID -> 메뉴 키 목록), 꺼낸 메뉴는 다음 주기로 재예약됨
+        # slow 레인 점검이 진행 중인 시스템은 다음 점검 구간으로 미룸
+        due_checks = check_queue.pop_all() if run_all else check_queue.pop_due(busy=_slow_lane_systems)
         
-        # 모든 시스템 목록 조회
-        systems = await get_systems()
+        # 샤딩 사용 시 이 노드가 담당하는 시스템만 점검 (다른 시스템은 담당 노드가 같은 시각에 점검)
+        if not run_all:
+            due_checks = {system_id: keys for system_id, keys in due_checks.items() if membership.owns(system_id)}
         
-        if not systems:
-            logger.warning("등록된 시스템이 없습니다.")
+        if not due_checks:
             return
         
+        # 최근 응답 시간으로 느린 시스템을 slow 레인으로 분리
+        fast_checks, slow_checks = (due_checks, {}) if run_all else split_lanes(due_checks)
+        
+        logger.info(f"자동 시스템 점검 작업 시작: {len(due_checks)}개 시스템 (slow 레인 {len(slow_checks)}개), "
+                    f"{sum(len(keys) for keys in due_checks.values())}개 메뉴")
+        
         # 점검 시간으로 문서 이름 생성 (YYYYMMDDHI24MISS 형식)
-        document_id = datetime.now().strftime("%Y%m%d%H%M%S")
-        
-        # 점검 결과를 저장할 배열
-        inspection_systems = []
-        
-        # 각 시스템 순차적으로 점검
-        for system in systems:
-            try:
-                # 개별 시스템 점검 수행 (저장은 하지 않고 결과만 가져옴)
-                inspection_data = await perform_system_inspection(system.id, "자동", "scheduler", None)
-                
-                # 결과 배열에 추가
-                inspection_systems.append(inspection_data)
-                
-                logger.info(f"시스템 '{system.kor_name}' 점검 완료")
-            except Exception as e:
-                logger.error(f"시스템 점검 중 오류 발생 (ID: {system.id}): {str(e)}")
-                # 오류가 발생해도 계속 진행
-                continue
-        
-        # 모든 시스템 점검 결과를 하나의 문서로 저장
-        if inspection_systems:
-            await save_inspection_history(inspection_systems, document_id)
-            logger.info(f"자동 점검 결과 저장 완료: {len(inspection_systems)}개 시스템, 문서 ID: {document_id}")
-        else:
-            logger.warning("저장할 점검 결과가 없습니다.")
+        # 샤딩 시에는 노드마다 시간대가 달라도 같은 구간이 같은 문서 ID 가 되도록 구간 시작 시각을 UTC 로 표기
+        sharded = membership.enabled and not run_all
+        document_id = (datetime.fromtimestamp(slot_start, timezone.utc) if sharded else datetime.now()).strftime("%Y%m%d%H%M%S")
+        part_id = membership.node_id if sharded else None
+        
+        if slow_checks:
+            # 레인마다 따로 저장하고 같은 문서에서 합침
+            node_part = part_id or "local"
+            _start_slow_lane(slow_checks, document_id, f"{node_part}:{SLOW_LANE}")
+            part_id = f"{node_part}:{FAST_LANE}"
+        
+        if fast_checks:
+            deadline = _dispatch_deadline(fast_checks, time.time(), SWEEP_DEADLINE_SECONDS)
+            await _inspect_lane(fast_checks, FAST_LANE, deadline, document_id, part_id)
         
     except Exception as e:
         logger.error(f"자동 시스템 점검 작업 중 오류 발생: {str(e)}")
+    finally:
+        # fast 레인에서 점검한 메뉴가 있을 때만 소요 시간 기록
+        if fast_checks:
+            sweep_duration = time.perf_counter() - sweep_start
+            sweep_duration_seconds.observe(sweep_duration)
+            if sweep_duration > INSPECTION_INTERVAL_MINUTES * 60:
+                sweep_overruns_total.inc()
+                logger.warning(f"자동 점검이 점검 주기({INSPECTION_INTERVAL_MINUTES}분)를 초과했습니다: {sweep_duration:.1f}초")
+        
+        # 다음 점검 예정 시각에 맞춰 작업 실행 시각 조정
+        next_due = check_queue.next_due()
+        if next_due is not None:
+            _wake_dispatcher(next_due)
 
 def initialize_scheduler():
     """
@@ -79,35 +307,48 @@ def initialize_scheduler():
             scheduler.shutdown()
             logger.info("기존 스케줄러 중지")
         
-        # SQLAlchemy JobStore 설정
-        jobstore_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scheduler", "jobs")
-        os.makedirs(jobstore_dir, exist_ok=True)
-        jobstore_path = os.path.join(jobstore_dir, "jobs.sqlite")
-        
-        # JobStore 생성
-        jobstore = SQLAlchemyJobStore(url=f'sqlite:///{jobstore_path}')
-        
         # 스케줄러 생성
-        scheduler = AsyncIOScheduler(jobstores={'default': jobstore})
+        # 점검 일정은 점검 일정 큐가 관리하고 점검 작업은 리더 워커에만 등록되므로 작업은 메모리에만 보관
+        scheduler = AsyncIOScheduler(jobstores={'default': MemoryJobStore()})
         
-        # 10분마다 실행되는 시스템 점검 작업 등록
+        # 스케줄러 임대 갱신 작업 등록 (모든 워커, 리더가 되면 시스템 점검 작업 등록)
         scheduler.add_job(
-            run_system_inspection,
-            trigger=IntervalTrigger(minutes=10),
-            id='system_inspection',
-            name='시스템 자동 점검',
+            renew_leader_lease,
+            trigger=IntervalTrigger(seconds=SCHEDULER_LEASE_RENEW_SECONDS),
+            id='scheduler_lease',
+            name='스케줄러 리더 임대 갱신',
+            next_run_time=datetime.now().astimezone(),
+            coalesce=True,
+            max_instances=1,
             replace_existing=True
         )
         
+        # 시스템 생성/수정으로 점검 예정 시각이 당겨지면 점검 작업을 깨움
+        check_queue.on_change = _wake_dispatcher
+        
+        # 작업 실행 지연 메트릭 수집
+        scheduler.add_listener(_record_job_lag, EVENT_JOB_SUBMITTED)
+        
         # 스케줄러 시작
         scheduler.start()
-        logger.info("스케줄러 초기화 완료: 10분마다 시스템 자동 점검")
+        logger.info(f"스케줄러 초기화 완료: 시스템/메뉴별 점검 주기(기본 {INSPECTION_INTERVAL_MINUTES}분)에 따라 자동 점검")
         
         return scheduler
     except Exception as e:
         logger.error(f"스케줄러 초기화 중 오류 발생: {str(e)}")
         return None
 
+def shutdown_scheduler():
+    """
+    스케줄러를 종료하고 리더 임대를 반납합니다.
+    """
+    global scheduler
+    if scheduler and scheduler.running:
+        scheduler.shutdown()
+    if leader.is_leader:
+        membership.leave()
+    leader.release()
+
 def get_scheduler():
     """
     현재 스케줄러 인스턴스를 반환합니다.
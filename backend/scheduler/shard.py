@@ -0,0 +1,132 @@
+"""
+URL Check Web 점검 샤딩 모듈
+
+SCHEDULER_SHARDING 을 켜면 여러 서버(노드)가 시스템 목록을 일관 해시(consistent hashing)로 나눠 점검합니다.
+
+- 노드마다 리더 워커가 Firestore 의 scheduler_nodes 컬렉션에 하트비트 문서를 갱신
+- 하트비트가 SHARD_NODE_TTL_SECONDS 안에 갱신된 노드만 해시 링에 포함
+- 시스템 ID 의 해시 위치에서 시계 방향으로 가장 가까운 가상 노드의 노드가 그 시스템을 점검
+
+노드가 추가/제거되면 해당 노드 구간의 시스템만 다른 노드로 옮겨 갑니다.
+노드 안의 워커 간 리더 선출(scheduler.leader)은 sqlite 임대로 그대로 수행합니다.
+"""
+
+import os
+import time
+import bisect
+import socket
+import hashlib
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from config.database import get_db
+from metrics.metrics_service import scheduler_shard_nodes
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 샤딩 사용 여부
+SCHEDULER_SHARDING = os.getenv("SCHEDULER_SHARDING", "false").lower() == "true"
+# 노드 ID (기본값: 호스트 이름, 같은 서버의 워커는 같은 노드로 취급)
+SCHEDULER_NODE_ID = os.getenv("SCHEDULER_NODE_ID") or socket.gethostname()
+# 하트비트가 끊긴 노드를 링에서 제외하기까지의 시간 (초)
+SHARD_NODE_TTL_SECONDS = float(os.getenv("SHARD_NODE_TTL_SECONDS", "30"))
+# 노드당 가상 노드 수 (많을수록 시스템이 고르게 나뉨)
+SHARD_VIRTUAL_NODES = 128
+
+# 노드 하트비트 컬렉션
+NODES_COLLECTION = "scheduler_nodes"
+# 하트비트가 이 시간 이상 끊긴 노드 문서는 삭제 (초)
+STALE_NODE_SECONDS = 24 * 60 * 60
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """가상 노드를 둔 일관 해시 링"""
+
+    def __init__(self, node_ids: List[str]):
+        self.node_ids = sorted(node_ids)
+        self._ring: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node_id}#{index}"), node_id)
+            for node_id in self.node_ids
+            for index in range(SHARD_VIRTUAL_NODES)
+        )
+        self._points = [point for point, _ in self._ring]
+
+    def owner(self, key: str) -> Optional[str]:
+        """key 를 담당하는 노드 ID (노드가 없으면 None)"""
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+
+class ShardMembership:
+    """이 노드의 하트비트와 담당 시스템 판단"""
+
+    def __init__(self, node_id: str = SCHEDULER_NODE_ID, enabled: bool = SCHEDULER_SHARDING):
+        self.node_id = node_id
+        self.enabled = enabled
+        self.ring = HashRing([node_id])
+
+    def heartbeat(self) -> None:
+        """하트비트를 갱신하고 살아 있는 노드로 해시 링을 다시 구성합니다."""
+        if not self.enabled:
+            return
+        db = get_db()
+        if db is None:
+            return
+
+        now = time.time()
+        nodes_ref = db.collection(NODES_COLLECTION)
+        try:
+            nodes_ref.document(self.node_id).set({
+                "node_id": self.node_id,
+                "heartbeat_at": now,
+                "updated_at": datetime.now(),
+            })
+
+            live_nodes = []
+            for node_doc in nodes_ref.stream():
+                heartbeat_at = node_doc.to_dict().get("heartbeat_at", 0)
+                if now - heartbeat_at <= SHARD_NODE_TTL_SECONDS:
+                    live_nodes.append(node_doc.id)
+                elif now - heartbeat_at > STALE_NODE_SECONDS:
+                    nodes_ref.document(node_doc.id).delete()
+        except Exception as e:
+            logger.warning(f"샤드 하트비트 갱신 실패: {str(e)}")
+            return
+
+        if self.node_id not in live_nodes:
+            live_nodes.append(self.node_id)
+        if sorted(live_nodes) != self.ring.node_ids:
+            logger.info(f"샤드 노드 변경: {self.ring.node_ids} -> {sorted(live_nodes)}")
+            self.ring = HashRing(live_nodes)
+        scheduler_shard_nodes.set(len(self.ring.node_ids))
+
+    def leave(self) -> None:
+        """하트비트 문서를 지워 다른 노드가 바로 이 노드의 시스템을 가져가게 합니다."""
+        if not self.enabled:
+            return
+        db = get_db()
+        if db is None:
+            return
+        try:
+            db.collection(NODES_COLLECTION).document(self.node_id).delete()
+        except Exception as e:
+            logger.warning(f"샤드 하트비트 삭제 실패: {str(e)}")
+
+    def owns(self, system_id: str) -> bool:
+        """이 노드가 시스템을 점검해야 하는지 반환합니다. (샤딩을 쓰지 않으면 항상 True)"""
+        if not self.enabled:
+            return True
+        owner = self.ring.owner(system_id)
+        return owner is None or owner == self.node_id
+
+
+# 이 노드의 샤드 정보
+membership = ShardMembership()